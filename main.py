@@ -14,6 +14,8 @@ import subprocess
 import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent / 'scripts'))
+
 def main_menu():
     """Display main menu and handle user selection."""
     while True:
@@ -31,6 +33,8 @@ def main_menu():
         print("\n  UTILITIES")
         print("    (6) Show metadata stats")
         print("    (7) Filter Main Realm")
+        print("    (8) Validate objectjsons")
+        print("    (9) Show realm x difficulty breakdown")
         print("\n  OTHER")
         print("    (q) Quit")
         print("\n" + "="*70)
@@ -54,6 +58,10 @@ def main_menu():
             show_stats()
         elif choice == '7':
             run_filter_main_realm()
+        elif choice == '8':
+            run_validate_metadata()
+        elif choice == '9':
+            show_realm_difficulty_stats()
         else:
             print("\nInvalid option. Please try again.")
 
@@ -155,51 +163,113 @@ def run_wiki_scraper():
         print(f"Error: Script not found at {script}")
         return
     
+    dump = input("XML dump path (leave blank to use the live wiki): ").strip()
+    command = [sys.executable, str(script)]
+    if dump:
+        command += ['--dump', dump]
+    
     try:
-        subprocess.run([sys.executable, str(script)], check=False)
+        subprocess.run(command, check=False)
     except KeyboardInterrupt:
         print("\n\nInterrupted by user.")
     except Exception as e:
         print(f"Error running script: {e}")
 
+def load_difficulty_order():
+    """Return difficulty names ordered by priority from difficulties.json."""
+    import json
+    
+    try:
+        with open('metadata/difficulties.json', 'r', encoding='utf-8') as f:
+            difficulties = json.load(f).get('difficulties', [])
+    except (OSError, ValueError):
+        return []
+    
+    return [d['name'] for d in sorted(difficulties, key=lambda d: d.get('priority', 0))]
+
+def order_difficulties(counts):
+    """Sort a difficulty -> count mapping by difficulty priority."""
+    order = {name: idx for idx, name in enumerate(load_difficulty_order())}
+    return sorted(counts.items(), key=lambda item: (order.get(item[0], len(order)), item[0]))
+
 def show_stats():
     """Show metadata statistics."""
-    import json
-    from pathlib import Path
+    from metadata_manifest import aggregate, load_manifest
     
     print("\n" + "="*70)
     print("METADATA STATISTICS")
     print("="*70 + "\n")
     
-    metadata_dir = Path('metadata/objectjsons')
-    
-    total_objects = 0
-    total_realms = 0
-    realms_data = {}
+    try:
+        stats = aggregate(load_manifest())
+    except Exception as e:
+        print(f"Error reading manifest: {e}")
+        return
     
-    for json_file in sorted(metadata_dir.glob('*.json')):
-        realm_name = json_file.stem
-        
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                objects = json.load(f)
-            
-            count = len(objects)
-            total_objects += count
-            total_realms += 1
-            realms_data[realm_name] = count
-        except Exception as e:
-            print(f"Error reading {realm_name}: {e}")
-    
-    print(f"Total realms: {total_realms}")
+    total_objects = stats['total_objects']
+    print(f"Total realms: {stats['total_realms']}")
     print(f"Total objects: {total_objects}\n")
     
+    if total_objects:
+        print(f"With images: {stats['with_images']:4d} ({stats['with_images']/total_objects*100:.1f}%)")
+        print(f"With pages: {stats['with_pages']:4d} ({stats['with_pages']/total_objects*100:.1f}%)")
+        print(f"With previous difficulties: {stats['with_previous']:4d} "
+              f"({stats['with_previous']/total_objects*100:.1f}%)\n")
+    
     print("Objects per realm:")
-    for realm, count in realms_data.items():
+    for realm, count in stats['by_realm'].items():
         print(f"  {realm:<40} {count:4d}")
     
+    print("\nObjects per difficulty:")
+    for difficulty, count in order_difficulties(stats['by_difficulty']):
+        print(f"  {difficulty or '(none)':<40} {count:4d}")
+    
+    print("\n" + "="*70)
+
+def show_realm_difficulty_stats():
+    """Show objects per difficulty for each realm."""
+    from metadata_manifest import aggregate, load_manifest
+    
+    print("\n" + "="*70)
+    print("REALM x DIFFICULTY BREAKDOWN")
+    print("="*70)
+    
+    try:
+        stats = aggregate(load_manifest())
+    except Exception as e:
+        print(f"Error reading manifest: {e}")
+        return
+    
+    for realm, counts in stats['by_realm_difficulty'].items():
+        if not counts:
+            continue
+        print(f"\n{realm}:")
+        for difficulty, count in order_difficulties(counts):
+            print(f"  {difficulty or '(none)':<40} {count:4d}")
+    
     print("\n" + "="*70)
 
+def run_validate_metadata():
+    """Run objectjsons validation."""
+    print("\n" + "="*70)
+    print("VALIDATE OBJECTJSONS")
+    print("="*70)
+    print("Starting validation...\n")
+    
+    scripts_dir = Path(__file__).parent / 'scripts'
+    script = scripts_dir / 'validate_objectjsons.py'
+    
+    if not script.exists():
+        print(f"Error: Script not found at {script}")
+        return
+    
+    try:
+        subprocess.run([sys.executable, str(script)], check=False)
+    except KeyboardInterrupt:
+        print("\n\nInterrupted by user.")
+    except Exception as e:
+        print(f"Error running script: {e}")
+
 def run_filter_main_realm():
     """Run Main Realm filter."""
     print("\n" + "="*70)
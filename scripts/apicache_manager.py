@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Manage pywikibot's API cache directory (apicache/).
+
+Each entry is a pickled CachedRequest: (description, response, cached time).
+The description ends with the sorted request parameters, which gives the
+query type, e.g. "query:siteinfo+userinfo", "paraminfo" or "query:revisions".
+
+- Stats: entries, size and age per query type, plus hit/miss counts
+  recorded by track_hits() in .cache/apicache_stats.json
+- TTLs per module (siteinfo and paraminfo long, revisions and info short);
+  WikiAPI.query(cache=True) uses the same table as the request expiry
+- Prune: drop expired entries, then least recently used ones until the
+  directory fits the size budget
+- Prewarm: fill the cache with the queries a realm's tools will make
+
+Usage: python apicache_manager.py [--stats] [--prune] [--max-size MB] [--prewarm REALM] [--dir DIR]
+"""
+
+import argparse
+import ast
+import atexit
+import datetime
+import json
+import pickle
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import profiler
+
+CACHE_DIR = Path('apicache')
+STATS_PATH = Path('.cache/apicache_stats.json')
+
+# Size budget for the cache directory
+MAX_SIZE_MB = 20
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Seconds an entry stays valid, by API module; a query with several modules
+# uses the shortest of their TTLs
+MODULE_TTLS = {
+    'siteinfo': 30 * DAY,
+    'paraminfo': 30 * DAY,
+    'userinfo': HOUR,
+    'tokens': 0,
+    'revisions': HOUR,
+    'info': HOUR,
+    'categorymembers': 6 * HOUR,
+    'categories': 6 * HOUR,
+    'imageinfo': DAY,
+    'allimages': DAY,
+}
+DEFAULT_TTL = DAY
+
+_lock = threading.Lock()
+_session_stats = None
+
+class _Stub:
+    """Stand-in for pywikibot classes referenced by a pickled entry."""
+    
+    def __init__(self, *args, **kwargs):
+        pass
+    
+    def __setstate__(self, state):
+        pass
+
+class _EntryUnpickler(pickle.Unpickler):
+    """Unpickle cache entries without importing pywikibot."""
+    
+    def find_class(self, module, name):
+        if module.startswith('pywikibot'):
+            # Timestamp pickles as a datetime subclass
+            return datetime.datetime if name == 'Timestamp' else _Stub
+        return super().find_class(module, name)
+
+def query_type(params: Dict) -> str:
+    """
+    Describe a request by its action and modules.
+    
+    Args:
+        params: Request parameters (values may be strings or lists)
+    
+    Returns:
+        e.g. "query:revisions", "query:siteinfo+userinfo", "paraminfo"
+    """
+    def value(key):
+        v = params.get(key, '')
+        return '|'.join(v) if isinstance(v, (list, tuple)) else str(v)
+    
+    action = value('action') or 'unknown'
+    if action != 'query':
+        return action
+    modules = []
+    for key in ('meta', 'prop', 'list', 'generator'):
+        modules.extend(m for m in value(key).split('|') if m)
+    return f"query:{'+'.join(sorted(modules))}" if modules else 'query'
+
+def ttl_for(params: Dict) -> int:
+    """Seconds a response to these parameters stays valid."""
+    kind = query_type(params)
+    modules = kind.split(':', 1)[1].split('+') if ':' in kind else [kind]
+    return min(MODULE_TTLS.get(m, DEFAULT_TTL) for m in modules)
+
+def parse_description(description: str) -> Dict[str, str]:
+    """Read the request parameters from a CachedRequest description string."""
+    start = description.find('[(')
+    if start < 0:
+        return {}
+    try:
+        return dict(ast.literal_eval(description[start:]))
+    except (ValueError, SyntaxError):
+        return {}
+
+def read_entry(path: Path) -> Optional[Dict]:
+    """
+    Read one cache file.
+    
+    Returns:
+        {'file', 'size', 'type', 'params', 'cached'} or None if unreadable;
+        'cached' falls back to the file mtime
+    """
+    try:
+        size = path.stat().st_size
+        with open(path, 'rb') as f:
+            description, _, cached = _EntryUnpickler(f).load()
+    except Exception:
+        return None
+    
+    params = parse_description(str(description))
+    if isinstance(cached, datetime.datetime):
+        if cached.tzinfo is None:
+            cached = cached.replace(tzinfo=datetime.timezone.utc)
+        cached = cached.timestamp()
+    else:
+        cached = path.stat().st_mtime
+    return {'file': path.name, 'size': size, 'type': query_type(params),
+            'params': params, 'cached': cached}
+
+def iter_entries(cache_dir: Path = CACHE_DIR) -> Iterator[Dict]:
+    """Yield every readable entry in the cache directory."""
+    if not cache_dir.is_dir():
+        return
+    for path in sorted(cache_dir.iterdir()):
+        if path.is_file():
+            entry = read_entry(path)
+            if entry is not None:
+                yield entry
+
+def load_stats() -> Dict:
+    """Recorded hits and misses ({'types': {type: {hits, misses}}, 'access': {file: time}})."""
+    if not STATS_PATH.exists():
+        return {'types': {}, 'access': {}}
+    try:
+        with open(STATS_PATH, 'r', encoding='utf-8') as f:
+            stats = json.load(f)
+    except (OSError, ValueError):
+        return {'types': {}, 'access': {}}
+    stats.setdefault('types', {})
+    stats.setdefault('access', {})
+    return stats
+
+def save_stats():
+    """Merge this process's hits and misses into the stats file."""
+    with _lock:
+        if not _session_stats or not (_session_stats['types'] or _session_stats['access']):
+            return
+        stats = load_stats()
+        for kind, counts in _session_stats['types'].items():
+            total = stats['types'].setdefault(kind, {'hits': 0, 'misses': 0})
+            total['hits'] += counts['hits']
+            total['misses'] += counts['misses']
+        stats['access'].update(_session_stats['access'])
+        _session_stats['types'].clear()
+        _session_stats['access'].clear()
+    
+    STATS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(STATS_PATH, 'w', encoding='utf-8') as f:
+        json.dump(stats, f)
+
+def record(kind: str, filename: str, hit: bool):
+    """Count one cache lookup."""
+    global _session_stats
+    with _lock:
+        if _session_stats is None:
+            _session_stats = {'types': {}, 'access': {}}
+            atexit.register(save_stats)
+        counts = _session_stats['types'].setdefault(kind, {'hits': 0, 'misses': 0})
+        counts['hits' if hit else 'misses'] += 1
+        _session_stats['access'][filename] = time.time()
+
+def track_hits():
+    """Count hits and misses of pywikibot's CachedRequest lookups."""
+    from pywikibot.data.api import CachedRequest
+    
+    original = CachedRequest._load_cache
+    if getattr(original, '_tracked', False):
+        return
+    
+    def _load_cache(self):
+        hit = original(self)
+        record(query_type(self._params), self._cachefile_path().name, hit)
+        return hit
+    
+    _load_cache._tracked = True
+    CachedRequest._load_cache = _load_cache
+
+def is_expired(entry: Dict, now: Optional[float] = None) -> bool:
+    return (now or time.time()) - entry['cached'] > ttl_for(entry['params'])
+
+def cache_stats(cache_dir: Path = CACHE_DIR) -> Dict[str, Dict]:
+    """
+    Summarize the cache by query type.
+    
+    Returns:
+        Dictionary of type -> {entries, bytes, expired, oldest, newest, hits, misses};
+        ages are in seconds
+    """
+    now = time.time()
+    recorded = load_stats()['types']
+    
+    summary = {}
+    for entry in iter_entries(cache_dir):
+        age = now - entry['cached']
+        item = summary.setdefault(entry['type'], {'entries': 0, 'bytes': 0, 'expired': 0,
+                                                  'oldest': age, 'newest': age, 'hits': 0, 'misses': 0})
+        item['entries'] += 1
+        item['bytes'] += entry['size']
+        item['expired'] += is_expired(entry, now)
+        item['oldest'] = max(item['oldest'], age)
+        item['newest'] = min(item['newest'], age)
+    
+    for kind, counts in recorded.items():
+        item = summary.setdefault(kind, {'entries': 0, 'bytes': 0, 'expired': 0,
+                                         'oldest': 0, 'newest': 0, 'hits': 0, 'misses': 0})
+        item['hits'] = counts['hits']
+        item['misses'] = counts['misses']
+    return summary
+
+def prune(cache_dir: Path = CACHE_DIR, max_bytes: int = MAX_SIZE_MB * 1024 * 1024,
+          dry_run: bool = False) -> Dict[str, int]:
+    """
+    Delete expired entries, then least recently used ones over the size budget.
+    
+    Recency is the last recorded lookup of an entry, or when it was cached.
+    
+    Returns:
+        Counts: expired, evicted, kept, bytes_freed, bytes_kept
+    """
+    now = time.time()
+    access = load_stats()['access']
+    result = {'expired': 0, 'evicted': 0, 'kept': 0, 'bytes_freed': 0, 'bytes_kept': 0}
+    
+    def remove(entry):
+        if not dry_run:
+            (cache_dir / entry['file']).unlink(missing_ok=True)
+            access.pop(entry['file'], None)
+        result['bytes_freed'] += entry['size']
+    
+    live = []
+    for entry in iter_entries(cache_dir):
+        if is_expired(entry, now):
+            remove(entry)
+            result['expired'] += 1
+        else:
+            live.append(entry)
+    
+    live.sort(key=lambda e: max(access.get(e['file'], 0), e['cached']), reverse=True)
+    total = 0
+    for entry in live:
+        if total + entry['size'] > max_bytes:
+            remove(entry)
+            result['evicted'] += 1
+            continue
+        total += entry['size']
+        result['kept'] += 1
+    result['bytes_kept'] = total
+    
+    if not dry_run and (result['expired'] or result['evicted']):
+        stats = load_stats()
+        stats['access'] = {f: t for f, t in stats['access'].items() if (cache_dir / f).exists()}
+        STATS_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(STATS_PATH, 'w', encoding='utf-8') as f:
+            json.dump(stats, f)
+    return result
+
+def realm_titles(realm: str) -> List[str]:
+    """Wiki page titles of a realm's objects."""
+    from extract_rbxlx import load_replacements
+    
+    json_file = Path('metadata/objectjsons') / f'{realm}.json'
+    with open(json_file, 'r', encoding='utf-8') as f:
+        objects = json.load(f)
+    replacements = load_replacements()
+    return sorted(replacements.get(name, name) for name in objects)
+
+def prewarm(realm: str, api=None) -> int:
+    """
+    Fill the cache for a realm: site info, its category and page revisions.
+    
+    Returns:
+        Number of API requests made
+    """
+    from category_reconcile import category_realm
+    
+    if api is None:
+        from wiki_api import WikiAPI
+        api = WikiAPI()
+    
+    # Site construction reads siteinfo and paraminfo through the cache
+    api.site.siteinfo.get('general')
+    api.category_members(f'{category_realm(realm)} Objects', cache=True)
+    titles = realm_titles(realm)
+    for start in range(0, len(titles), 50):
+        for _ in api.query(cache=True, prop='revisions|info', rvprop='ids|timestamp',
+                           titles='|'.join(titles[start:start + 50])):
+            pass
+    return api.requests
+
+def _format_age(seconds: float) -> str:
+    if seconds >= DAY:
+        return f"{seconds / DAY:.1f}d"
+    if seconds >= HOUR:
+        return f"{seconds / HOUR:.1f}h"
+    return f"{seconds / 60:.0f}m"
+
+def print_stats(cache_dir: Path):
+    summary = cache_stats(cache_dir)
+    print(f"{'Query type':<36} {'Entries':>7} {'KB':>8} {'Expired':>7} {'Oldest':>7} {'Hit rate':>9}")
+    print("-" * 79)
+    for kind in sorted(summary):
+        item = summary[kind]
+        lookups = item['hits'] + item['misses']
+        rate = f"{100 * item['hits'] / lookups:.0f}%" if lookups else '-'
+        print(f"{kind[:36]:<36} {item['entries']:>7} {item['bytes'] / 1024:>8.1f} "
+              f"{item['expired']:>7} {_format_age(item['oldest']):>7} {rate:>9}")
+    
+    entries = sum(item['entries'] for item in summary.values())
+    size = sum(item['bytes'] for item in summary.values())
+    hits = sum(item['hits'] for item in summary.values())
+    lookups = hits + sum(item['misses'] for item in summary.values())
+    print("-" * 79)
+    print(f"  {entries} entries, {size / 1024:.1f} KB"
+          + (f", {hits}/{lookups} lookups served from cache" if lookups else ''))
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Report on and bound pywikibot's API cache.")
+    parser.add_argument('--dir', type=Path, default=CACHE_DIR, help='cache directory')
+    parser.add_argument('--stats', action='store_true', help='show entries, size, age and hit rate by query type')
+    parser.add_argument('--prune', action='store_true', help='drop expired entries and enforce the size budget')
+    parser.add_argument('--max-size', type=float, default=MAX_SIZE_MB, help='size budget in MB')
+    parser.add_argument('--prewarm', metavar='REALM', help='fill the cache for a realm')
+    parser.add_argument('--dry-run', action='store_true', help='only report what --prune would delete')
+    profiler.add_argument(parser)
+    args = parser.parse_args()
+    profiler.start('apicache_manager', args.profile)
+    
+    if not (args.stats or args.prune or args.prewarm):
+        args.stats = True
+    
+    print("=" * 70)
+    print("API CACHE")
+    print("=" * 70 + "\n")
+    
+    if args.prewarm:
+        if not (Path('metadata/objectjsons') / f'{args.prewarm}.json').exists():
+            print(f"Error: realm {args.prewarm} not found")
+            sys.exit(1)
+        requests_made = prewarm(args.prewarm)
+        print(f"[OK] Prewarmed {args.prewarm} ({requests_made} requests)\n")
+    
+    if args.prune:
+        result = prune(args.dir, int(args.max_size * 1024 * 1024), args.dry_run)
+        verb = 'Would free' if args.dry_run else 'Freed'
+        print(f"[OK] {verb} {result['bytes_freed'] / 1024:.1f} KB: {result['expired']} expired, "
+              f"{result['evicted']} evicted, {result['kept']} kept "
+              f"({result['bytes_kept'] / 1024:.1f} KB)\n")
+    
+    if args.stats:
+        print_stats(args.dir)
+    
+    print("=" * 70)
+
+if __name__ == '__main__':
+    main()
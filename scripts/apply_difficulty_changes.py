@@ -7,101 +7,135 @@ Updates:
 - previousDifficulties array to include the old difficulty
 - difficultyInfo (icon and color) based on new difficulty
 - categories based on new difficulty
+
+Objects the changes were already applied to are left alone, so running it
+again writes nothing.
 """
 
+import argparse
 import json
 from pathlib import Path
+from typing import Dict
 
-# Load difficulty info for reference
-difficulties_path = Path('metadata/difficulties.json')
-with open(difficulties_path, 'r', encoding='utf-8') as f:
-    difficulties_data = json.load(f)
-
-difficulties_map = {}
-for diff in difficulties_data.get('difficulties', []):
-    name = diff.get('name', '')
-    if name:
-        difficulties_map[name] = {
-            'icon': diff.get('icon', f'{name}.png'),
-            'color': diff.get('color', '#ffffff')
-        }
+import profiler
+from metadata_store import update_realm
 
-# Load difficulty changes
-changes_path = Path('metadata/difficultychanges.json')
-with open(changes_path, 'r', encoding='utf-8') as f:
-    changes = json.load(f)
+METADATA_DIR = Path('metadata/objectjsons')
+DIFFICULTIES_PATH = Path('metadata/difficulties.json')
+CHANGES_PATH = Path('metadata/difficultychanges.json')
 
-metadata_dir = Path('metadata/objectjsons')
-
-total_changes = 0
-realms_affected = {}
+def load_difficulties_map() -> Dict[str, Dict]:
+    """Difficulty name -> difficultyInfo (icon and color)."""
+    with open(DIFFICULTIES_PATH, 'r', encoding='utf-8') as f:
+        difficulties_data = json.load(f)
+    
+    difficulties_map = {}
+    for diff in difficulties_data.get('difficulties', []):
+        name = diff.get('name', '')
+        if name:
+            difficulties_map[name] = {
+                'icon': diff.get('icon', f'{name}.png'),
+                # Same as enrich_objectjsons.py, so the two do not keep rewriting each other
+                'color': diff.get('hex', diff.get('color', '#ffffff'))
+            }
+    return difficulties_map
 
-# Apply changes
-for realm_name, realm_changes in changes.items():
-    if not realm_changes:  # Skip empty realms
-        continue
+def apply_difficulty_changes(changes_path: Path = CHANGES_PATH) -> Dict[str, int]:
+    """
+    Apply difficultychanges.json to the realm files.
     
-    json_file = metadata_dir / f"{realm_name}.json"
-    if not json_file.exists():
-        print(f"⚠ Realm file not found: {realm_name}")
-        continue
+    Args:
+        changes_path: Difficulty changes file
     
-    # Load metadata for this realm
-    with open(json_file, 'r', encoding='utf-8') as f:
-        objects = json.load(f)
+    Returns:
+        Realm name -> number of objects updated
+    """
+    difficulties_map = load_difficulties_map()
+    with open(changes_path, 'r', encoding='utf-8') as f:
+        changes = json.load(f)
     
-    realm_change_count = 0
+    realms_affected = {}
     
-    for obj_name, change_data in realm_changes.items():
-        if obj_name not in objects:
-            print(f"⚠ Object not found in {realm_name}: {obj_name}")
+    for realm_name, realm_changes in changes.items():
+        if not realm_changes:  # Skip empty realms
             continue
         
-        obj = objects[obj_name]
-        old_difficulty = change_data.get('previous', '')
-        new_difficulty = change_data.get('new', '')
-        
-        # Update difficulty
-        obj['difficulty'] = new_difficulty
-        
-        # Update previousDifficulties
-        if 'previousDifficulties' not in obj:
-            obj['previousDifficulties'] = []
-        
-        # Add old difficulty if not already present
-        if old_difficulty and old_difficulty not in obj['previousDifficulties']:
-            obj['previousDifficulties'].insert(0, old_difficulty)  # Insert at beginning
-        
-        # Update difficultyInfo
-        if new_difficulty in difficulties_map:
-            obj['difficultyInfo'] = difficulties_map[new_difficulty]
-        
-        # Update categories
-        categories = obj.get('categories', [])
-        # Remove old difficulty category if present
-        old_cat = f"{old_difficulty} Objects"
-        new_cat = f"{new_difficulty} Objects"
+        json_file = METADATA_DIR / f"{realm_name}.json"
+        if not json_file.exists():
+            print(f"⚠ Realm file not found: {realm_name}")
+            continue
         
-        if old_cat in categories:
-            categories.remove(old_cat)
-        if new_cat not in categories:
-            categories.append(new_cat)
+        def apply(objects):
+            realm_change_count = 0
+            
+            for obj_name, change_data in realm_changes.items():
+                if obj_name not in objects:
+                    print(f"⚠ Object not found in {realm_name}: {obj_name}")
+                    continue
+                
+                obj = objects[obj_name]
+                before = json.dumps(obj, sort_keys=True)
+                old_difficulty = change_data.get('previous', '')
+                new_difficulty = change_data.get('new', '')
+                
+                # Update difficulty
+                obj['difficulty'] = new_difficulty
+                
+                # Update previousDifficulties
+                if 'previousDifficulties' not in obj:
+                    obj['previousDifficulties'] = []
+                
+                # Add old difficulty if not already present
+                if old_difficulty and old_difficulty not in obj['previousDifficulties']:
+                    obj['previousDifficulties'].insert(0, old_difficulty)  # Insert at beginning
+                
+                # Update difficultyInfo
+                if new_difficulty in difficulties_map:
+                    obj['difficultyInfo'] = difficulties_map[new_difficulty]
+                
+                # Update categories
+                categories = obj.get('categories', [])
+                # Remove old difficulty category if present
+                old_cat = f"{old_difficulty} Objects"
+                new_cat = f"{new_difficulty} Objects"
+                
+                if old_cat in categories:
+                    categories.remove(old_cat)
+                if new_cat not in categories:
+                    categories.append(new_cat)
+                
+                obj['categories'] = sorted(categories)  # Keep sorted for consistency
+                
+                # Already applied: nothing to write, so downstream stages stay up to date
+                if json.dumps(obj, sort_keys=True) != before:
+                    realm_change_count += 1
+            return realm_change_count
         
-        obj['categories'] = sorted(categories)  # Keep sorted for consistency
+        # Applied under the realm file's lock, so concurrent writers are not overwritten
+        realm_change_count = update_realm(json_file, apply)
         
-        realm_change_count += 1
-        total_changes += 1
+        if realm_change_count > 0:
+            realms_affected[realm_name] = realm_change_count
+            print(f"[OK] {realm_name:<40} [{realm_change_count} objects updated]")
     
-    # Save updated metadata
-    if realm_change_count > 0:
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(objects, f, indent=2, ensure_ascii=False)
-        
-        realms_affected[realm_name] = realm_change_count
-        print(f"[OK] {realm_name:<40} [{realm_change_count} objects updated]")
+    return realms_affected
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Apply difficultychanges.json to the objectjsons.')
+    profiler.add_argument(parser)
+    args = parser.parse_args()
+    profiler.start('apply_difficulty_changes', args.profile)
+    
+    realms_affected = apply_difficulty_changes()
+    total_changes = sum(realms_affected.values())
+    profiler.count('objects', total_changes)
+    
+    print(f"\n{'='*70}")
+    print(f"Difficulty changes applied!")
+    print(f"  Total changes: {total_changes}")
+    print(f"  Realms affected: {len(realms_affected)}")
+    print(f"{'='*70}")
 
-print(f"\n{'='*70}")
-print(f"Difficulty changes applied!")
-print(f"  Total changes: {total_changes}")
-print(f"  Realms affected: {len(realms_affected)}")
-print(f"{'='*70}")
+if __name__ == '__main__':
+    main()
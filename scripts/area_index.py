@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Uniform-grid spatial index for assigning objects to Main Realm areas.
+
+Area regions (City, Candyland, ...) come from the place file as parts with
+a position and size. Each region's axis-aligned bounding box is inserted
+into every grid cell it overlaps on the X/Z plane, so looking up a point
+only tests the few regions sharing its cell instead of every region.
+
+When regions overlap, the smallest one containing the point wins, so nested
+areas resolve to the innermost region. Regions only match objects in their
+parent realm (the area's `parent` in realms.json).
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from realm_index import load_realm_index
+
+Vector = Tuple[float, float, float]
+
+def load_areas() -> Dict[str, Dict]:
+    """
+    Load areas from the compiled realm index.
+    
+    Returns:
+        Dictionary of casefolded label -> {'label', 'parent'}
+    """
+    return {
+        label.casefold(): {'label': label, 'parent': entry['parent'] or ''}
+        for label, entry in load_realm_index().areas().items()
+    }
+
+def bounding_box(position: Vector, size: Vector,
+                 rotation: Optional[Sequence[float]] = None) -> Tuple[Vector, Vector]:
+    """
+    Compute the axis-aligned bounding box of a (possibly rotated) part.
+    
+    Args:
+        position: Part center (X, Y, Z)
+        size: Part size (X, Y, Z)
+        rotation: Row-major 3x3 rotation matrix (R00..R22), identity if omitted
+    
+    Returns:
+        (min corner, max corner)
+    """
+    half = [s / 2 for s in size]
+    if rotation:
+        extents = [
+            sum(abs(rotation[row * 3 + col]) * half[col] for col in range(3))
+            for row in range(3)
+        ]
+    else:
+        extents = half
+    
+    low = tuple(p - e for p, e in zip(position, extents))
+    high = tuple(p + e for p, e in zip(position, extents))
+    return low, high
+
+class AreaIndex:
+    """Uniform grid over the X/Z plane mapping cells to area regions."""
+    
+    def __init__(self, regions: Iterable[Dict], cell_size: Optional[float] = None):
+        """
+        Build the index.
+        
+        Args:
+            regions: Dicts with 'label', 'min' and 'max' corners
+            cell_size: Grid cell edge length (default: median region width)
+        """
+        self.regions = [
+            {
+                'label': r['label'],
+                'parent': r.get('parent', ''),
+                'min': tuple(r['min']),
+                'max': tuple(r['max']),
+                'volume': math.prod(hi - lo for lo, hi in zip(r['min'], r['max'])),
+            }
+            for r in regions
+        ]
+        
+        if cell_size is None:
+            widths = sorted(max(r['max'][0] - r['min'][0], r['max'][2] - r['min'][2])
+                            for r in self.regions)
+            cell_size = widths[len(widths) // 2] if widths else 1.0
+        self.cell_size = max(cell_size, 1e-6)
+        
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        for idx, region in enumerate(self.regions):
+            x0, z0 = self._cell(region['min'][0], region['min'][2])
+            x1, z1 = self._cell(region['max'][0], region['max'][2])
+            for cx in range(x0, x1 + 1):
+                for cz in range(z0, z1 + 1):
+                    self.cells.setdefault((cx, cz), []).append(idx)
+    
+    def _cell(self, x: float, z: float) -> Tuple[int, int]:
+        return math.floor(x / self.cell_size), math.floor(z / self.cell_size)
+    
+    def lookup(self, point: Vector, realm: Optional[str] = None) -> Optional[str]:
+        """
+        Find the area containing a point.
+        
+        Args:
+            point: Position (X, Y, Z)
+            realm: Only consider areas whose parent is this realm
+        
+        Returns:
+            Area label, or None when the point is outside every region
+        """
+        best = None
+        for idx in self.cells.get(self._cell(point[0], point[2]), ()):
+            region = self.regions[idx]
+            if realm and region['parent'] and region['parent'] != realm:
+                continue
+            low, high = region['min'], region['max']
+            if all(lo <= p <= hi for p, lo, hi in zip(point, low, high)):
+                if best is None or (region['volume'], region['label']) < (best['volume'], best['label']):
+                    best = region
+        return best['label'] if best else None
+
+def assign_areas(realms: Dict[str, Dict[str, Dict]], regions: List[Dict]) -> int:
+    """
+    Set 'area' on extracted objects from their recorded '_position'.
+    
+    The '_position' helper field is always removed.
+    
+    Args:
+        realms: Realm -> {name -> extracted object}
+        regions: Area regions found in the place file(s)
+    
+    Returns:
+        Number of objects that were assigned an area
+    """
+    index = AreaIndex(regions) if regions else None
+    
+    assigned = 0
+    for objects in realms.values():
+        for obj in objects.values():
+            position = obj.pop('_position', None)
+            if index is None or position is None:
+                continue
+            area = index.lookup(position, obj.get('realm'))
+            if area:
+                obj['area'] = area
+                assigned += 1
+    
+    return assigned
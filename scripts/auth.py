@@ -1,15 +1,26 @@
 """
 Authentication module for Fandom wiki access.
 Handles login and session management.
+
+The authenticated session (cookies and CSRF token) is cached in
+.cache/session/wiki_session.json (owner-only permissions), so later runs
+reuse it instead of logging in again. Expired cookies are dropped on load,
+and a restored session is checked with one userinfo call before it is
+trusted. API calls re-login automatically on assertuserfailed and refresh
+the token on badtoken. get_pywikibot_site() hands the same cookies to
+pywikibot, so every tool shares one login.
 """
 
+import json
 import os
+import stat
 import sys
+import time
 import requests
 from pathlib import Path
 from dotenv import load_dotenv
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
+
+from http_transport import install_pywikibot, new_session
 
 # Load environment variables
 load_dotenv()
@@ -18,26 +29,117 @@ load_dotenv()
 WIKI_URL = "https://ftbc.fandom.com"
 API_URL = f"{WIKI_URL}/api.php"
 
+# Own directory, so only it (not all of .cache) is made owner-only
+SESSION_PATH = Path('.cache/session/wiki_session.json')
+
+# Re-login after this long even if cookies have not expired
+SESSION_MAX_AGE = 7 * 24 * 3600
+
+# API errors fixed by logging in again / fetching a fresh token
+RELOGIN_ERRORS = {'assertuserfailed', 'assertbotfailed', 'notloggedin'}
+TOKEN_ERRORS = {'badtoken'}
+
 
 class WikiAuth:
     """Handle authentication with Fandom wiki."""
     
     def __init__(self):
-        self.session = requests.Session()
-        # Setup retry strategy for resilience
-        retry_strategy = Retry(
-            total=3,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "OPTIONS", "POST"]
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
+        # Shared keep-alive pool with retries and compression (see http_transport.py)
+        self.session = new_session()
         self.authenticated = False
         self.username = None
+        self.csrf_token = None
+    
+    def _save_session(self):
+        """Cache cookies and tokens on disk, readable only by the owner."""
+        cookies = [
+            {
+                'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path,
+                'expires': c.expires, 'secure': c.secure,
+            }
+            for c in self.session.cookies
+        ]
+        data = {
+            'username': self.username,
+            'saved': time.time(),
+            'cookies': cookies,
+            'csrf_token': self.csrf_token,
+        }
+        
+        SESSION_PATH.parent.mkdir(parents=True, exist_ok=True)
+        os.chmod(SESSION_PATH.parent, stat.S_IRWXU)
+        fd = os.open(SESSION_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.chmod(SESSION_PATH, stat.S_IRUSR | stat.S_IWUSR)
+    
+    def _restore_session(self, username: str) -> bool:
+        """
+        Load a cached session for this user.
+        
+        Returns:
+            True if unexpired cookies were restored
+        """
+        if not SESSION_PATH.exists():
+            return False
+        try:
+            with open(SESSION_PATH, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        
+        if data.get('username') != username or time.time() - data.get('saved', 0) > SESSION_MAX_AGE:
+            return False
+        
+        now = time.time()
+        cookies = [c for c in data.get('cookies', []) if not c.get('expires') or c['expires'] > now]
+        if not cookies:
+            return False
+        
+        for c in cookies:
+            self.session.cookies.set(c['name'], c['value'], domain=c['domain'], path=c['path'],
+                                     expires=c.get('expires'), secure=c.get('secure', False))
+        self.csrf_token = data.get('csrf_token')
+        self.authenticated = True
+        self.username = username
+        return True
     
-    def login(self):
-        """Authenticate with the wiki using credentials from .env"""
+    def _validate_session(self) -> bool:
+        """
+        Check restored cookies with one userinfo call.
+        
+        Returns:
+            True if the wiki still sees us as the logged-in user
+        """
+        try:
+            response = self.session.get(
+                API_URL,
+                params={"action": "query", "meta": "userinfo", "assert": "user", "format": "json"},
+                timeout=10
+            )
+            response.raise_for_status()
+            data = response.json()
+        except (requests.RequestException, ValueError):
+            return False
+        
+        userinfo = data.get("query", {}).get("userinfo", {})
+        return "error" not in data and bool(userinfo) and "anon" not in userinfo
+    
+    def clear_session(self):
+        """Forget the cached session (memory and disk)."""
+        self.session.cookies.clear()
+        self.authenticated = False
+        self.csrf_token = None
+        if SESSION_PATH.exists():
+            SESSION_PATH.unlink()
+    
+    def login(self, force: bool = False):
+        """
+        Authenticate with the wiki using credentials from .env
+        
+        Reuses the cached session unless `force` is set, it has expired or
+        the wiki no longer accepts it.
+        """
         username = os.getenv("BOT_USERNAME")
         password = os.getenv("BOT_PASSWORD")
         
@@ -46,6 +148,13 @@ class WikiAuth:
                 "Missing wiki credentials. Please set BOT_USERNAME and BOT_PASSWORD in .env"
             )
         
+        if not force and self._restore_session(username):
+            if self._validate_session():
+                print(f"[+] Reusing session for {username}")
+                return self.session
+            print("[!] Cached session was rejected, logging in again")
+        
+        self.clear_session()
         print(f"Authenticating as {username}...", end=" ", flush=True)
         
         try:
@@ -83,6 +192,7 @@ class WikiAuth:
             if result == "Success":
                 self.authenticated = True
                 self.username = username
+                self._save_session()
                 
                 print(f"[+] Logged in as {username}")
                 return self.session
@@ -97,6 +207,59 @@ class WikiAuth:
             print(f"✗ Invalid response format: {e}")
             raise RuntimeError(f"Unexpected wiki response: {e}")
     
+    def get_csrf_token(self, refresh: bool = False) -> str:
+        """Return the edit (CSRF) token, fetching it only when not cached."""
+        if self.csrf_token and not refresh:
+            return self.csrf_token
+        
+        response = self.session.get(
+            API_URL,
+            params={"action": "query", "meta": "tokens", "type": "csrf", "format": "json"},
+            timeout=10
+        )
+        response.raise_for_status()
+        self.csrf_token = response.json()["query"]["tokens"]["csrftoken"]
+        self._save_session()
+        return self.csrf_token
+    
+    def api(self, params: dict, post: bool = False, needs_token: bool = False) -> dict:
+        """
+        Call the API as the logged-in user.
+        
+        Adds assert=user, and the CSRF token when `needs_token` is set. On
+        assertuserfailed the session is re-established with a fresh login,
+        and on badtoken the token is refetched; either way the call is
+        retried once.
+        
+        Returns:
+            Decoded JSON response
+        """
+        if not self.authenticated:
+            self.login()
+        
+        for attempt in range(2):
+            payload = dict(params, format="json", **{"assert": "user"})
+            if needs_token:
+                payload["token"] = self.get_csrf_token()
+            
+            if post:
+                response = self.session.post(API_URL, data=payload, timeout=30)
+            else:
+                response = self.session.get(API_URL, params=payload, timeout=30)
+            response.raise_for_status()
+            data = response.json()
+            
+            code = data.get("error", {}).get("code")
+            if attempt == 0 and code in RELOGIN_ERRORS:
+                self.login(force=True)
+                continue
+            if attempt == 0 and code in TOKEN_ERRORS:
+                self.csrf_token = None
+                continue
+            return data
+        
+        return data
+    
     def is_authenticated(self):
         """Check if currently authenticated."""
         return self.authenticated
@@ -115,6 +278,44 @@ def authenticate():
     return auth.get_session()
 
 
+def get_pywikibot_site():
+    """
+    Return a pywikibot site sharing the cached WikiAuth session.
+    
+    The cached cookies are copied into pywikibot's cookie jar, so
+    site.login() only verifies them instead of posting credentials. Cookies
+    pywikibot ends up with are written back to the session cache.
+    """
+    import pywikibot
+    from pywikibot.comms import http
+    from requests.cookies import create_cookie
+    
+    install_pywikibot()
+    site = pywikibot.Site(url=API_URL)
+    
+    auth = WikiAuth()
+    username = os.getenv("BOT_USERNAME")
+    if username and auth._restore_session(username):
+        for c in auth.session.cookies:
+            http.cookie_jar.set_cookie(create_cookie(
+                c.name, c.value, domain=c.domain, path=c.path, expires=c.expires, secure=c.secure
+            ))
+    
+    if not site.user():
+        password = os.getenv("BOT_PASSWORD")
+        if password:
+            site.login(autocreate=False, password=password)
+    
+    if site.user() and username:
+        auth.session.cookies.clear()
+        for c in http.cookie_jar:
+            auth.session.cookies.set_cookie(c)
+        auth.username = username
+        auth._save_session()
+    
+    return site
+
+
 if __name__ == "__main__":
     try:
         session = authenticate()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Benchmark the metadata tools on synthetic datasets.
+
+For each scale (objects), a synthetic tree is generated once with
+synthetic_dataset.py and cached in .cache/benchmarks/data/. Every benchmark
+runs on a fresh copy of that tree, with the tool's output suppressed:
+
+- json_load / json_save: read and write every realm file
+- enrich: enrich_objectjsons() on the raw tree
+- enrich_incremental: enrich_objectjsons() again with nothing changed
+- apply_difficulties: apply_difficulty_changes()
+- fix_misplaced: fix_misplaced_objects()
+- show_stats / show_stats_cold: main.py's stats with and without the manifest
+- render: WikiTemplateGenerator.generate_complete_page() for every object
+
+The best of --repeat runs is kept. Results are appended to
+.cache/benchmarks/history.jsonl with the git commit, and each result is
+compared with the previous run at the same scale, so slowdowns are flagged.
+The "per 10x" column shows how time grows between scales: ~10 is linear,
+~100 is quadratic.
+
+Usage: python benchmark.py [--scales 1000,10000,100000] [--only NAME,...] [--repeat N] [--seed N] [--regenerate]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from profiler import git_commit
+from synthetic_dataset import generate
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+# main.py (show_stats) lives in the repository root
+sys.path.insert(0, str(SCRIPTS_DIR.parent))
+BENCH_DIR = Path('.cache/benchmarks')
+HISTORY_PATH = BENCH_DIR / 'history.jsonl'
+
+DEFAULT_SCALES = (1000, 10000)
+
+# Flag results this much slower than the previous run
+REGRESSION_THRESHOLD = 0.20
+
+def _realm_files() -> List[Path]:
+    return sorted(Path('metadata/objectjsons').glob('*.json'))
+
+def bench_json_load():
+    for json_file in _realm_files():
+        with open(json_file, 'r', encoding='utf-8') as f:
+            json.load(f)
+
+def _load_all() -> Dict[Path, Dict]:
+    realm_objects = {}
+    for json_file in _realm_files():
+        with open(json_file, 'r', encoding='utf-8') as f:
+            realm_objects[json_file] = json.load(f)
+    return realm_objects
+
+def bench_json_save(realm_objects: Dict[Path, Dict]):
+    for json_file, objects in realm_objects.items():
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(objects, f, indent=2, ensure_ascii=False)
+
+def bench_enrich():
+    from enrich_objectjsons import enrich_objectjsons
+    enrich_objectjsons()
+
+def bench_apply_difficulties():
+    from apply_difficulty_changes import apply_difficulty_changes
+    apply_difficulty_changes()
+
+def bench_fix_misplaced():
+    from fix_misplaced_objects import fix_misplaced_objects
+    fix_misplaced_objects()
+
+def bench_show_stats():
+    from main import show_stats
+    show_stats()
+
+def bench_show_stats_cold():
+    from metadata_manifest import MANIFEST_PATH
+    MANIFEST_PATH.unlink(missing_ok=True)
+    bench_show_stats()
+
+def bench_render(realm_objects: Dict[Path, Dict]):
+    from wiki_template_generator import WikiTemplateGenerator
+    generator = WikiTemplateGenerator()
+    for objects in realm_objects.values():
+        for name, obj in objects.items():
+            generator.generate_complete_page(name, obj, prev_diffs=obj.get('previousDifficulties', []))
+
+# name -> (tree to run on, setup returning the benchmark's argument or None, benchmark)
+BENCHMARKS = {
+    'json_load': ('raw', None, bench_json_load),
+    'json_save': ('raw', _load_all, bench_json_save),
+    'enrich': ('raw', None, bench_enrich),
+    'enrich_incremental': ('enriched', None, bench_enrich),
+    'apply_difficulties': ('enriched', None, bench_apply_difficulties),
+    'fix_misplaced': ('enriched', None, bench_fix_misplaced),
+    'show_stats': ('enriched', None, bench_show_stats),
+    'show_stats_cold': ('enriched', None, bench_show_stats_cold),
+    'render': ('enriched', _load_all, bench_render),
+}
+
+@contextlib.contextmanager
+def _in_dir(path: Path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+def prepare_trees(scale: int, seed: int, data_dir: Path, regenerate: bool = False) -> Dict[str, Path]:
+    """
+    Generate (or reuse) the raw and enriched trees for a scale.
+    
+    Returns:
+        {'raw': path, 'enriched': path}, each containing metadata/
+    """
+    raw = data_dir / f'{scale}-{seed}' / 'raw'
+    enriched = data_dir / f'{scale}-{seed}' / 'enriched'
+    if regenerate:
+        shutil.rmtree(raw.parent, ignore_errors=True)
+    if not (raw / 'metadata').exists():
+        generate(raw, scale, seed)
+    if not (enriched / 'metadata').exists():
+        shutil.copytree(raw, enriched)
+        with _in_dir(enriched), contextlib.redirect_stdout(io.StringIO()):
+            bench_enrich()
+    return {'raw': raw, 'enriched': enriched}
+
+def run_benchmark(tree: Path, setup: Optional[Callable], bench: Callable, repeat: int) -> float:
+    """Best wall time of `repeat` runs, each on a fresh copy of the tree."""
+    best = None
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            work = Path(tmp) / 'tree'
+            shutil.copytree(tree, work)
+            with _in_dir(work), contextlib.redirect_stdout(io.StringIO()):
+                args = (setup(),) if setup else ()
+                start = time.perf_counter()
+                bench(*args)
+                elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def load_history() -> List[Dict]:
+    if not HISTORY_PATH.exists():
+        return []
+    with open(HISTORY_PATH, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def append_history(results: List[Dict], path: Path = HISTORY_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        for result in results:
+            f.write(json.dumps(result) + '\n')
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Benchmark the metadata tools on synthetic data.')
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)),
+                        help='comma-separated object counts')
+    parser.add_argument('--only', help='comma-separated benchmark names')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per benchmark (best is kept)')
+    parser.add_argument('--seed', type=int, default=0, help='dataset seed')
+    parser.add_argument('--regenerate', action='store_true', help='rebuild the cached datasets')
+    args = parser.parse_args()
+    
+    names = args.only.split(',') if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        print(f"Error: unknown benchmark(s): {', '.join(unknown)} (choose from {', '.join(BENCHMARKS)})")
+        sys.exit(1)
+    scales = sorted(int(s) for s in args.scales.split(','))
+    
+    # Resolve before the benchmarks change directory
+    data_dir = (BENCH_DIR / 'data').resolve()
+    history_path = HISTORY_PATH.resolve()
+    
+    previous = {}
+    for entry in load_history():
+        # Later entries overwrite earlier ones: compare with the latest run
+        previous[(entry['scale'], entry.get('seed'), entry['benchmark'])] = entry
+    
+    run = {'time': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), 'commit': git_commit(), 'seed': args.seed}
+    
+    print("=" * 70)
+    print(f"BENCHMARKS (commit {run['commit'] or 'unknown'}, best of {args.repeat})")
+    print("=" * 70 + "\n")
+    
+    results = []
+    for scale in scales:
+        start = time.perf_counter()
+        trees = prepare_trees(scale, args.seed, data_dir, args.regenerate)
+        print(f">> {scale} objects (dataset ready in {time.perf_counter() - start:.1f}s)")
+        print(f"  {'Benchmark':<22} {'Seconds':>9} {'us/object':>10} {'per 10x':>8} {'vs last':>9}")
+        
+        for name in names:
+            tree_kind, setup, bench = BENCHMARKS[name]
+            seconds = run_benchmark(trees[tree_kind], setup, bench, args.repeat)
+            result = dict(run, scale=scale, benchmark=name, seconds=round(seconds, 4))
+            results.append(result)
+            
+            growth = ''
+            smaller = [r for r in results if r['benchmark'] == name and r['scale'] < scale]
+            if smaller and smaller[-1]['seconds'] > 0:
+                decades = math.log10(scale / smaller[-1]['scale'])
+                growth = f"{(seconds / smaller[-1]['seconds']) ** (1 / decades):.1f}"
+            
+            delta = ''
+            flag = ''
+            last = previous.get((scale, args.seed, name))
+            if last and last['seconds'] > 0:
+                change = seconds / last['seconds'] - 1
+                delta = f"{change:+.0%}"
+                if change > REGRESSION_THRESHOLD:
+                    flag = f"  [!] slower than {last.get('commit') or 'last run'}"
+            
+            print(f"  {name:<22} {seconds:>9.3f} {seconds / scale * 1e6:>10.1f} {growth:>8} {delta:>9}{flag}")
+        print()
+    
+    append_history(results, history_path)
+    
+    print("=" * 70)
+    print(f"✓ {len(results)} results appended to {history_path}")
+    print("=" * 70)
+
+if __name__ == '__main__':
+    main()
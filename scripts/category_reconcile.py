@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Reconcile wiki category membership against objectjsons metadata.
+
+Pulls list=categorymembers for Category:Objects and every
+"<Difficulty> Objects", "<Realm> Objects" and "<Area> Objects" category (a
+few dozen paginated calls, no individual page fetches) and joins the result
+in memory against the categories each object's page should carry.
+
+Reports:
+- missing: the page is not in a category its metadata expects
+- extra: the page is in a tracked category its metadata does not expect
+- mismatched: the page sits in a different difficulty/realm/area category
+  than the metadata (e.g. "Hard Objects" instead of "Easy Objects")
+- unknown: pages in Category:Objects with no local metadata
+- absent: objects whose page is in none of the tracked categories
+
+With --dump, memberships are read from the [[Category:...]] links of each
+page in a MediaWiki XML dump instead of the API.
+
+Usage: python category_reconcile.py [--realm NAME] [--dump DUMP.xml] [--json report.json]
+"""
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+import profiler
+from extract_rbxlx import load_replacements
+from realm_index import load_realm_index
+from wiki_dump import MAIN_NAMESPACE, iter_dump_pages, normalize_title
+
+METADATA_DIR = Path('metadata/objectjsons')
+
+def category_realm(realm: str) -> str:
+    """Realm name as used in category names (matches wiki_template_generator)."""
+    return load_realm_index().wiki_name(realm)
+
+def expected_categories(obj: Dict, realm: str) -> Dict[str, str]:
+    """
+    Categories an object's page should be in.
+    
+    Returns:
+        Dictionary of family (objects, difficulty, area, realm) -> category name
+    """
+    expected = {'objects': 'Objects'}
+    if obj.get('difficulty'):
+        expected['difficulty'] = f"{obj['difficulty']} Objects"
+    if obj.get('area'):
+        expected['area'] = f"{obj['area']} Objects"
+    expected['realm'] = f'{category_realm(realm)} Objects'
+    return expected
+
+def tracked_categories(metadata_dir: Path = METADATA_DIR) -> Dict[str, str]:
+    """
+    Every category to pull, with its family.
+    
+    Returns:
+        Dictionary of category name -> family
+    """
+    categories = {'Objects': 'objects'}
+    
+    with open('metadata/difficulties.json', 'r', encoding='utf-8') as f:
+        for difficulty in json.load(f).get('difficulties', []):
+            if difficulty.get('name'):
+                categories[f"{difficulty['name']} Objects"] = 'difficulty'
+    
+    with open('metadata/realms.json', 'r', encoding='utf-8') as f:
+        realms_data = json.load(f)
+    for area in realms_data.get('areas', []):
+        if isinstance(area, dict) and area.get('label'):
+            categories[f"{area['label']} Objects"] = 'area'
+    
+    for json_file in metadata_dir.glob('*.json'):
+        with open(json_file, 'r', encoding='utf-8') as f:
+            if not json.load(f):
+                # Empty leftover realm files have no category on the wiki
+                continue
+        categories.setdefault(f'{category_realm(json_file.stem)} Objects', 'realm')
+    
+    return categories
+
+def load_metadata_index(realm_filter: Optional[str] = None) -> Dict[str, Dict]:
+    """
+    Index objects by page title.
+    
+    Returns:
+        Dictionary of normalized page title -> {'name', 'realm', 'expected'}
+    """
+    replacements = load_replacements()
+    index = {}
+    
+    for json_file in sorted(METADATA_DIR.glob('*.json')):
+        if realm_filter and json_file.stem != realm_filter:
+            continue
+        with open(json_file, 'r', encoding='utf-8') as f:
+            objects = json.load(f)
+        for name, obj in objects.items():
+            title = normalize_title(replacements.get(name, name))
+            index[title] = {
+                'name': name,
+                'realm': json_file.stem,
+                'expected': expected_categories(obj, json_file.stem),
+            }
+    
+    return index
+
+def fetch_memberships(categories: List[str], api=None) -> Dict[str, Set[str]]:
+    """
+    Pull category members from the wiki.
+    
+    Returns:
+        Dictionary of normalized page title -> set of tracked categories
+    """
+    if api is None:
+        from wiki_api import WikiAPI
+        api = WikiAPI()
+    
+    memberships = {}
+    for category in categories:
+        for title in api.category_members(category):
+            memberships.setdefault(normalize_title(title), set()).add(category)
+    
+    print(f"Pulled {len(categories)} categories in {api.requests} requests")
+    return memberships
+
+def read_dump_memberships(dump_path: Path, categories: List[str]) -> Dict[str, Set[str]]:
+    """
+    Read category memberships from the category links in a dump.
+    
+    Returns:
+        Dictionary of normalized page title -> set of tracked categories
+    """
+    tracked = {normalize_title(c): c for c in categories}
+    link = re.compile(r'\[\[\s*Category\s*:\s*([^\]|]+)', re.IGNORECASE)
+    
+    memberships = {}
+    for page in iter_dump_pages(dump_path, {MAIN_NAMESPACE}):
+        if page['redirect'] or not page['revisions']:
+            continue
+        found = {tracked[normalize_title(m)] for m in link.findall(page['revisions'][-1]['text'])
+                 if normalize_title(m) in tracked}
+        if found:
+            memberships[normalize_title(page['title'])] = found
+    
+    return memberships
+
+def reconcile(index: Dict[str, Dict], memberships: Dict[str, Set[str]],
+              categories: Dict[str, str], realm_filter: Optional[str] = None) -> Dict:
+    """
+    Join wiki memberships against the metadata index.
+    
+    Returns:
+        Report with missing, extra, mismatched, unknown and absent lists
+    """
+    report = {'missing': [], 'extra': [], 'mismatched': [], 'unknown': [], 'absent': []}
+    
+    for title, entry in sorted(index.items()):
+        actual = memberships.get(title)
+        if not actual:
+            report['absent'].append({'name': entry['name'], 'realm': entry['realm']})
+            continue
+        
+        expected = entry['expected']
+        expected_set = set(expected.values())
+        missing = expected_set - actual
+        extra = actual - expected_set
+        
+        # A missing and an extra category of the same family is a mismatch
+        for family, category in expected.items():
+            if category not in missing:
+                continue
+            wrong = sorted(c for c in extra if categories.get(c) == family)
+            if wrong:
+                report['mismatched'].append({
+                    'name': entry['name'], 'realm': entry['realm'], 'family': family,
+                    'expected': category, 'actual': wrong,
+                })
+                missing.discard(category)
+                extra.difference_update(wrong)
+        
+        for category in sorted(missing):
+            report['missing'].append({'name': entry['name'], 'realm': entry['realm'], 'category': category})
+        for category in sorted(extra):
+            report['extra'].append({'name': entry['name'], 'realm': entry['realm'], 'category': category})
+    
+    # Unknown pages are only meaningful when every realm was loaded
+    if not realm_filter:
+        report['unknown'] = sorted(t for t, cats in memberships.items()
+                                   if 'Objects' in cats and t not in index)
+    
+    return report
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Reconcile wiki categories with objectjsons.')
+    parser.add_argument('--realm', help='only reconcile this realm')
+    parser.add_argument('--dump', type=Path, help='read memberships from a MediaWiki XML dump')
+    parser.add_argument('--json', type=Path, help='write the report as JSON')
+    profiler.add_argument(parser)
+    args = parser.parse_args()
+    profiler.start('category_reconcile', args.profile)
+    
+    if not METADATA_DIR.exists():
+        print(f"Error: {METADATA_DIR} not found")
+        sys.exit(1)
+    if args.dump and not args.dump.exists():
+        print(f"Error: {args.dump} not found")
+        sys.exit(1)
+    
+    categories = tracked_categories()
+    index = load_metadata_index(args.realm)
+    
+    if args.dump:
+        memberships = read_dump_memberships(args.dump, list(categories))
+    else:
+        memberships = fetch_memberships(sorted(categories))
+    
+    report = reconcile(index, memberships, categories, args.realm)
+    
+    print("=" * 70)
+    print("CATEGORY RECONCILIATION")
+    print("=" * 70 + "\n")
+    
+    for item in report['mismatched']:
+        print(f"  [~] {item['name']} ({item['realm']}): {', '.join(item['actual'])} → {item['expected']}")
+    for item in report['missing']:
+        print(f"  [-] {item['name']} ({item['realm']}): not in {item['category']}")
+    for item in report['extra']:
+        print(f"  [+] {item['name']} ({item['realm']}): unexpected {item['category']}")
+    for title in report['unknown']:
+        print(f"  [?] {title}: in Category:Objects but not in metadata")
+    
+    print(f"\n  Objects checked: {len(index)}")
+    print(f"  Mismatched: {len(report['mismatched'])}")
+    print(f"  Missing: {len(report['missing'])}")
+    print(f"  Extra: {len(report['extra'])}")
+    print(f"  Unknown pages: {len(report['unknown'])}")
+    print(f"  Objects with no tracked category (no page?): {len(report['absent'])}")
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n✓ Wrote report to {args.json}")
+    
+    print("=" * 70)
+
+if __name__ == '__main__':
+    main()
@@ -12,10 +12,14 @@ from pathlib import Path
 from typing import Dict, List, Tuple
 import sys
 
+import profiler
+from http_transport import install_pywikibot
+
 class PageCreator:
     def __init__(self):
         """Initialize with PyWikiBot site connection."""
         try:
+            install_pywikibot()
             self.site = pywikibot.Site(url='https://ftbc.fandom.com/api.php')
         except Exception as e:
             print(f"Error connecting to wiki: {e}")
@@ -51,22 +55,25 @@ class PageCreator:
         if not json_file.exists():
             return [], []
         
-        with open(json_file, 'r', encoding='utf-8') as f:
-            objects = json.load(f)
+        with profiler.phase('load'):
+            with open(json_file, 'r', encoding='utf-8') as f:
+                objects = json.load(f)
         
         with_pages = []
         without_pages = []
         
         total = len(objects)
-        for idx, obj_name in enumerate(sorted(objects.keys()), 1):
-            # Show progress
-            progress = f"\r  Scanning... [{idx}/{total}]"
-            print(progress, end='', flush=True)
-            
-            if self.page_exists(obj_name):
-                with_pages.append(obj_name)
-            else:
-                without_pages.append(obj_name)
+        profiler.count('objects', total)
+        with profiler.phase('fetch'):
+            for idx, obj_name in enumerate(sorted(objects.keys()), 1):
+                # Show progress
+                progress = f"\r  Scanning... [{idx}/{total}]"
+                print(progress, end='', flush=True)
+                
+                if self.page_exists(obj_name):
+                    with_pages.append(obj_name)
+                else:
+                    without_pages.append(obj_name)
         
         print("\r" + " " * 50 + "\r", end='', flush=True)  # Clear progress line
         return with_pages, without_pages
@@ -155,6 +162,7 @@ class PageCreator:
         print(f"{'='*70}\n")
 
 def main():
+    profiler.start('create_pages', profiler.argv_profile())
     try:
         creator = PageCreator()
         creator.interactive_mode()
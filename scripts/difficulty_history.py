@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Reconstruct each object's difficulty timeline from its page revision history.
+
+Every revision of an object page is parsed for the CharacterInfo
+|difficulty= value, and consecutive revisions with the same value are
+collapsed. The result is stored on the object as:
+    
+    "difficultyHistory": [
+        {"difficulty": "Easy", "since": "2023-05-01T12:00:00Z", "revid": 1234},
+        {"difficulty": "Medium", "since": "2024-02-10T08:30:00Z", "revid": 5678}
+    ]
+
+Runs are incremental: the last revid read for each page is kept in
+.cache/difficulty_history.json, and later runs only read newer revisions.
+On the live wiki, the latest revid of every page is first checked in
+batches of 50 titles, and only pages with new revisions have their history
+paged in. With --dump, revisions are read from a full-history XML dump
+instead, with no API calls.
+
+Usage: python difficulty_history.py [--realm NAME] [--dump DUMP.xml] [--full] [--dry-run]
+"""
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import profiler
+from extract_rbxlx import load_replacements
+from metadata_store import read_realm, update_realm
+from wiki_api import WikiAPI
+from wiki_dump import MAIN_NAMESPACE, iter_dump_pages, normalize_title
+
+METADATA_DIR = Path('metadata/objectjsons')
+STATE_PATH = Path('.cache/difficulty_history.json')
+
+# Titles per batched revid query (MediaWiki limit for normal accounts)
+BATCH_SIZE = 50
+
+def parse_difficulty(wikitext: str) -> Optional[str]:
+    """
+    Read the |difficulty= value of a page's CharacterInfo template.
+    
+    Returns:
+        Difficulty name, or None if the page has no difficulty field
+    """
+    match = re.search(r'\|\s*difficulty\s*=([^\n]*)', wikitext)
+    if not match:
+        return None
+    
+    value = match.group(1)
+    bold = re.search(r"'''([^']+)'''", value)
+    if bold:
+        value = bold.group(1)
+    else:
+        # Drop file links and tags, keep plain text up to the next field
+        value = re.sub(r'\[\[File:[^\]]*\]\]|<[^>]+>', '', value).split('|')[0]
+    
+    value = value.strip()
+    return value or None
+
+def extend_timeline(timeline: List[Dict], revisions: List[Dict]) -> int:
+    """
+    Append revisions to a timeline, collapsing repeated difficulties.
+    
+    Args:
+        timeline: Existing timeline (modified in place)
+        revisions: Revisions oldest first, with revid, timestamp and text
+    
+    Returns:
+        Number of entries added
+    """
+    added = 0
+    for revision in revisions:
+        difficulty = parse_difficulty(revision['text'])
+        if not difficulty:
+            continue
+        if timeline and timeline[-1]['difficulty'] == difficulty:
+            continue
+        timeline.append({
+            'difficulty': difficulty,
+            'since': revision['timestamp'],
+            'revid': revision['revid'],
+        })
+        added += 1
+    return added
+
+class WikiHistorySource:
+    """Read revision history through the MediaWiki API (pywikibot)."""
+    
+    def __init__(self, api: Optional[WikiAPI] = None):
+        self.api = api or WikiAPI()
+    
+    @property
+    def requests(self) -> int:
+        return self.api.requests
+    
+    def latest_revids(self, titles: List[str]) -> Dict[str, int]:
+        """Latest revid of each existing page, checked in batches."""
+        latest = self.api.latest_revisions(titles, content=False, batch_size=BATCH_SIZE)
+        return {normalize_title(title): rev['revid'] for title, rev in latest.items()}
+    
+    def revisions_after(self, title: str, after_revid: int) -> List[Dict]:
+        """All revisions of a page newer than `after_revid`, oldest first."""
+        params = {
+            'prop': 'revisions',
+            'titles': title,
+            'rvprop': 'ids|timestamp|content',
+            'rvslots': 'main',
+            'rvdir': 'newer',
+            'rvlimit': 'max',
+        }
+        if after_revid:
+            # rvstartid must be an existing revision of this page; it is included, so dropped below
+            params['rvstartid'] = after_revid
+        
+        revisions = []
+        for query in self.api.query(**params):
+            for page in query.get('pages', []):
+                for rev in page.get('revisions', []):
+                    if rev['revid'] <= after_revid:
+                        continue
+                    slot = rev.get('slots', {}).get('main', {})
+                    revisions.append({
+                        'revid': rev['revid'],
+                        'timestamp': rev.get('timestamp', ''),
+                        'text': slot.get('content', slot.get('*', '')),
+                    })
+        return revisions
+    
+    def new_revisions(self, titles: List[str], state: Dict[str, int]) -> Iterator[tuple]:
+        """Yield (title, revisions) for pages changed since their last seen revid."""
+        latest = self.latest_revids(titles)
+        for title in titles:
+            revid = latest.get(title)
+            if revid is None or revid <= state.get(title, 0):
+                continue
+            yield title, self.revisions_after(title, state.get(title, 0))
+
+class DumpHistorySource:
+    """Read revision history from a full-history XML dump."""
+    
+    def __init__(self, dump_path: Path):
+        self.dump_path = dump_path
+        self.requests = 0
+    
+    def new_revisions(self, titles: List[str], state: Dict[str, int]) -> Iterator[tuple]:
+        """Yield (title, revisions) for pages with revisions newer than their last seen revid."""
+        wanted = set(titles)
+        for page in iter_dump_pages(self.dump_path, {MAIN_NAMESPACE}, history=True):
+            title = normalize_title(page['title'])
+            if title not in wanted:
+                continue
+            last_seen = state.get(title, 0)
+            revisions = [r for r in page['revisions'] if r['revid'] > last_seen]
+            if revisions:
+                yield title, revisions
+
+def load_state() -> Dict[str, int]:
+    """Load the last seen revid per page title."""
+    if not STATE_PATH.exists():
+        return {}
+    try:
+        with open(STATE_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_state(state: Dict[str, int]):
+    """Persist the last seen revid per page title."""
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(STATE_PATH, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, ensure_ascii=False, sort_keys=True)
+
+def update_histories(source, realm_filter: Optional[str] = None, full: bool = False,
+                     dry_run: bool = False) -> Dict[str, int]:
+    """
+    Mine new revisions and extend every object's difficultyHistory.
+    
+    Args:
+        source: WikiHistorySource or DumpHistorySource
+        realm_filter: Only process this realm
+        full: Ignore the last seen revids and rebuild every timeline
+        dry_run: Do not write realm files or state
+    
+    Returns:
+        Summary counts (pages, revisions, entries, objects)
+    """
+    replacements = load_replacements()
+    state = {} if full else load_state()
+    
+    realm_files = {}
+    # page title -> [(realm, object name)]
+    titles = {}
+    for json_file in sorted(METADATA_DIR.glob('*.json')):
+        if realm_filter and json_file.stem != realm_filter:
+            continue
+        objects, _ = read_realm(json_file)
+        realm_files[json_file.stem] = (json_file, objects)
+        for name in objects:
+            title = normalize_title(replacements.get(name, name))
+            titles.setdefault(title, []).append((json_file.stem, name))
+    
+    summary = {'pages': 0, 'revisions': 0, 'entries': 0, 'objects': 0}
+    # realm -> object name -> new timeline
+    timelines = {}
+    
+    for title, revisions in source.new_revisions(sorted(titles), state):
+        if not revisions:
+            # Deleted or suppressed since the latest revids were checked
+            continue
+        summary['pages'] += 1
+        summary['revisions'] += len(revisions)
+        
+        for realm_name, name in titles[title]:
+            obj = realm_files[realm_name][1][name]
+            timeline = [] if full else obj.get('difficultyHistory', [])
+            added = extend_timeline(timeline, revisions)
+            if added or full:
+                obj['difficultyHistory'] = timeline
+                summary['entries'] += added
+                summary['objects'] += 1
+                timelines.setdefault(realm_name, {})[name] = timeline
+                print(f"  [OK] {name}: {' → '.join(e['difficulty'] for e in timeline)}")
+        
+        state[title] = revisions[-1]['revid']
+    
+    if not dry_run:
+        for realm_name, realm_timelines in sorted(timelines.items()):
+            # Only the timelines are written back, onto the file as it is now
+            def set_timelines(objects: Dict) -> bool:
+                for name, timeline in realm_timelines.items():
+                    if name in objects:
+                        objects[name]['difficultyHistory'] = timeline
+                return True
+            
+            update_realm(realm_files[realm_name][0], set_timelines)
+        save_state(state)
+    
+    return summary
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Build difficulty timelines from page history.')
+    parser.add_argument('--realm', help='only process this realm')
+    parser.add_argument('--dump', type=Path, help='read a full-history XML dump instead of the API')
+    parser.add_argument('--full', action='store_true', help='ignore last seen revids and rebuild')
+    parser.add_argument('--dry-run', action='store_true', help='do not write any files')
+    profiler.add_argument(parser)
+    args = parser.parse_args()
+    profiler.start('difficulty_history', args.profile)
+    
+    if not METADATA_DIR.exists():
+        print(f"Error: {METADATA_DIR} not found")
+        sys.exit(1)
+    if args.dump and not args.dump.exists():
+        print(f"Error: {args.dump} not found")
+        sys.exit(1)
+    
+    source = DumpHistorySource(args.dump) if args.dump else WikiHistorySource()
+    
+    print("=" * 70)
+    print("DIFFICULTY HISTORY")
+    print("=" * 70 + "\n")
+    
+    summary = update_histories(source, args.realm, args.full, args.dry_run)
+    
+    print(f"\n  Pages with new revisions: {summary['pages']}")
+    print(f"  Revisions read: {summary['revisions']}")
+    print(f"  Timeline entries added: {summary['entries']} ({summary['objects']} objects)")
+    if isinstance(source, WikiHistorySource):
+        print(f"  API requests: {source.requests}")
+    print("=" * 70)
+
+if __name__ == '__main__':
+    main()
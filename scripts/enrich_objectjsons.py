@@ -8,30 +8,44 @@ Adds:
 - Auto-generated categories
 - Wiki section placeholders
 - Extracted colors from gradients
+
+Enrichment is incremental. Each object is fingerprinted from the inputs
+enrichment reads (realm, difficulty, area) plus the reference data for its
+realm and difficulty, and only objects whose fingerprint changed are
+re-enriched; realmData, difficultyInfo and the generated categories are
+then rebuilt, so a change in realms.json or difficulties.json reaches every
+affected object. Fingerprints and each file's size and mtime are kept in
+.cache/enrich_state.json: while the reference data is unchanged, realm
+files that were not modified since the last run are not even read. With
+--realm only the given realm files are enriched.
+
+Realm files are processed across a process pool.
+
+Usage: python enrich_objectjsons.py [--full] [--workers N] [--realm NAME ...]
 """
 
+import argparse
+import hashlib
 import json
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+import profiler
+from metadata_store import file_lock, realm_lock, update_realm
+from realm_index import load_realm_index
+
+METADATA_DIR = Path('metadata/objectjsons')
+STATE_PATH = Path('.cache/enrich_state.json')
+
+# Bump when enrichment output changes so every object is re-enriched
+ENRICH_VERSION = 2
 
 def load_realms_data():
-    """Load realm metadata from realms.json and flatten it by realm label"""
-    realms_path = Path('metadata/realms.json')
-    with open(realms_path, 'r', encoding='utf-8') as f:
-        realms_by_type = json.load(f)
-    
-    # Flatten all realms into a dict keyed by label
-    realms_flat = {}
-    for realm_type, realm_list in realms_by_type.items():
-        if isinstance(realm_list, list):
-            for realm in realm_list:
-                if isinstance(realm, dict):
-                    label = realm.get('label', '')
-                    if label:
-                        realms_flat[label] = realm
-    
-    return realms_flat
+    """Realm style keyed by realm label and realm file name (see realm_index.py)"""
+    return load_realm_index().realm_styles()
 
 def load_difficulties_data():
     """Load difficulty metadata from difficulties.json"""
@@ -58,7 +72,7 @@ def extract_colors_from_gradient(gradient: str) -> List[str]:
     
     Args:
         gradient: CSS gradient string
-        
+    
     Returns:
         List of hex color codes found in the gradient
     """
@@ -71,98 +85,228 @@ def extract_colors_from_gradient(gradient: str) -> List[str]:
     
     return colors
 
-def enrich_objectjsons():
-    """Enrich all objectjsons files with wiki-ready structure"""
-    metadata_dir = Path('metadata/objectjsons')
+def _digest(value) -> str:
+    return hashlib.sha1(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()
+
+def load_reference() -> Dict:
+    """
+    Reference data shared by every worker.
     
-    # Load reference data
-    realms_data = load_realms_data()
-    difficulties_data = load_difficulties_data()
+    Returns:
+        Dictionary with realms, difficulties, their per-entry digests, the
+        category prefixes enrichment generates, and an overall version
+    """
+    realms = load_realms_data()
+    difficulties = load_difficulties_data()
     
-    print("Enriching objectjsons for wiki readiness...\n")
+    # Categories built from these names are regenerated, anything else is kept
+    generated = set(realms) | set(difficulties) | set(load_realm_index().areas())
+    generated.update(json_file.stem for json_file in METADATA_DIR.glob('*.json'))
     
-    total_enriched = 0
+    reference = {
+        'realms': realms,
+        'difficulties': difficulties,
+        'realm_digests': {label: _digest(realm) for label, realm in realms.items()},
+        'difficulty_digests': {name: _digest(diff) for name, diff in difficulties.items()},
+        'generated': sorted(generated),
+    }
+    reference['version'] = _digest([ENRICH_VERSION, reference['realm_digests'],
+                                    reference['difficulty_digests'], reference['generated']])
+    return reference
+
+def object_fingerprint(obj: Dict, realm_name: str, reference: Dict) -> str:
+    """Fingerprint of everything enrichment reads for one object."""
+    difficulty = obj.get('difficulty', '')
+    return _digest([
+        ENRICH_VERSION,
+        realm_name,
+        difficulty,
+        obj.get('area', ''),
+        reference['realm_digests'].get(realm_name),
+        reference['difficulty_digests'].get(difficulty),
+    ])
+
+def build_realm_data(realm_name: str, reference: Dict) -> Dict:
+    """realmData for every object of a realm."""
+    realm_info = reference['realms'].get(realm_name, {})
+    gradient = realm_info.get('gradient', '')
+    return {
+        'label': realm_info.get('label', realm_name),
+        'icon': realm_info.get('icon', ''),
+        'link': realm_info.get('link', realm_name.replace(' ', '_')),
+        'image': realm_info.get('image', ''),
+        'colors': extract_colors_from_gradient(gradient),
+        'gradient': gradient,
+        'accent': realm_info.get('accent', '#ffffff')
+    }
+
+def enrich_object(obj_data: Dict, realm_name: str, realm_data: Dict, reference: Dict, generated: set):
+    """Rebuild the derived fields of one object in place."""
+    obj_data['realmData'] = dict(realm_data, colors=list(realm_data['colors']))
     
-    for json_file in sorted(metadata_dir.glob('*.json')):
-        realm_name = json_file.stem
-        
-        # Load objects for this realm
-        with open(json_file, 'r', encoding='utf-8') as f:
-            objects = json.load(f)
-        
-        # Enrich each object
+    difficulty = obj_data.get('difficulty', '')
+    diff_data = reference['difficulties'].get(difficulty, {})
+    obj_data['difficultyInfo'] = {
+        'icon': diff_data.get('icon', f'{difficulty}.png'),
+        'color': diff_data.get('hex', diff_data.get('color', '#ffffff'))
+    }
+    
+    obj_data.setdefault('images', [])
+    obj_data.setdefault('previousDifficulties', [])
+    obj_data.setdefault('wiki', {'info': '', 'obtaining': ''})
+    
+    # Generated categories first, then any categories added by hand
+    categories = ['Objects']
+    if difficulty:
+        categories.append(f'{difficulty} Objects')
+    if obj_data.get('area'):
+        categories.append(f"{obj_data['area']} Objects")
+    categories.append(f'{realm_name} Objects')
+    
+    existing = obj_data.get('categories') or []
+    kept = [c for c in existing
+            if c not in categories and not (c.endswith(' Objects') and c[:-len(' Objects')] in generated)]
+    if set(existing) != set(categories + kept):
+        obj_data['categories'] = categories + kept
+
+def enrich_realm_file(json_file: str, reference: Dict, fingerprints: Dict[str, str]) -> Dict:
+    """
+    Enrich the changed objects of one realm file. Runs in a worker process.
+    
+    Args:
+        json_file: Realm file path
+        reference: Output of load_reference()
+        fingerprints: Object name -> fingerprint from the last run
+    
+    Returns:
+        Dictionary with 'fingerprints', 'enriched' (count), 'total', 'written'
+        and the file's 'mtime_ns' and 'size' after this run
+    """
+    path = Path(json_file)
+    realm_name = path.stem
+    generated = set(reference['generated'])
+    
+    realm_data = build_realm_data(realm_name, reference)
+    
+    result = {}
+    
+    def enrich(objects: Dict) -> int:
+        current = {}
+        enriched = 0
+        # Fingerprints only vary with difficulty and area within a realm file
+        known = {}
         for obj_name, obj_data in objects.items():
-            # Get realm data
-            realm_info = realms_data.get(realm_name, {})
-            
-            # Add realmData with colors extracted from gradient
-            if 'realmData' not in obj_data:
-                gradient = realm_info.get('gradient', '')
-                colors = extract_colors_from_gradient(gradient)
-                
-                obj_data['realmData'] = {
-                    'label': realm_info.get('label', realm_name),
-                    'icon': realm_info.get('icon', ''),
-                    'link': realm_info.get('link', realm_name.replace(' ', '_')),
-                    'image': realm_info.get('image', ''),
-                    'colors': colors,
-                    'gradient': gradient,
-                    'accent': realm_info.get('accent', '#ffffff')
-                }
-            else:
-                # Update colors even if realmData exists
-                gradient = obj_data['realmData'].get('gradient', '')
-                if not obj_data['realmData'].get('colors'):
-                    colors = extract_colors_from_gradient(gradient)
-                    obj_data['realmData']['colors'] = colors
-            
-            # Add difficulty info
-            if 'difficultyInfo' not in obj_data:
-                difficulty = obj_data.get('difficulty', '')
-                diff_data = difficulties_data.get(difficulty, {})
-                
-                obj_data['difficultyInfo'] = {
-                    'icon': diff_data.get('icon', f'{difficulty}.png'),
-                    'color': diff_data.get('color', '#ffffff')
-                }
-            
-            # Add images array if not present
-            if 'images' not in obj_data:
-                obj_data['images'] = []
-            
-            # Add previous difficulties if not present
-            if 'previousDifficulties' not in obj_data:
-                obj_data['previousDifficulties'] = []
-            
-            # Auto-generate categories if not present
-            if 'categories' not in obj_data:
-                categories = ['Objects']
-                
-                # Add difficulty category
-                if difficulty:
-                    categories.append(f'{difficulty} Objects')
-                
-                # Add realm category
-                categories.append(f'{realm_name} Objects')
-                
-                obj_data['categories'] = categories
-            
-            # Add wiki sections if not present
-            if 'wiki' not in obj_data:
-                obj_data['wiki'] = {
-                    'info': '',
-                    'obtaining': ''
-                }
-        
-        # Save enriched objects
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(objects, f, indent=2, ensure_ascii=False)
+            key = (obj_data.get('difficulty', ''), obj_data.get('area', ''))
+            if key not in known:
+                known[key] = object_fingerprint(obj_data, realm_name, reference)
+            fingerprint = known[key]
+            current[obj_name] = fingerprint
+            if fingerprints.get(obj_name) != fingerprint:
+                enrich_object(obj_data, realm_name, realm_data, reference, generated)
+                enriched += 1
+        result.update(fingerprints=current, enriched=enriched, total=len(objects))
+        return enriched
+    
+    # The file is stat'ed under the same lock, so a later write by another tool is not taken as enriched
+    with realm_lock(path):
+        update_realm(path, enrich)
+        stat = path.stat()
+    
+    return dict(result, written=bool(result['enriched']), mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+
+def load_state() -> Dict:
+    """Load the fingerprints of the last run."""
+    if not STATE_PATH.exists():
+        return {}
+    try:
+        with open(STATE_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_state(state: Dict):
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(STATE_PATH, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+
+def enrich_objectjsons(full: bool = False, max_workers: Optional[int] = None,
+                       realms: Optional[List[str]] = None):
+    """
+    Enrich all objectjsons files with wiki-ready structure.
+    
+    Args:
+        full: Ignore saved fingerprints and re-enrich every object
+        max_workers: Process pool size (default: CPU count)
+        realms: Only these realm files (default: all)
+    """
+    with profiler.phase('load'):
+        reference = load_reference()
+        state = {} if full else load_state()
+    
+    files_state = state.get('files', {})
+    
+    print("Enriching objectjsons for wiki readiness...\n")
+    
+    pending = []
+    skipped = {}
+    for json_file in sorted(METADATA_DIR.glob('*.json')):
+        if realms and json_file.stem not in realms:
+            continue
+        stat = json_file.stat()
+        cached = files_state.get(json_file.name)
+        if (cached and cached.get('version') == reference['version']
+                and cached['mtime_ns'] == stat.st_mtime_ns and cached['size'] == stat.st_size):
+            skipped[json_file.name] = cached
+        else:
+            pending.append(json_file)
+    
+    results = {}
+    with profiler.phase('enrich'):
+        args = [(str(json_file), reference, files_state.get(json_file.name, {}).get('objects', {}))
+                for json_file in pending]
+        if len(pending) > 1 and (max_workers or os.cpu_count() or 1) > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {json_file.name: executor.submit(enrich_realm_file, *arg)
+                           for json_file, arg in zip(pending, args)}
+                results = {name: future.result() for name, future in futures.items()}
+        else:
+            results = {json_file.name: enrich_realm_file(*arg) for json_file, arg in zip(pending, args)}
+    
+    total_enriched = 0
+    total_objects = sum(len(entry['objects']) for entry in skipped.values())
+    new_files = {}
+    with profiler.phase('write'):
+        for json_file in pending:
+            result = results[json_file.name]
+            new_files[json_file.name] = {'version': reference['version'], 'mtime_ns': result['mtime_ns'],
+                                         'size': result['size'], 'objects': result['fingerprints']}
+            total_enriched += result['enriched']
+            total_objects += result['total']
+            print(f"[OK] {json_file.stem:<40} [{result['enriched']}/{result['total']} objects enriched]")
         
-        enriched_count = len(objects)
-        total_enriched += enriched_count
-        print(f"[OK] {realm_name:<40} [{enriched_count} objects enriched]")
+        # Runs for other realms may save at the same time: merge into the latest state
+        with file_lock('enrich_state'):
+            files = {} if full else load_state().get('files', {})
+            files.update(skipped)
+            files.update(new_files)
+            existing = {json_file.name for json_file in METADATA_DIR.glob('*.json')}
+            save_state({'files': {name: entry for name, entry in files.items() if name in existing}})
+    
+    profiler.count('objects', total_objects)
+    print(f"\n✓ Enriched {total_enriched} of {total_objects} objects "
+          f"({len(skipped)} unchanged realm files skipped)")
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Enrich objectjsons with wiki-ready structure.')
+    parser.add_argument('--full', action='store_true', help='re-enrich every object')
+    parser.add_argument('--workers', type=int, help='worker processes (default: CPU count)')
+    parser.add_argument('--realm', action='append', help='only enrich this realm (repeatable)')
+    profiler.add_argument(parser)
+    args = parser.parse_args()
+    profiler.start('enrich_objectjsons', args.profile)
     
-    print(f"\n✓ All objectjsons enriched! ({total_enriched} total objects)")
+    enrich_objectjsons(args.full, args.workers, args.realm)
 
 if __name__ == '__main__':
-    enrich_objectjsons()
+    main()
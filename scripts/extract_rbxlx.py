@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+Streaming extractor that turns .rbxlx place files into base objectjsons.
+
+Walks the place XML with xml.etree.ElementTree.iterparse, keeping only the
+stack of currently open <Item> elements. Every finished element is cleared
+and detached from its parent, so memory stays flat regardless of place size.
+
+An object is any Item carrying a difficulty, either as an attribute
+(AttributesSerialize) or as a child value object (e.g. a StringValue named
+"Difficulty"). Descriptions are read the same way from "Description" or
+"Hint". The realm is the nearest ancestor folder whose name matches a known
+realm (objectjsons file or realms.json label), falling back to the
+outermost folder below the service.
+
+Part positions are recorded, and parts named after a realms.json area inside
+an "Areas"/"Zones" folder are read as area regions. Objects are then tagged
+with the area containing them through a grid index (see area_index.py).
+
+Objects are written in the base objectjsons schema (name, difficulty,
+description, realm), keyed by their rbxlx name like every realm file; tools
+that need the wiki title map it through replacements.json themselves.
+Existing entries keep their enriched fields.
+
+Usage: python extract_rbxlx.py PLACE.rbxlx [--realm NAME] [--output-dir DIR] [--dry-run]
+"""
+
+import argparse
+import base64
+import json
+import os
+import resource
+import struct
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import profiler
+from area_index import assign_areas, bounding_box, load_areas
+from metadata_store import update_realm
+
+METADATA_DIR = Path('metadata/objectjsons')
+
+DIFFICULTY_KEYS = ('Difficulty',)
+DESCRIPTION_KEYS = ('Description', 'Hint')
+
+# Classes whose Name/Value pair is read as a property of the parent Item
+VALUE_CLASSES = {'StringValue', 'IntValue', 'NumberValue'}
+
+# Classes that can act as realm folders
+FOLDER_CLASSES = {'Folder', 'Model'}
+
+# Top-level service classes (realm folders sit below these)
+SERVICE_CLASSES = {'Workspace', 'ReplicatedStorage', 'ServerStorage', 'Lighting'}
+
+STRING_TAGS = {'string', 'ProtectedString'}
+
+# Folders whose parts are read as area regions
+AREA_CONTAINERS = {'areas', 'zones'}
+
+ROTATION_KEYS = ('R00', 'R01', 'R02', 'R10', 'R11', 'R12', 'R20', 'R21', 'R22')
+
+def parse_attributes(blob: bytes) -> Dict[str, object]:
+    """
+    Decode a Roblox AttributesSerialize blob.
+    
+    Only string, bool and number values are returned; parsing stops at the
+    first type that is not understood.
+    
+    Args:
+        blob: Raw (base64-decoded) attribute bytes
+    
+    Returns:
+        Dictionary of attribute name -> value
+    """
+    attributes = {}
+    if len(blob) < 4:
+        return attributes
+    
+    # type id -> fixed payload size for types that are skipped
+    skip_sizes = {0x05: 4, 0x09: 8, 0x0E: 4, 0x0F: 12, 0x10: 8, 0x11: 12, 0x1C: 8, 0x1D: 16}
+    
+    try:
+        count, = struct.unpack_from('<I', blob, 0)
+        offset = 4
+        for _ in range(count):
+            key_len, = struct.unpack_from('<I', blob, offset)
+            offset += 4
+            key = blob[offset:offset + key_len].decode('utf-8', errors='replace')
+            offset += key_len
+            value_type = blob[offset]
+            offset += 1
+            
+            if value_type == 0x02:
+                value_len, = struct.unpack_from('<I', blob, offset)
+                offset += 4
+                attributes[key] = blob[offset:offset + value_len].decode('utf-8', errors='replace')
+                offset += value_len
+            elif value_type == 0x03:
+                attributes[key] = blob[offset] != 0
+                offset += 1
+            elif value_type == 0x06:
+                attributes[key], = struct.unpack_from('<d', blob, offset)
+                offset += 8
+            elif value_type in skip_sizes:
+                offset += skip_sizes[value_type]
+            else:
+                break
+    except (struct.error, IndexError):
+        pass
+    
+    return attributes
+
+def load_replacements() -> Dict[str, str]:
+    """Load replacements.json (rbxlx name -> official name), if present."""
+    path = Path('metadata/replacements.json')
+    if not path.exists():
+        return {}
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def load_known_realms(metadata_dir: Path = METADATA_DIR) -> Dict[str, str]:
+    """
+    Collect known realm names for matching folder names.
+    
+    Returns:
+        Dictionary of casefolded name -> realm file name
+    """
+    known = {}
+    
+    realms_path = Path('metadata/realms.json')
+    if realms_path.exists():
+        with open(realms_path, 'r', encoding='utf-8') as f:
+            realms_data = json.load(f)
+        for realm in realms_data.get('normal', []):
+            if isinstance(realm, dict) and realm.get('label'):
+                known[realm['label'].casefold()] = realm['label']
+        for realm_list in realms_data.get('subrealms', {}).values():
+            for realm in realm_list:
+                if isinstance(realm, dict) and realm.get('label'):
+                    known[realm['label'].casefold()] = realm['label']
+    
+    # Existing realm files win over realms.json labels
+    for json_file in Path(metadata_dir).glob('*.json'):
+        known[json_file.stem.casefold()] = json_file.stem
+    
+    return known
+
+class _Frame:
+    """State for one open <Item> element."""
+    
+    __slots__ = ('cls', 'name', 'value', 'props', 'element', 'position', 'rotation', 'size')
+    
+    def __init__(self, cls: str, element):
+        self.cls = cls
+        self.name = None
+        self.value = None
+        self.props = {}
+        self.element = element
+        self.position = None
+        self.rotation = None
+        self.size = None
+
+def _read_floats(elem, keys) -> Optional[tuple]:
+    """Read float children (e.g. X/Y/Z) of a property element."""
+    try:
+        return tuple(float(elem.findtext(k)) for k in keys)
+    except (TypeError, ValueError):
+        return None
+
+def iter_objects(place_path: Path, known_realms: Dict[str, str],
+                 realm_override: Optional[str] = None,
+                 areas: Optional[Dict[str, Dict]] = None) -> Iterator[Dict]:
+    """
+    Stream object and area-region records out of a place file.
+    
+    Args:
+        place_path: Path to the .rbxlx file
+        known_realms: Casefolded realm name -> realm file name
+        realm_override: Assign every object to this realm
+        areas: Casefolded area label -> {'label', 'parent'} (from realms.json)
+    
+    Yields:
+        Objects: {'kind': 'object', rbxlx_name, difficulty, description, realm, _position}
+        Areas: {'kind': 'area', label, parent, min, max}
+    """
+    areas = areas or {}
+    stack: List[_Frame] = []
+    in_properties = False
+    
+    for event, elem in ET.iterparse(str(place_path), events=('start', 'end')):
+        tag = elem.tag
+        
+        if event == 'start':
+            if tag == 'Item':
+                stack.append(_Frame(elem.get('class', ''), elem))
+            elif tag == 'Properties':
+                in_properties = True
+            continue
+        
+        if tag == 'Properties':
+            in_properties = False
+            if stack:
+                stack[-1].element.remove(elem)
+            continue
+        
+        if in_properties and stack:
+            frame = stack[-1]
+            prop = elem.get('name')
+            if tag in STRING_TAGS and prop == 'Name':
+                frame.name = elem.text or ''
+            elif prop == 'Value' and frame.cls in VALUE_CLASSES:
+                frame.value = elem.text or ''
+            elif tag == 'BinaryString' and prop == 'AttributesSerialize' and elem.text:
+                try:
+                    frame.props.update(parse_attributes(base64.b64decode(elem.text)))
+                except ValueError:
+                    pass
+            elif tag == 'CoordinateFrame' and prop == 'CFrame':
+                frame.position = _read_floats(elem, ('X', 'Y', 'Z'))
+                frame.rotation = _read_floats(elem, ROTATION_KEYS)
+            elif tag == 'Vector3' and prop in ('size', 'Size'):
+                frame.size = _read_floats(elem, ('X', 'Y', 'Z'))
+            continue
+        
+        if tag != 'Item':
+            # Free large blocks outside the item tree (e.g. SharedStrings)
+            if not stack:
+                elem.clear()
+            continue
+        
+        if not stack:
+            continue
+        
+        frame = stack.pop()
+        
+        if frame.cls in VALUE_CLASSES and stack and frame.name:
+            stack[-1].props.setdefault(frame.name, frame.value)
+        else:
+            difficulty = next((frame.props[k] for k in DIFFICULTY_KEYS if frame.props.get(k)), None)
+            if difficulty is not None and frame.name:
+                description = next((frame.props[k] for k in DESCRIPTION_KEYS if frame.props.get(k)), '')
+                yield {
+                    'kind': 'object',
+                    'rbxlx_name': frame.name,
+                    'difficulty': difficulty,
+                    'description': str(description).strip(),
+                    'realm': realm_override or _resolve_realm(stack, known_realms),
+                    '_position': frame.position,
+                }
+            elif (frame.name and frame.position and frame.size
+                  and frame.name.casefold() in areas
+                  and any(f.name and f.name.casefold() in AREA_CONTAINERS for f in stack)):
+                low, high = bounding_box(frame.position, frame.size, frame.rotation)
+                yield {
+                    'kind': 'area',
+                    **areas[frame.name.casefold()],
+                    'min': low,
+                    'max': high,
+                }
+            
+            # Models have no CFrame of their own; use their first positioned part
+            if frame.position and stack and stack[-1].position is None and stack[-1].cls == 'Model':
+                stack[-1].position = frame.position
+        
+        # Detach the finished element so the tree never grows
+        if stack:
+            stack[-1].element.remove(elem)
+        else:
+            elem.clear()
+
+def _resolve_realm(stack: List[_Frame], known_realms: Dict[str, str]) -> str:
+    """Pick the realm for an object from its open ancestors."""
+    for frame in reversed(stack):
+        if frame.cls in FOLDER_CLASSES and frame.name:
+            realm = known_realms.get(frame.name.casefold())
+            if realm:
+                return realm
+    
+    for idx, frame in enumerate(stack):
+        if frame.cls in FOLDER_CLASSES and frame.name and (idx == 0 or stack[idx - 1].cls in SERVICE_CLASSES):
+            return frame.name
+    
+    return 'Unknown'
+
+def load_difficulty_lookup() -> Dict[str, str]:
+    """
+    Build a lookup for normalizing difficulty values from the place file.
+    
+    Returns:
+        Dictionary of casefolded name or priority number -> difficulty name
+    """
+    with open('metadata/difficulties.json', 'r', encoding='utf-8') as f:
+        difficulties = json.load(f).get('difficulties', [])
+    
+    lookup = {}
+    for diff in difficulties:
+        name = diff.get('name', '')
+        if name:
+            lookup[name.casefold()] = name
+            if 'priority' in diff:
+                lookup[str(diff['priority'])] = name
+    return lookup
+
+def normalize_difficulty(value, lookup: Dict[str, str]) -> str:
+    """Map a raw difficulty (name in any case, or priority number) to its name."""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value).strip()
+    if text.endswith('.0'):
+        text = text[:-2]
+    return lookup.get(text.casefold(), text)
+
+def iter_realm_batches(place_path: Path, realm_override: Optional[str] = None, batch_size: int = 500,
+                       regions: Optional[List[Dict]] = None) -> Iterator[Tuple[str, Dict[str, Dict]]]:
+    """
+    Stream extracted objects in per-realm batches.
+    
+    Objects keep a '_position' helper field for area assignment.
+    
+    Args:
+        place_path: Path to the .rbxlx file
+        realm_override: Assign every object to this realm
+        batch_size: Objects per batch before it is yielded
+        regions: List that area regions found in the place are appended to
+    
+    Yields:
+        (realm, {object name -> base object data}) tuples; a realm's
+        remaining objects are flushed when the place is finished
+    """
+    known_realms = load_known_realms()
+    difficulties = load_difficulty_lookup()
+    areas = load_areas()
+    
+    pending = {}
+    for record in iter_objects(place_path, known_realms, realm_override, areas):
+        if record.pop('kind') == 'area':
+            if regions is not None:
+                regions.append(record)
+            continue
+        
+        name = record.pop('rbxlx_name')
+        record['difficulty'] = normalize_difficulty(record['difficulty'], difficulties)
+        obj = {'name': name, **record}
+        
+        batch = pending.setdefault(record['realm'], {})
+        batch[name] = obj
+        if len(batch) >= batch_size:
+            yield record['realm'], pending.pop(record['realm'])
+    
+    for realm, batch in pending.items():
+        yield realm, batch
+
+def extract_place(place_path: Path, realm_override: Optional[str] = None) -> Dict[str, Dict[str, Dict]]:
+    """
+    Extract all objects from a place file, grouped by realm.
+    
+    Returns:
+        Dictionary of realm -> {object name -> base object data}
+    """
+    realms = {}
+    regions = []
+    for realm, batch in iter_realm_batches(place_path, realm_override, regions=regions):
+        realms.setdefault(realm, {}).update(batch)
+    
+    assign_areas(realms, regions)
+    return realms
+
+def merge_into_realm_file(json_file: Path, extracted: Dict[str, Dict]) -> int:
+    """
+    Merge extracted base data into a realm file, keeping enriched fields.
+    
+    Returns:
+        Number of objects added or updated
+    """
+    def merge(objects: Dict) -> int:
+        changed = 0
+        for name, base in extracted.items():
+            base = dict(base)
+            base.pop('_position', None)
+            
+            obj = objects.get(name) or {}
+            if any(obj.get(k) != v for k, v in base.items()):
+                old_area = obj.get('area')
+                obj.update(base)
+                
+                # Keep the area category in step with the area
+                categories = obj.get('categories')
+                if isinstance(categories, list):
+                    if old_area and old_area != base.get('area') and f'{old_area} Objects' in categories:
+                        categories.remove(f'{old_area} Objects')
+                    if base.get('area') and f"{base['area']} Objects" not in categories:
+                        categories.append(f"{base['area']} Objects")
+                changed += 1
+            objects[name] = obj
+        
+        return changed
+    
+    return update_realm(json_file, merge, create=True)
+
+def peak_memory_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Extract base objectjsons from .rbxlx place files.')
+    parser.add_argument('place', type=Path, help='.rbxlx place file')
+    parser.add_argument('--realm', help='assign every object to this realm')
+    parser.add_argument('--output-dir', type=Path, default=METADATA_DIR,
+                        help='objectjsons directory to merge into')
+    parser.add_argument('--dry-run', action='store_true', help='extract without writing files')
+    profiler.add_argument(parser)
+    args = parser.parse_args()
+    profiler.start('extract_rbxlx', args.profile)
+    
+    if not args.place.exists():
+        print(f"Error: {args.place} not found")
+        sys.exit(1)
+    
+    size_mb = os.path.getsize(args.place) / (1024 * 1024)
+    print(f"Extracting {args.place.name} ({size_mb:.1f} MB)...\n")
+    
+    start = time.perf_counter()
+    realms = extract_place(args.place, args.realm)
+    elapsed = time.perf_counter() - start
+    
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    total = 0
+    for realm_name, extracted in sorted(realms.items()):
+        total += len(extracted)
+        if args.dry_run:
+            print(f"[--] {realm_name:<40} [{len(extracted)} objects]")
+        else:
+            changed = merge_into_realm_file(args.output_dir / f"{realm_name}.json", extracted)
+            print(f"[OK] {realm_name:<40} [{len(extracted)} objects, {changed} updated]")
+    
+    print(f"\n{'='*70}")
+    print(f"Extracted {total} objects from {len(realms)} realms")
+    print(f"  Parse time: {elapsed:.2f}s ({size_mb / elapsed if elapsed else 0:.1f} MB/s)")
+    print(f"  Peak memory: {peak_memory_mb():.1f} MB")
+    print(f"{'='*70}")
+
+if __name__ == '__main__':
+    main()
@@ -4,11 +4,30 @@ Scan and fix misplaced objects in objectjsons.
 
 Uses main_realm_objects.json as the source of truth for object locations.
 Moves objects to their correct realm files and updates all related fields.
+
+Every realm file is read once, the full move set is planned up front, and
+each touched file is written exactly once. Use --dry-run to print the plan
+without writing anything.
 """
 
+import argparse
 import json
+import re
+from contextlib import ExitStack
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Tuple
+
+import profiler
+from metadata_store import ConflictError, read_realm, realm_lock, realm_version, write_realm
+from realm_index import load_realm_index
+
+METADATA_DIR = Path('metadata/objectjsons')
+
+# Re-plans after another tool changed a realm file mid-run
+PLAN_ATTEMPTS = 3
+
+# (object_name, source_realm, destination_realm)
+Move = Tuple[str, str, str]
 
 def load_main_realm_objects() -> Dict[str, str]:
     """
@@ -32,156 +51,208 @@ def load_main_realm_objects() -> Dict[str, str]:
     
     return obj_to_realm
 
-def load_realms_data() -> Dict[str, Dict]:
-    """Load realm metadata from realms.json"""
-    path = Path('metadata/realms.json')
+def load_replacements() -> Dict[str, str]:
+    """Load replacements.json (rbxlx name -> official name), if present."""
+    path = Path('metadata/replacements.json')
+    if not path.exists():
+        return {}
     
     with open(path, 'r', encoding='utf-8') as f:
-        realms_data = json.load(f)
-    
-    # Flatten all realms
-    realms_map = {}
-    for realm in realms_data.get('normal', []):
-        if isinstance(realm, dict):
-            label = realm.get('label', '')
-            if label:
-                realms_map[label] = realm
-    
-    # Add subrealms
-    for subrealm_type, subrealm_list in realms_data.get('subrealms', {}).items():
-        if isinstance(subrealm_list, list):
-            for realm in subrealm_list:
-                if isinstance(realm, dict):
-                    label = realm.get('label', '')
-                    if label:
-                        realms_map[label] = realm
-    
-    return realms_map
+        return json.load(f)
 
-def scan_for_misplaced() -> Dict[str, List[tuple]]:
+def build_location_index() -> Dict[str, str]:
     """
-    Scan all objectjsons and find misplaced objects.
+    Build the object -> realm index from every canonical source.
+    
+    main_realm_objects.json lists official (wiki) names, while realm files
+    are keyed by rbxlx names, so rbxlx aliases from replacements.json are
+    indexed too.
     
     Returns:
-        Dictionary mapping source_realm -> [(object_name, correct_realm)]
+        Dictionary mapping object name (official or rbxlx) to realm name
     """
-    metadata_dir = Path('metadata/objectjsons')
-    canonical = load_main_realm_objects()
+    index = load_main_realm_objects()
     
-    misplaced = {}
+    for rbxlx_name, official_name in load_replacements().items():
+        if official_name in index and rbxlx_name not in index:
+            index[rbxlx_name] = index[official_name]
     
+    return index
+
+def load_realms_data() -> Dict[str, Dict]:
+    """Realm style keyed by realm label and realm file name (see realm_index.py)"""
+    return load_realm_index().realm_styles()
+
+def load_realm_files(metadata_dir: Path = METADATA_DIR,
+                     versions: Optional[Dict[str, str]] = None) -> Dict[str, Dict]:
+    """
+    Read every realm file exactly once.
+    
+    Args:
+        metadata_dir: Directory of realm files
+        versions: If given, filled with realm name -> file version (see metadata_store)
+    
+    Returns:
+        Dictionary mapping realm name -> objects dict
+    """
+    realm_objects = {}
     for json_file in sorted(metadata_dir.glob('*.json')):
-        realm_name = json_file.stem
-        
-        with open(json_file, 'r', encoding='utf-8') as f:
-            objects = json.load(f)
-        
-        for obj_name in objects.keys():
-            # Check if this object is in main_realm_objects
-            if obj_name in canonical:
-                correct_realm = canonical[obj_name]
-                if realm_name != correct_realm:
-                    if realm_name not in misplaced:
-                        misplaced[realm_name] = []
-                    misplaced[realm_name].append((obj_name, correct_realm))
+        realm_objects[json_file.stem], version = read_realm(json_file)
+        if versions is not None:
+            versions[json_file.stem] = version
+    return realm_objects
+
+def plan_moves(realm_objects: Dict[str, Dict], index: Dict[str, str]) -> List[Move]:
+    """
+    Compute the full move set against the location index.
     
-    return misplaced
+    Args:
+        realm_objects: Realm name -> objects dict (from load_realm_files)
+        index: Object name -> correct realm (from build_location_index)
+    
+    Returns:
+        List of (object_name, source_realm, destination_realm) tuples
+    """
+    moves = []
+    for realm_name, objects in realm_objects.items():
+        for obj_name in objects:
+            correct_realm = index.get(obj_name)
+            if correct_realm and correct_realm != realm_name:
+                moves.append((obj_name, realm_name, correct_realm))
+    return moves
 
-def fix_misplaced_objects():
-    """Fix all misplaced objects by moving them to correct realm files."""
-    metadata_dir = Path('metadata/objectjsons')
-    canonical = load_main_realm_objects()
-    realms_map = load_realms_data()
+def apply_moves(moves: List[Move], realm_objects: Dict[str, Dict],
+                realms_map: Dict[str, Dict]) -> List[str]:
+    """
+    Apply planned moves in memory.
     
-    # Track all objects to move
-    moves = {}  # source_realm -> {object_name -> correct_realm}
+    Destination realms without a file yet are created. When several sources
+    move the same object, the last one in plan order wins.
     
-    for json_file in sorted(metadata_dir.glob('*.json')):
-        realm_name = json_file.stem
+    Returns:
+        Sorted list of realm names whose contents changed
+    """
+    touched = set()
+    
+    for obj_name, source_realm, dest_realm in moves:
+        obj_data = realm_objects[source_realm].pop(obj_name)
         
-        with open(json_file, 'r', encoding='utf-8') as f:
-            objects = json.load(f)
+        # Update realm-related fields
+        obj_data['realm'] = dest_realm
         
-        for obj_name in objects.keys():
-            if obj_name in canonical:
-                correct_realm = canonical[obj_name]
-                if realm_name != correct_realm:
-                    if realm_name not in moves:
-                        moves[realm_name] = {}
-                    moves[realm_name][obj_name] = correct_realm
-    
-    # Execute moves
-    total_moved = 0
-    
-    for source_realm, objects_to_move in moves.items():
-        source_file = metadata_dir / f"{source_realm}.json"
+        # Update realmData
+        if dest_realm in realms_map:
+            realm_info = realms_map[dest_realm]
+            obj_data['realmData'] = {
+                'label': realm_info.get('label', dest_realm),
+                'icon': realm_info.get('icon', ''),
+                'link': realm_info.get('link', dest_realm.replace(' ', '_')),
+                'image': realm_info.get('image', ''),
+                'colors': extract_colors_from_gradient(realm_info.get('gradient', '')),
+                'gradient': realm_info.get('gradient', ''),
+                'accent': realm_info.get('accent', '#ffffff')
+            }
         
-        # Load source realm
-        with open(source_file, 'r', encoding='utf-8') as f:
-            source_objects = json.load(f)
+        # Update categories
+        difficulty = obj_data.get('difficulty', '')
+        area = obj_data.get('area', '')
+        categories = [
+            'Objects',
+            f'{difficulty} Objects' if difficulty else '',
+            f'{area} Objects' if area else '',
+            f'{dest_realm} Objects'
+        ]
+        obj_data['categories'] = [c for c in categories if c]  # Remove empty strings
+        
+        realm_objects.setdefault(dest_realm, {})[obj_name] = obj_data
+        touched.update((source_realm, dest_realm))
+    
+    return sorted(touched)
+
+def write_realm_files(realm_names: List[str], realm_objects: Dict[str, Dict],
+                      metadata_dir: Path = METADATA_DIR,
+                      versions: Optional[Dict[str, str]] = None):
+    """
+    Write each touched realm file exactly once.
+    
+    All touched files are locked first (in sorted order, so concurrent runs
+    cannot deadlock). With versions, nothing is written and ConflictError is
+    raised if any of them changed since load_realm_files().
+    """
+    with ExitStack() as stack:
+        for realm_name in sorted(realm_names):
+            stack.enter_context(realm_lock(metadata_dir / f"{realm_name}.json"))
         
-        # Load destination realms
-        dest_objects = {}
-        for obj_name, dest_realm in objects_to_move.items():
-            if dest_realm not in dest_objects:
-                dest_file = metadata_dir / f"{dest_realm}.json"
-                with open(dest_file, 'r', encoding='utf-8') as f:
-                    dest_objects[dest_realm] = json.load(f)
+        if versions is not None:
+            for realm_name in realm_names:
+                if realm_version(metadata_dir / f"{realm_name}.json") != versions.get(realm_name):
+                    raise ConflictError(f"{realm_name}.json changed while planning moves")
         
-        # Move objects
-        for obj_name, dest_realm in objects_to_move.items():
-            if obj_name in source_objects:
-                obj_data = source_objects[obj_name]
-                
-                # Update realm-related fields
-                obj_data['realm'] = dest_realm
-                
-                # Update realmData
-                if dest_realm in realms_map:
-                    realm_info = realms_map[dest_realm]
-                    obj_data['realmData'] = {
-                        'label': realm_info.get('label', dest_realm),
-                        'icon': realm_info.get('icon', ''),
-                        'link': realm_info.get('link', dest_realm.replace(' ', '_')),
-                        'image': realm_info.get('image', ''),
-                        'colors': extract_colors_from_gradient(realm_info.get('gradient', '')),
-                        'gradient': realm_info.get('gradient', ''),
-                        'accent': realm_info.get('accent', '#ffffff')
-                    }
-                
-                # Update categories
-                difficulty = obj_data.get('difficulty', '')
-                categories = [
-                    'Objects',
-                    f'{difficulty} Objects' if difficulty else '',
-                    f'{dest_realm} Objects'
-                ]
-                obj_data['categories'] = [c for c in categories if c]  # Remove empty strings
-                
-                # Add to destination
-                dest_objects[dest_realm][obj_name] = obj_data
-                
-                # Remove from source
-                del source_objects[obj_name]
-                
-                total_moved += 1
-                print(f"  ✓ {obj_name}: {source_realm} → {dest_realm}")
+        for realm_name in realm_names:
+            write_realm(metadata_dir / f"{realm_name}.json", realm_objects[realm_name])
+
+def scan_for_misplaced() -> Dict[str, List[tuple]]:
+    """
+    Scan all objectjsons and find misplaced objects.
+    
+    Returns:
+        Dictionary mapping source_realm -> [(object_name, correct_realm)]
+    """
+    moves = plan_moves(load_realm_files(), build_location_index())
+    
+    misplaced = {}
+    for obj_name, source_realm, dest_realm in moves:
+        misplaced.setdefault(source_realm, []).append((obj_name, dest_realm))
+    
+    return misplaced
+
+def fix_misplaced_objects(dry_run: bool = False) -> int:
+    """
+    Fix all misplaced objects by moving them to correct realm files.
+    
+    Args:
+        dry_run: Print the plan without writing any files
+    
+    Returns:
+        Number of objects moved (or that would be moved)
+    """
+    index = build_location_index()
+    realms_map = load_realms_data()
+    
+    for attempt in range(1, PLAN_ATTEMPTS + 1):
+        versions = {}
+        realm_objects = load_realm_files(versions=versions)
+        moves = plan_moves(realm_objects, index)
+        if not moves:
+            return 0
         
-        # Save modified source realm
-        with open(source_file, 'w', encoding='utf-8') as f:
-            json.dump(source_objects, f, indent=2, ensure_ascii=False)
+        notes = [" (replaces existing entry)" if obj_name in realm_objects.get(dest_realm, {}) else ""
+                 for obj_name, _, dest_realm in moves]
+        touched = apply_moves(moves, realm_objects, realms_map)
         
-        # Save modified destination realms
-        for dest_realm, dest_data in dest_objects.items():
-            dest_file = metadata_dir / f"{dest_realm}.json"
-            with open(dest_file, 'w', encoding='utf-8') as f:
-                json.dump(dest_data, f, indent=2, ensure_ascii=False)
+        if dry_run:
+            break
+        try:
+            write_realm_files(touched, realm_objects, versions=versions)
+            break
+        except ConflictError as e:
+            # Another tool wrote one of the files: plan again from the new contents
+            if attempt == PLAN_ATTEMPTS:
+                raise
+            print(f"  [!] {e}, planning again")
+    
+    for (obj_name, source_realm, dest_realm), note in zip(moves, notes):
+        print(f"  ✓ {obj_name}: {source_realm} → {dest_realm}{note}")
     
-    return total_moved
+    if dry_run:
+        print(f"\nWould write {len(touched)} file(s):")
+        for realm_name in touched:
+            print(f"  - {realm_name}.json ({len(realm_objects[realm_name])} objects)")
+    
+    return len(moves)
 
 def extract_colors_from_gradient(gradient: str) -> list:
     """Extract hex colors from gradient string."""
-    import re
     if not gradient:
         return []
     
@@ -191,35 +262,28 @@ def extract_colors_from_gradient(gradient: str) -> list:
 
 def main():
     """Main execution."""
+    parser = argparse.ArgumentParser(description='Scan and fix misplaced objects in objectjsons.')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='print the relocation plan without writing files')
+    profiler.add_argument(parser)
+    args = parser.parse_args()
+    profiler.start('fix_misplaced_objects', args.profile)
+    
     print("="*70)
-    print("SCANNING FOR MISPLACED OBJECTS")
-    print("="*70)
+    print("PLANNING MISPLACED OBJECT RELOCATION" if args.dry_run else "FIXING MISPLACED OBJECTS")
+    print("="*70 + "\n")
     
-    misplaced = scan_for_misplaced()
+    moved = fix_misplaced_objects(dry_run=args.dry_run)
     
-    if not misplaced:
-        print("\n✓ All objects are in correct realms!")
+    if not moved:
+        print("✓ All objects are in correct realms!")
         return
     
-    print(f"\nFound misplaced objects:\n")
-    
-    total_misplaced = 0
-    for source_realm, objects in misplaced.items():
-        print(f"  {source_realm}:")
-        for obj_name, correct_realm in objects:
-            print(f"    - {obj_name} (should be in {correct_realm})")
-            total_misplaced += 1
-    
-    print(f"\nTotal misplaced: {total_misplaced}")
-    
-    print(f"\n{'='*70}")
-    print("FIXING MISPLACED OBJECTS")
-    print(f"{'='*70}\n")
-    
-    moved = fix_misplaced_objects()
-    
     print(f"\n{'='*70}")
-    print(f"✓ Fixed {moved} misplaced objects!")
+    if args.dry_run:
+        print(f"Dry run: {moved} misplaced objects would be moved.")
+    else:
+        print(f"✓ Fixed {moved} misplaced objects!")
     print(f"{'='*70}\n")
 
 if __name__ == '__main__':
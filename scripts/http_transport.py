@@ -0,0 +1,208 @@
+"""
+Shared HTTP transport for every wiki tool.
+
+One keep-alive connection pool (a single HTTPAdapter with retries) is
+mounted on every session that talks to the wiki: the WikiAuth session, the
+download sessions and pywikibot's own comms session. All of them ask for
+gzip/deflate responses and are counted:
+
+- requests made, bytes on the wire (compressed) and bytes after decoding
+- conditional GETs answered with 304 Not Modified
+- per-request module/action and latency, for --profile (see profiler.py)
+
+conditional_get() sends If-None-Match / If-Modified-Since from a small
+validator cache in .cache/http/, and returns the cached body when the
+server answers 304. fetch_raw() uses it for action=raw page fetches; callers
+running it from several threads pass a throttle (pywikibot's site throttle
+in the scraper) so these requests are rate-limited like pywikibot's own.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
+
+import profiler
+
+WIKI_URL = "https://ftbc.fandom.com"
+INDEX_URL = f"{WIKI_URL}/index.php"
+
+CACHE_DIR = Path('.cache/http')
+VALIDATORS_PATH = CACHE_DIR / 'validators.json'
+
+# Connections kept alive per host
+POOL_SIZE = 16
+
+HEADERS = {
+    'Accept-Encoding': 'gzip, deflate',
+    'User-Agent': 'ftbc-data-tools (https://ftbc.fandom.com)',
+}
+
+stats = {'requests': 0, 'wire_bytes': 0, 'decoded_bytes': 0, 'not_modified': 0}
+
+_lock = threading.Lock()
+_adapter = None
+_session = None
+_validators = None
+
+def _get_adapter() -> HTTPAdapter:
+    """The one pooled adapter shared by every session."""
+    global _adapter
+    if _adapter is None:
+        # No POST: edits and uploads must not be repeated blindly, and
+        # pywikibot retries its own requests
+        retry_strategy = Retry(
+            total=3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["HEAD", "GET", "OPTIONS"]
+        )
+        _adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE,
+                               max_retries=retry_strategy)
+    return _adapter
+
+def _count(response, *args, **kwargs):
+    """Response hook: count requests and bytes."""
+    # Content-Length is the compressed size when the body was gzipped
+    decoded = len(response.content) if response.status_code != 304 else 0
+    wire = int(response.headers.get('Content-Length') or decoded)
+    with _lock:
+        stats['requests'] += 1
+        stats['wire_bytes'] += wire
+        stats['decoded_bytes'] += decoded
+        if response.status_code == 304:
+            stats['not_modified'] += 1
+    profiler.record_response(response)
+
+def install(session: requests.Session) -> requests.Session:
+    """Route a session through the shared pool, compression and counters."""
+    adapter = _get_adapter()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update(HEADERS)
+    if _count not in session.hooks['response']:
+        session.hooks['response'].append(_count)
+    return session
+
+def new_session() -> requests.Session:
+    """A session with its own cookies but the shared pool."""
+    return install(requests.Session())
+
+def get_session() -> requests.Session:
+    """The process-wide shared session."""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = new_session()
+    return _session
+
+def install_pywikibot():
+    """Route pywikibot's comms session through the shared transport."""
+    from pywikibot.comms import http
+    from apicache_manager import track_hits
+    install(http.session)
+    track_hits()
+
+def _load_validators() -> Dict[str, Dict]:
+    global _validators
+    if _validators is None:
+        _validators = {}
+        if VALIDATORS_PATH.exists():
+            try:
+                with open(VALIDATORS_PATH, 'r', encoding='utf-8') as f:
+                    _validators = json.load(f)
+            except (OSError, ValueError):
+                _validators = {}
+        atexit.register(save_validators)
+    return _validators
+
+def save_validators():
+    """Persist the ETag / Last-Modified validators."""
+    if _validators is None:
+        return
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with _lock:
+        data = json.dumps(_validators)
+    with open(VALIDATORS_PATH, 'w', encoding='utf-8') as f:
+        f.write(data)
+
+def conditional_get(url: str, params: Optional[Dict] = None,
+                    session: Optional[requests.Session] = None,
+                    throttle: Optional[Callable[[], None]] = None) -> Tuple[Optional[bytes], int]:
+    """
+    GET with If-None-Match / If-Modified-Since from the validator cache.
+    
+    Args:
+        url: URL to fetch
+        params: Query parameters
+        session: Session to use (default: the shared session)
+        throttle: Called before the request; blocks until it may be sent
+    
+    Returns:
+        (body, status); on 304 the cached body is returned with status 304,
+        and the body is None for error statuses
+    """
+    session = session or get_session()
+    key = url + '?' + '&'.join(f'{k}={v}' for k, v in sorted((params or {}).items()))
+    body_path = CACHE_DIR / hashlib.sha1(key.encode('utf-8')).hexdigest()
+    
+    validators = _load_validators()
+    with _lock:
+        cached = validators.get(key)
+    
+    headers = {}
+    if cached and body_path.exists():
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+    
+    if throttle is not None:
+        throttle()
+    response = session.get(url, params=params, headers=headers, timeout=30)
+    if response.status_code == 304:
+        with open(body_path, 'rb') as f:
+            return f.read(), 304
+    if response.status_code != 200:
+        return None, response.status_code
+    
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if etag or last_modified:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = body_path.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(response.content)
+        os.replace(tmp, body_path)
+        with _lock:
+            validators[key] = {'etag': etag, 'last_modified': last_modified}
+    
+    return response.content, 200
+
+def fetch_raw(title: str, throttle: Optional[Callable[[], None]] = None) -> Optional[str]:
+    """
+    Fetch a page's wikitext with action=raw, conditionally.
+    
+    Args:
+        title: Page title
+        throttle: Rate limiter (see conditional_get)
+    
+    Returns:
+        Wikitext, or None if the page does not exist
+    """
+    body, status = conditional_get(INDEX_URL, {'title': title, 'action': 'raw'}, throttle=throttle)
+    if body is None:
+        return None
+    return body.decode('utf-8')
+
+def summary() -> str:
+    """One-line transfer summary for the end of a run."""
+    saved = stats['decoded_bytes'] - stats['wire_bytes']
+    return (f"HTTP: {stats['requests']} requests, {stats['wire_bytes'] / 1024:.1f} KB on the wire "
+            f"({saved / 1024:.1f} KB saved by compression), {stats['not_modified']} not modified")
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Content-addressed local mirror of every image referenced by objectjsons.
+
+File metadata (url, sha1, size) is read through imageinfo, 50 files per
+request. Files are stored once per sha1 under the store directory:
+
+    .cache/images/objects/ab/ab12...ef   (content, named by sha1)
+    .cache/images/index.json             (filename -> sha1, size, url)
+
+Identical files uploaded under different names (e.g. "X.png" and a
+re-upload as "X New.png") share one stored copy. Re-runs skip files whose
+sha1 is unchanged, so mirroring becomes a delta operation. Downloads run
+with bounded concurrency and are verified against the wiki's sha1.
+
+Usage: python image_mirror.py [--realm NAME] [--store DIR] [--workers N] [--dry-run]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import requests
+
+import profiler
+from http_transport import get_session, summary as transport_summary
+from wiki_api import WikiAPI
+
+METADATA_DIR = Path('metadata/objectjsons')
+STORE_DIR = Path('.cache/images')
+
+def referenced_files(realm_filter: Optional[str] = None) -> List[str]:
+    """Every image filename referenced by objectjsons."""
+    files = set()
+    for json_file in sorted(METADATA_DIR.glob('*.json')):
+        if realm_filter and json_file.stem != realm_filter:
+            continue
+        with open(json_file, 'r', encoding='utf-8') as f:
+            objects = json.load(f)
+        for obj in objects.values():
+            for image in obj.get('images', []):
+                if isinstance(image, dict) and image.get('file'):
+                    files.add(image['file'])
+    return sorted(files)
+
+class ImageStore:
+    """Sha1-addressed blob store with a filename index."""
+    
+    def __init__(self, root: Path = STORE_DIR):
+        self.root = root
+        self.index_path = root / 'index.json'
+        self.index: Dict[str, Dict] = {}
+        if self.index_path.exists():
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+    
+    def blob_path(self, sha1: str) -> Path:
+        """Path of the blob with this sha1."""
+        return self.root / 'objects' / sha1[:2] / sha1
+    
+    def has_blob(self, sha1: str) -> bool:
+        return self.blob_path(sha1).exists()
+    
+    def put(self, sha1: str, data: bytes):
+        """Store content, verifying it matches its sha1."""
+        actual = hashlib.sha1(data).hexdigest()
+        if actual != sha1:
+            raise ValueError(f"sha1 mismatch: expected {sha1}, got {actual}")
+        path = self.blob_path(sha1)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    
+    def link(self, filename: str, info: Dict):
+        """Point a filename at a stored blob."""
+        self.index[filename] = {'sha1': info['sha1'], 'size': info['size'], 'url': info['url']}
+    
+    def save(self):
+        """Persist the filename index."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.index_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=2, ensure_ascii=False, sort_keys=True)
+
+def download(session: requests.Session, url: str) -> bytes:
+    response = session.get(url, timeout=30)
+    response.raise_for_status()
+    return response.content
+
+def mirror_images(filenames: List[str], store: ImageStore, api: WikiAPI,
+                  workers: int = 4, dry_run: bool = False) -> Dict[str, int]:
+    """
+    Bring the store up to date with the wiki.
+    
+    Returns:
+        Counts: unchanged, linked (deduplicated), downloaded, missing, failed, bytes
+    """
+    with profiler.phase('fetch'):
+        info = api.image_info(filenames)
+    summary = {'unchanged': 0, 'linked': 0, 'downloaded': 0, 'missing': 0, 'failed': 0, 'bytes': 0}
+    
+    # sha1 -> (file info, [filenames]) for content not yet stored
+    pending = {}
+    for filename in filenames:
+        file_info = info.get(filename)
+        if file_info is None:
+            summary['missing'] += 1
+            print(f"  [x] {filename} (not on wiki)")
+            continue
+        
+        sha1 = file_info['sha1']
+        if store.has_blob(sha1):
+            if store.index.get(filename, {}).get('sha1') == sha1:
+                summary['unchanged'] += 1
+            else:
+                summary['linked'] += 1
+                if not dry_run:
+                    store.link(filename, file_info)
+            continue
+        
+        pending.setdefault(sha1, (file_info, []))[1].append(filename)
+    
+    for sha1, (file_info, names) in pending.items():
+        print(f"  [+] {', '.join(names)} ({file_info['size']} bytes)")
+        summary['linked'] += len(names) - 1
+    
+    if dry_run or not pending:
+        return summary
+    
+    session = get_session()
+    with profiler.phase('download'), ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(download, session, file_info['url']): sha1
+                   for sha1, (file_info, _) in pending.items()}
+        for future in as_completed(futures):
+            sha1 = futures[future]
+            file_info, names = pending[sha1]
+            try:
+                data = future.result()
+                store.put(sha1, data)
+            except (requests.RequestException, ValueError) as e:
+                summary['failed'] += 1
+                print(f"  [x] {names[0]}: {e}")
+                continue
+            summary['downloaded'] += 1
+            summary['bytes'] += len(data)
+            for name in names:
+                store.link(name, file_info)
+    
+    return summary
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Mirror referenced wiki images locally.')
+    parser.add_argument('--realm', help='only mirror images of this realm')
+    parser.add_argument('--store', type=Path, default=STORE_DIR, help='store directory')
+    parser.add_argument('--workers', type=int, default=4, help='concurrent downloads')
+    parser.add_argument('--dry-run', action='store_true', help='only report what would be downloaded')
+    profiler.add_argument(parser)
+    args = parser.parse_args()
+    profiler.start('image_mirror', args.profile)
+    
+    if not METADATA_DIR.exists():
+        print(f"Error: {METADATA_DIR} not found")
+        sys.exit(1)
+    
+    filenames = referenced_files(args.realm)
+    print(f"Mirroring {len(filenames)} referenced images...\n")
+    
+    start = time.perf_counter()
+    api = WikiAPI()
+    store = ImageStore(args.store)
+    summary = mirror_images(filenames, store, api, args.workers, args.dry_run)
+    if not args.dry_run:
+        store.save()
+    elapsed = time.perf_counter() - start
+    
+    print(f"\n{'='*70}")
+    print(f"  Unchanged: {summary['unchanged']}")
+    print(f"  Downloaded: {summary['downloaded']} ({summary['bytes'] / (1024 * 1024):.1f} MB)")
+    print(f"  Deduplicated (same sha1): {summary['linked']}")
+    print(f"  Missing on wiki: {summary['missing']}")
+    print(f"  Failed: {summary['failed']}")
+    print(f"  API requests: {api.requests}, {elapsed:.1f}s")
+    print(f"  {transport_summary()}")
+    print(f"{'='*70}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Bulk upload a folder of object images to the wiki, skipping duplicates.
+
+1. Hashes every image in the folder (sha1) across a thread pool
+2. Reads the sha1 of same-named wiki files through imageinfo, 50 per request
+3. Looks up the remaining hashes with list=allimages&aisha1= (or in the
+   image mirror index, see image_mirror.py) to catch identical files that
+   already exist under another name
+4. Uploads only new or changed files through a throttled worker queue
+5. Links every file present on the wiki into the matching object's `images`,
+   duplicates under the name the wiki already has
+
+Every upload is appended to .cache/upload_journal.jsonl, so an interrupted
+run resumes where it stopped.
+
+File names follow the scraper's convention: "Object.png", "Object New.png"
+and "Object Old.png" belong to the object "Object" (parsed like
+populate_images.py does).
+
+Usage: python image_upload.py FOLDER [--workers N] [--interval SECONDS] [--comment TEXT] [--dry-run]
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import profiler
+from auth import get_pywikibot_site
+from extract_rbxlx import load_replacements
+from image_mirror import STORE_DIR
+from metadata_store import read_realm, update_realm
+from populate_images import normalize_name, split_variant
+from wiki_api import WikiAPI
+from wiki_dump import normalize_title
+
+METADATA_DIR = Path('metadata/objectjsons')
+JOURNAL_PATH = Path('.cache/upload_journal.jsonl')
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.gif')
+
+def sha1_file(path: Path) -> str:
+    """Hash a file in chunks."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def hash_folder(folder: Path, workers: int = 8) -> Dict[str, Tuple[Path, str]]:
+    """
+    Hash every image in a folder in parallel.
+    
+    Returns:
+        Dictionary of filename -> (path, sha1)
+    """
+    paths = sorted(p for p in folder.iterdir()
+                   if p.is_file() and p.suffix.lower() in IMAGE_EXTENSIONS)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        hashes = list(executor.map(sha1_file, paths))
+    return {path.name: (path, sha1) for path, sha1 in zip(paths, hashes)}
+
+def load_journal() -> Dict[str, str]:
+    """Files already uploaded by earlier runs (filename -> sha1)."""
+    done = {}
+    if not JOURNAL_PATH.exists():
+        return done
+    with open(JOURNAL_PATH, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # Partial line from an interrupted write
+                continue
+            if entry.get('status') == 'uploaded':
+                done[entry['file']] = entry['sha1']
+    return done
+
+def append_journal(entry: Dict):
+    """Record one upload outcome."""
+    JOURNAL_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(JOURNAL_PATH, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+def load_mirror_sha1s(store_dir: Path = STORE_DIR) -> Dict[str, str]:
+    """sha1 -> wiki filename from the local image mirror index, if present."""
+    index_path = store_dir / 'index.json'
+    if not index_path.exists():
+        return {}
+    with open(index_path, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    return {entry['sha1']: filename for filename, entry in sorted(index.items())}
+
+class Throttle:
+    """Enforce a minimum interval between request starts across threads."""
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next = 0.0
+    
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            profiler.count_throttle(delay)
+            time.sleep(delay)
+
+def classify(local: Dict[str, Tuple[Path, str]], api: WikiAPI,
+             journal: Dict[str, str], mirror: Dict[str, str]) -> Dict[str, List]:
+    """
+    Decide what to do with each local file.
+    
+    Returns:
+        Dictionary with 'unchanged', 'journaled', 'duplicate' (filename, existing name)
+        and 'upload' (filename, reason) lists
+    """
+    plan = {'unchanged': [], 'journaled': [], 'duplicate': [], 'upload': []}
+    remote = api.image_info(list(local))
+    
+    candidates = []
+    for filename, (_, sha1) in local.items():
+        if journal.get(filename) == sha1:
+            plan['journaled'].append(filename)
+        elif filename in remote and remote[filename]['sha1'] == sha1:
+            plan['unchanged'].append(filename)
+        else:
+            candidates.append(filename)
+    
+    for filename in candidates:
+        sha1 = local[filename][1]
+        existing = mirror.get(sha1)
+        if existing is None:
+            for query in api.query(list='allimages', aisha1=sha1, ailimit=1):
+                for image in query.get('allimages', []):
+                    existing = image['name']
+        if existing and normalize_title(existing) != normalize_title(filename):
+            plan['duplicate'].append((filename, existing))
+        else:
+            plan['upload'].append((filename, 'changed' if filename in remote else 'new'))
+    
+    return plan
+
+def upload_files(files: List[Tuple[str, Path, str]], api: WikiAPI, comment: str,
+                 workers: int, interval: float) -> List[str]:
+    """
+    Upload files through a throttled worker queue.
+    
+    Args:
+        files: (filename, path, sha1) tuples
+    
+    Returns:
+        Filenames that were uploaded
+    """
+    import pywikibot
+    
+    throttle = Throttle(interval)
+    
+    def upload(filename: str, path: Path) -> bool:
+        throttle.wait()
+        page = pywikibot.FilePage(api.site, f'File:{filename}')
+        return api.site.upload(page, source_filename=str(path), comment=comment,
+                               ignore_warnings=['exists', 'was-deleted'])
+    
+    uploaded = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(upload, filename, path): (filename, sha1)
+                   for filename, path, sha1 in files}
+        for future in as_completed(futures):
+            filename, sha1 = futures[future]
+            try:
+                ok = bool(future.result())
+                error = None if ok else 'upload refused'
+            except Exception as e:
+                ok, error = False, str(e)
+            
+            append_journal({'file': filename, 'sha1': sha1,
+                            'status': 'uploaded' if ok else 'failed', 'error': error,
+                            'time': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())})
+            if ok:
+                uploaded.append(filename)
+                print(f"  [OK] {filename}")
+            else:
+                print(f"  [x] {filename}: {error}")
+    
+    return uploaded
+
+def link_images(files: List[Tuple[str, str]]) -> int:
+    """
+    Add files to the `images` array of their objects.
+    
+    Args:
+        files: (local filename, wiki filename) pairs; the local name picks the
+            object and variant, the wiki name is what gets linked
+    
+    Returns:
+        Number of image entries added
+    """
+    replacements = load_replacements()
+    
+    realm_files = {}
+    by_name = {}
+    for json_file in sorted(METADATA_DIR.glob('*.json')):
+        objects, _ = read_realm(json_file)
+        realm_files[json_file.stem] = json_file
+        for name in objects:
+            wiki_name = replacements.get(name, name)
+            by_name.setdefault(normalize_name(name), (json_file.stem, name, wiki_name))
+            by_name[normalize_name(wiki_name)] = (json_file.stem, name, wiki_name)
+    
+    # realm -> [(object name, image entry)]
+    links = {}
+    for filename, wiki_file in sorted(files):
+        base, variant = split_variant(Path(filename).stem)
+        target = by_name.get(base)
+        if target is None:
+            print(f"  [?] {filename}: no matching object")
+            continue
+        realm_name, name, wiki_name = target
+        display = f'{wiki_name} {variant}' if variant else wiki_name
+        links.setdefault(realm_name, []).append((name, {'name': display, 'file': wiki_file}))
+    
+    added = 0
+    for realm_name, realm_links in sorted(links.items()):
+        def link(objects: Dict) -> int:
+            linked = 0
+            for name, image in realm_links:
+                # Skip objects another tool removed since the files were read
+                if name not in objects:
+                    continue
+                images = objects[name].setdefault('images', [])
+                if any(isinstance(img, dict) and img.get('file') == image['file'] for img in images):
+                    continue
+                images.append(dict(image))
+                linked += 1
+            return linked
+        
+        added += update_realm(realm_files[realm_name], link)
+    
+    return added
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Upload new object images to the wiki.')
+    parser.add_argument('folder', type=Path, help='folder of images to upload')
+    parser.add_argument('--workers', type=int, default=2, help='concurrent uploads')
+    parser.add_argument('--interval', type=float, default=2.0,
+                        help='minimum seconds between upload starts')
+    parser.add_argument('--comment', default='Uploading object image', help='upload summary')
+    parser.add_argument('--dry-run', action='store_true', help='only report what would be uploaded')
+    profiler.add_argument(parser)
+    args = parser.parse_args()
+    profiler.start('image_upload', args.profile)
+    
+    if not args.folder.is_dir():
+        print(f"Error: {args.folder} is not a directory")
+        sys.exit(1)
+    
+    start = time.perf_counter()
+    local = hash_folder(args.folder)
+    print(f"Hashed {len(local)} images in {time.perf_counter() - start:.2f}s\n")
+    
+    # Uploads need the logged-in session shared through auth.py
+    api = WikiAPI(get_pywikibot_site()) if not args.dry_run else WikiAPI()
+    plan = classify(local, api, load_journal(), load_mirror_sha1s())
+    
+    for filename, existing in plan['duplicate']:
+        print(f"  [=] {filename}: identical to File:{existing}, skipped")
+    for filename, reason in plan['upload']:
+        print(f"  [+] {filename} ({reason})")
+    
+    uploaded = []
+    if plan['upload'] and not args.dry_run:
+        print()
+        files = [(filename, *local[filename]) for filename, _ in plan['upload']]
+        uploaded = upload_files(files, api, args.comment, args.workers, args.interval)
+    
+    linked = 0
+    if not args.dry_run:
+        # Duplicates are linked under the name the wiki already has them as
+        files = [(filename, filename) for filename in uploaded + plan['unchanged'] + plan['journaled']]
+        files += [(filename, existing.replace('_', ' ')) for filename, existing in plan['duplicate']]
+        linked = link_images(files)
+    
+    print(f"\n{'='*70}")
+    print(f"  Unchanged on wiki: {len(plan['unchanged'])}")
+    print(f"  Already uploaded (journal): {len(plan['journaled'])}")
+    print(f"  Duplicates under another name: {len(plan['duplicate'])}")
+    print(f"  Uploaded: {len(uploaded)}/{len(plan['upload'])}")
+    print(f"  Image entries linked: {linked}")
+    print(f"  API requests: {api.requests}")
+    print(f"{'='*70}")
+
+if __name__ == '__main__':
+    main()
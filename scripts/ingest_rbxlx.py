@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Parallel ingestion of several .rbxlx place files into objectjsons.
+
+Each place file is parsed by its own worker process (see extract_rbxlx.py).
+Workers stream per-realm batches back through a queue while they parse,
+and the parent merges them into metadata/objectjsons once every place is
+done.
+
+Conflict resolution is deterministic: when the same object name comes out
+of several places, the place listed LAST on the command line wins,
+regardless of which worker finished first. Within one realm of a place, the
+last occurrence in the file wins; a name found in two realms of the same
+place goes to the realm whose name sorts last. Winners are picked once every
+batch has arrived, so the order batches are flushed in does not matter.
+
+Usage:
+    python ingest_rbxlx.py OLD.rbxlx NEW.rbxlx [--workers N] [--dry-run]
+    python ingest_rbxlx.py *.rbxlx --bench
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from queue import Empty
+from typing import Dict, List, Optional, Tuple
+
+import profiler
+from area_index import assign_areas
+from extract_rbxlx import METADATA_DIR, iter_realm_batches, merge_into_realm_file
+
+class IngestError(Exception):
+    """One or more place files could not be parsed."""
+
+def _ingest_place(place_index: int, place_path: str, queue,
+                  realm_override: Optional[str]) -> Tuple[int, int, float]:
+    """
+    Worker: parse one place and stream its batches into the queue.
+    
+    Returns:
+        (place_index, object_count, seconds)
+    """
+    start = time.perf_counter()
+    count = 0
+    regions = []
+    try:
+        for realm, batch in iter_realm_batches(Path(place_path), realm_override, regions=regions):
+            queue.put((place_index, realm, batch))
+            count += len(batch)
+    finally:
+        # The final message carries the place's area regions; it is sent even
+        # when parsing fails so the parent stops waiting (the error is raised
+        # from the future)
+        queue.put((place_index, None, regions))
+    return place_index, count, time.perf_counter() - start
+
+def ingest_places(places: List[Path], workers: Optional[int] = None,
+                  realm_override: Optional[str] = None,
+                  quiet: bool = False) -> Tuple[Dict[str, Dict[str, Dict]], List[Dict]]:
+    """
+    Parse places in a process pool and merge their objects.
+    
+    Args:
+        places: Place files, in increasing priority order
+        workers: Process pool size (default: one per place, capped at CPU count)
+        realm_override: Assign every object to this realm
+        quiet: Suppress per-place progress output
+    
+    Returns:
+        Tuple of (realm -> {name -> object}, conflicts)
+    
+    Raises:
+        IngestError: A place failed to parse (nothing is returned for any place)
+    """
+    if workers is None:
+        workers = min(len(places), os.cpu_count() or 1)
+    
+    # name -> (place_index, realm) -> object
+    candidates = {}
+    regions = []
+    
+    with multiprocessing.Manager() as manager:
+        queue = manager.Queue()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_ingest_place, idx, str(place), queue, realm_override)
+                for idx, place in enumerate(places)
+            ]
+            
+            remaining = len(places)
+            while remaining:
+                try:
+                    place_index, realm, batch = queue.get(timeout=1)
+                except Empty:
+                    # A worker process died without sending its final message
+                    if all(future.done() for future in futures):
+                        break
+                    continue
+                if realm is None:
+                    regions.extend(batch)
+                    remaining -= 1
+                    continue
+                
+                for name, obj in batch.items():
+                    candidates.setdefault(name, {})[(place_index, realm)] = obj
+            
+            failed = [(places[idx], future.exception()) for idx, future in enumerate(futures)
+                      if future.exception() is not None]
+            if failed:
+                raise IngestError('; '.join(f"{place.name}: {error}" for place, error in failed))
+            
+            for future in futures:
+                place_index, count, seconds = future.result()
+                if not quiet:
+                    place = places[place_index]
+                    size_mb = place.stat().st_size / (1024 * 1024)
+                    print(f"[OK] {place.name:<40} [{count} objects, {seconds:.2f}s, "
+                          f"{size_mb / seconds if seconds else 0:.1f} MB/s]")
+    
+    # name -> (place_index, realm) of the copy that is kept
+    winners = {name: max(found) for name, found in candidates.items()}
+    
+    realms = {}
+    for name in sorted(winners):
+        place_index, realm = winners[name]
+        realms.setdefault(realm, {})[name] = candidates[name][(place_index, realm)]
+    
+    assign_areas(realms, regions)
+    
+    conflicts = [
+        {
+            'name': name,
+            'places': [places[idx].name for idx in indexes],
+            'winner': places[winners[name][0]].name,
+        }
+        for name, indexes in sorted((name, sorted({idx for idx, _ in found}))
+                                    for name, found in candidates.items())
+        if len(indexes) > 1
+    ]
+    
+    return realms, conflicts
+
+def run_benchmark(places: List[Path], worker_counts=(1, 2, 4, 8)):
+    """Time extraction-only ingestion across worker counts."""
+    total_mb = sum(p.stat().st_size for p in places) / (1024 * 1024)
+    print(f"Benchmark: {len(places)} places, {total_mb:.1f} MB total\n")
+    
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        realms, _ = ingest_places(places, workers=workers, quiet=True)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        objects = sum(len(r) for r in realms.values())
+        print(f"  {workers} worker(s): {elapsed:7.2f}s  {total_mb / elapsed:7.1f} MB/s  "
+              f"x{baseline / elapsed:.2f}  [{objects} objects]")
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Ingest several .rbxlx place files in parallel.')
+    parser.add_argument('places', type=Path, nargs='+',
+                        help='place files, lowest priority first (later places win conflicts)')
+    parser.add_argument('--workers', type=int, help='process pool size')
+    parser.add_argument('--realm', help='assign every object to this realm')
+    parser.add_argument('--output-dir', type=Path, default=METADATA_DIR,
+                        help='objectjsons directory to merge into')
+    parser.add_argument('--dry-run', action='store_true', help='extract without writing files')
+    parser.add_argument('--bench', action='store_true', help='benchmark 1/2/4/8 workers')
+    profiler.add_argument(parser)
+    args = parser.parse_args()
+    profiler.start('ingest_rbxlx', args.profile)
+    
+    missing = [p for p in args.places if not p.exists()]
+    if missing:
+        print(f"Error: not found: {', '.join(str(p) for p in missing)}")
+        sys.exit(1)
+    
+    if args.bench:
+        try:
+            run_benchmark(args.places)
+        except IngestError as e:
+            print(f"Error: failed to parse {e}")
+            sys.exit(1)
+        return
+    
+    print(f"Ingesting {len(args.places)} place files...\n")
+    
+    start = time.perf_counter()
+    try:
+        realms, conflicts = ingest_places(args.places, args.workers, args.realm)
+    except IngestError as e:
+        print(f"Error: failed to parse {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+    
+    if conflicts:
+        print(f"\nConflicts ({len(conflicts)}):")
+        for conflict in conflicts:
+            print(f"  {conflict['name']}: {', '.join(conflict['places'])} -> {conflict['winner']}")
+    
+    print()
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    total = 0
+    for realm_name, extracted in sorted(realms.items()):
+        total += len(extracted)
+        if args.dry_run:
+            print(f"[--] {realm_name:<40} [{len(extracted)} objects]")
+        else:
+            changed = merge_into_realm_file(args.output_dir / f"{realm_name}.json", extracted)
+            print(f"[OK] {realm_name:<40} [{len(extracted)} objects, {changed} updated]")
+    
+    print(f"\n{'='*70}")
+    print(f"Ingested {total} objects from {len(args.places)} places in {elapsed:.2f}s")
+    print(f"{'='*70}")
+
+if __name__ == '__main__':
+    main()
@@ -16,7 +16,6 @@ Features:
 """
 
 # Load .env file BEFORE importing pywikibot
-import os
 from pathlib import Path
 try:
     from dotenv import load_dotenv
@@ -32,37 +31,30 @@ import json
 import pywikibot
 from typing import Dict, Optional, Tuple
 import sys
+import profiler
+from auth import get_pywikibot_site
 from wiki_template_generator import WikiTemplateGenerator
 
 class WikiPageCreator:
     def __init__(self):
         """Initialize with PyWikiBot site connection and login."""
         try:
-            self.site = pywikibot.Site(url='https://ftbc.fandom.com/api.php')
-            print("✓ Connected to FTBC wiki")
-            
-            # Authenticate with bot credentials - suppress password prompts
+            # Shares the cached WikiAuth session, so a fresh login is only
+            # needed when the cached cookies have expired
             print("Authenticating with bot credentials...")
             try:
-                # Get password from environment
-                password = os.environ.get('BOT_PASSWORD')
+                self.site = get_pywikibot_site()
+                print("✓ Connected to FTBC wiki")
                 
-                # Check if already logged in
                 user = self.site.user()
                 if user:
-                    print(f"✓ Already logged in as: {user}\n")
-                elif password:
-                    # Attempt login with password from environment
-                    self.site.login(autocreate=False, password=password)
-                    user = self.site.user()
                     print(f"✓ Logged in as: {user}\n")
                 else:
                     print("⚠ No password found in environment - wiki operations may be limited\n")
             except pywikibot.bot_choice.QuitKeyboardInterrupt:
                 # User pressed Ctrl+C when prompted for password
                 raise Exception("Login cancelled by user")
-            
-
+        
         except Exception as e:
             print(f"Error connecting/logging in to wiki: {e}")
             print("\nMake sure you have:")
@@ -302,6 +294,7 @@ def input_multiline() -> str:
     return '\n'.join(lines)
 
 def main():
+    profiler.start('interactive_create_pages', profiler.argv_profile())
     try:
         creator = WikiPageCreator()
         creator.run()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Maintained manifest of objectjsons statistics.
+
+Keeps per-realm counts (total, per difficulty, with images/pages/previous
+difficulties) together with each file's hash, so stats can be served
+without parsing every realm file.
+
+Writers call record_realm_file() after saving a realm file. Entries whose
+file changed outside those writers are rebuilt lazily by load_manifest()
+(both hold the "manifest" lock while they read and write the manifest):
+files with unchanged mtime and size are trusted, others are re-hashed and
+only re-parsed when the hash no longer matches.
+
+Usage: python metadata_manifest.py [--rebuild]
+"""
+
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+METADATA_DIR = Path('metadata/objectjsons')
+MANIFEST_PATH = Path('.cache/manifest.json')
+
+# Bump when the entry format changes so old manifests are rebuilt
+MANIFEST_VERSION = 1
+
+def has_page_content(obj: Dict) -> bool:
+    """Whether an object has wiki page content (info or obtaining)."""
+    wiki = obj.get('wiki') or {}
+    return bool(wiki.get('info') or wiki.get('obtaining'))
+
+def summarize_objects(objects: Dict) -> Dict:
+    """
+    Compute the manifest counts for one realm's objects.
+    
+    Args:
+        objects: Objects dict from a realm file
+    
+    Returns:
+        Dictionary with total, difficulties, with_images, with_pages, with_previous
+    """
+    difficulties = {}
+    with_images = 0
+    with_pages = 0
+    with_previous = 0
+    
+    for obj in objects.values():
+        difficulty = obj.get('difficulty', '')
+        difficulties[difficulty] = difficulties.get(difficulty, 0) + 1
+        if obj.get('images'):
+            with_images += 1
+        if has_page_content(obj):
+            with_pages += 1
+        if obj.get('previousDifficulties'):
+            with_previous += 1
+    
+    return {
+        'total': len(objects),
+        'difficulties': difficulties,
+        'with_images': with_images,
+        'with_pages': with_pages,
+        'with_previous': with_previous,
+    }
+
+def _file_entry(json_file: Path, data: bytes, objects: Dict) -> Dict:
+    """Build a manifest entry for a realm file."""
+    stat = json_file.stat()
+    entry = summarize_objects(objects)
+    entry['hash'] = hashlib.sha256(data).hexdigest()
+    entry['mtime_ns'] = stat.st_mtime_ns
+    entry['size'] = stat.st_size
+    return entry
+
+def _read_manifest() -> Dict:
+    """Read the manifest file, or return an empty one."""
+    empty = {'version': MANIFEST_VERSION, 'realms': {}}
+    if not MANIFEST_PATH.exists():
+        return empty
+    
+    try:
+        with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return empty
+    
+    if manifest.get('version') != MANIFEST_VERSION:
+        return empty
+    return manifest
+
+def _write_manifest(manifest: Dict):
+    """Write the manifest file."""
+    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = MANIFEST_PATH.with_suffix(f'.{os.getpid()}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    tmp_path.replace(MANIFEST_PATH)
+
+def record_realm_file(json_file: Path, objects: Optional[Dict] = None):
+    """
+    Update the manifest entry for a realm file that was just written.
+    
+    Args:
+        json_file: Path to the realm file
+        objects: The objects that were written (parsed from disk if omitted)
+    """
+    json_file = Path(json_file)
+    data = json_file.read_bytes()
+    if objects is None:
+        objects = json.loads(data)
+    
+    from metadata_store import file_lock
+    
+    # Several tools may record their realm files at the same time
+    with file_lock('manifest'):
+        manifest = _read_manifest()
+        manifest['realms'][json_file.stem] = _file_entry(json_file, data, objects)
+        _write_manifest(manifest)
+
+def load_manifest(metadata_dir: Path = METADATA_DIR, rebuild: bool = False) -> Dict:
+    """
+    Load the manifest, lazily refreshing entries for changed files.
+    
+    The refresh runs under the same lock as record_realm_file(), so entries
+    recorded by concurrent writers are not overwritten.
+    
+    Args:
+        metadata_dir: Directory of realm files
+        rebuild: Ignore the stored manifest and re-parse every file
+    
+    Returns:
+        Manifest dictionary with a 'realms' entry per readable realm file
+    """
+    from metadata_store import file_lock
+    
+    with file_lock('manifest'):
+        return _refresh_manifest(metadata_dir, rebuild)
+
+def _refresh_manifest(metadata_dir: Path, rebuild: bool) -> Dict:
+    """Read the manifest and update the entries of changed files (caller holds the lock)."""
+    manifest = {'version': MANIFEST_VERSION, 'realms': {}} if rebuild else _read_manifest()
+    realms = manifest['realms']
+    changed = rebuild
+    
+    seen = set()
+    for json_file in sorted(metadata_dir.glob('*.json')):
+        realm_name = json_file.stem
+        seen.add(realm_name)
+        
+        entry = realms.get(realm_name)
+        try:
+            stat = json_file.stat()
+            if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+                continue
+            
+            data = json_file.read_bytes()
+            digest = hashlib.sha256(data).hexdigest()
+            if entry and entry['hash'] == digest:
+                entry['mtime_ns'] = stat.st_mtime_ns
+            else:
+                realms[realm_name] = _file_entry(json_file, data, json.loads(data))
+        except (OSError, ValueError, AttributeError) as e:
+            # One unreadable realm file should not hide the others
+            print(f"Error reading {realm_name}: {e}")
+            realms.pop(realm_name, None)
+        changed = True
+    
+    for realm_name in set(realms) - seen:
+        del realms[realm_name]
+        changed = True
+    
+    if changed:
+        _write_manifest(manifest)
+    
+    return manifest
+
+def aggregate(manifest: Dict) -> Dict:
+    """
+    Aggregate manifest entries into dataset-wide statistics.
+    
+    Returns:
+        Dictionary with totals, per-realm, per-difficulty and realm x difficulty counts
+    """
+    realms = manifest['realms']
+    by_difficulty = {}
+    for entry in realms.values():
+        for difficulty, count in entry['difficulties'].items():
+            by_difficulty[difficulty] = by_difficulty.get(difficulty, 0) + count
+    
+    return {
+        'total_realms': len(realms),
+        'total_objects': sum(e['total'] for e in realms.values()),
+        'with_images': sum(e['with_images'] for e in realms.values()),
+        'with_pages': sum(e['with_pages'] for e in realms.values()),
+        'with_previous': sum(e['with_previous'] for e in realms.values()),
+        'by_realm': {name: e['total'] for name, e in realms.items()},
+        'by_difficulty': by_difficulty,
+        'by_realm_difficulty': {name: e['difficulties'] for name, e in realms.items()},
+    }
+
+def main():
+    """Refresh the manifest and print a summary."""
+    manifest = load_manifest(rebuild='--rebuild' in sys.argv)
+    stats = aggregate(manifest)
+    
+    print(f"Manifest: {MANIFEST_PATH}")
+    print(f"  Realms: {stats['total_realms']}")
+    print(f"  Objects: {stats['total_objects']}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""
+Locked, versioned access to the realm files in metadata/objectjsons.
+
+Every tool that rewrites realm files goes through this module, so pipeline
+stages (extract, scrape, enrich, difficulty changes, images, validation)
+can run at the same time, on different realms or on the same one, without
+losing each other's writes:
+
+- each realm file has an advisory lock (fcntl.flock on
+  .cache/locks/<file>.lock), shared while reading and exclusive while
+  writing
+- read_realm() returns the objects together with a version (hash of the
+  file); write_realm() with that version raises ConflictError if the file
+  changed in between
+- update_realm() does read-modify-write under the exclusive lock and is what
+  writers use: slow work (wiki fetches, image hashing) happens before, and
+  only the in-memory changes are applied inside. If the file is changed by a
+  program that does not take the lock (an editor, git), the update is
+  re-applied to the new contents
+- files are written to a temporary file that replaces the realm file, so
+  readers never see a half-written file, and the stats manifest is updated
+
+Without fcntl (Windows) nothing is locked and the version checks alone
+catch concurrent writes.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+METADATA_DIR = Path('metadata/objectjsons')
+LOCK_DIR = Path('.cache/locks')
+
+# How often update_realm() re-applies an update after a conflicting write
+UPDATE_ATTEMPTS = 5
+
+# Locks held by the current thread and their mode, so nested use reuses the outer lock
+_held = threading.local()
+
+class ConflictError(Exception):
+    """A realm file changed after it was read."""
+
+def _version(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+@contextmanager
+def file_lock(name: str, exclusive: bool = True):
+    """
+    Hold the advisory lock .cache/locks/<name>.lock.
+    
+    Nested use in the same thread reuses the outer lock. Asking for an
+    exclusive lock while only the shared one is held raises RuntimeError:
+    upgrading in place could deadlock with another reader doing the same.
+    
+    Args:
+        name: Lock name (realm file name, "manifest", ...)
+        exclusive: Exclusive (writing) or shared (reading) lock
+    """
+    held = getattr(_held, 'modes', None)
+    if held is None:
+        # name -> whether it is held exclusively
+        held = _held.modes = {}
+    if name in held:
+        if exclusive and not held[name]:
+            raise RuntimeError(f'exclusive lock on {name} requested while holding a shared one')
+        yield
+        return
+    
+    held[name] = exclusive
+    try:
+        if fcntl is None:
+            yield
+            return
+        LOCK_DIR.mkdir(parents=True, exist_ok=True)
+        with open(LOCK_DIR / f'{name}.lock', 'a') as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+    finally:
+        del held[name]
+
+def realm_lock(json_file, exclusive: bool = True):
+    """Hold the lock of a realm file (see file_lock)."""
+    return file_lock(Path(json_file).name, exclusive)
+
+def _read(path: Path) -> Tuple[Dict, str]:
+    data = path.read_bytes()
+    return json.loads(data), _version(data)
+
+def realm_version(json_file) -> Optional[str]:
+    """Current version of a realm file (None if it does not exist)."""
+    try:
+        return _version(Path(json_file).read_bytes())
+    except FileNotFoundError:
+        return None
+
+def _write(path: Path, objects: Dict) -> str:
+    """Atomically replace a realm file and update the manifest; returns the new version."""
+    from metadata_manifest import record_realm_file
+    
+    data = json.dumps(objects, indent=2, ensure_ascii=False).encode('utf-8')
+    # Not *.json, so tools listing realm files never pick it up
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    record_realm_file(path, objects)
+    return _version(data)
+
+def read_realm(json_file) -> Tuple[Dict, str]:
+    """
+    Read a realm file under its shared lock.
+    
+    Returns:
+        (objects, version) - pass the version to write_realm()
+    """
+    path = Path(json_file)
+    with realm_lock(path, exclusive=False):
+        return _read(path)
+
+def write_realm(json_file, objects: Dict, version: Optional[str] = None) -> str:
+    """
+    Replace a realm file under its exclusive lock.
+    
+    Args:
+        json_file: Path to the realm file
+        objects: Objects to write
+        version: Version from read_realm(); raises ConflictError if the file
+            changed since. None writes unconditionally.
+    
+    Returns:
+        The new version
+    """
+    path = Path(json_file)
+    with realm_lock(path):
+        if version is not None and realm_version(path) != version:
+            raise ConflictError(f'{path.name} changed since it was read')
+        return _write(path, objects)
+
+def update_realm(json_file, update: Callable[[Dict], Any], create: bool = False) -> Any:
+    """
+    Read-modify-write a realm file under its exclusive lock.
+    
+    Args:
+        json_file: Path to the realm file
+        update: Called with the current objects; changes them in place and
+            returns a truthy value if anything changed (nothing is written
+            otherwise). May be called again on fresh objects after a conflict.
+        create: Start from {} if the file does not exist (otherwise
+            FileNotFoundError)
+    
+    Returns:
+        The value returned by update
+    """
+    path = Path(json_file)
+    with realm_lock(path):
+        for _ in range(UPDATE_ATTEMPTS):
+            if create and not path.exists():
+                objects, version = {}, None
+            else:
+                objects, version = _read(path)
+            result = update(objects)
+            if not result:
+                return result
+            # The lock only keeps out our own tools; check for other writers
+            if realm_version(path) == version:
+                _write(path, objects)
+                return result
+    raise ConflictError(f'{path.name} kept changing during {UPDATE_ATTEMPTS} update attempts')
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Make-style runner for the metadata workflow.
+
+The README workflow is declared as stages with their scripts, inputs and
+dependencies:
+    
+    extract -> fix_misplaced -> difficulties -> enrich -> images -> scrape -> validate
+                                                                          \\-> render
+
+A stage runs only when the fingerprint of its inputs (the scripts it runs,
+the reference files it reads, the realm files it works on, the place file,
+dump or image folder it is given, and its options) differs from the one recorded after its last successful run, or when one of
+its outputs is missing. Per-realm stages (enrich, images, scrape, render) are
+tracked per realm file and run only for the realms whose inputs changed, so
+after editing one realm file only that realm is re-enriched and re-rendered.
+Stages whose dependencies are done run in parallel (validate and render).
+
+Later stages rewrite realm files that earlier stages read (enrich rewrites
+what fix_misplaced checked, images and scrape what enrich wrote), so at the
+end of a run the fingerprints of every stage that ran or was up to date are
+recorded again over the final realm files: a second run of an unchanged
+tree runs nothing.
+
+Optional stages run only when asked for: extract with --place, images when
+the image folder exists (--images), scrape with --scrape.
+
+Fingerprints and the last result of every stage are kept in
+.cache/pipeline/state.json, stage output in .cache/pipeline/logs/<stage>.log.
+
+Usage: python pipeline.py [STAGE ...] [--place FILE.rbxlx] [--images DIR] [--scrape [--dump DUMP.xml]]
+                          [--force STAGE ...] [--jobs N] [--dry-run]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shlex
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import profiler
+from metadata_store import file_lock
+from populate_images import IMAGE_ROOT
+from wiki_template_generator import PREVIEW_DIR
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+METADATA_DIR = Path('metadata/objectjsons')
+PIPELINE_DIR = Path('.cache/pipeline')
+STATE_PATH = PIPELINE_DIR / 'state.json'
+LOG_DIR = PIPELINE_DIR / 'logs'
+
+# Bump when fingerprints are computed differently so every stage runs again
+STATE_VERSION = 1
+
+REFERENCE = ['metadata/realms.json', 'metadata/difficulties.json', 'metadata/special_cases.json']
+
+class Stage:
+    """One step of the pipeline."""
+    
+    def __init__(self, name: str, script: str, deps=(), inputs=(), per_realm: bool = False,
+                 all_realms: bool = False, args: Optional[Callable] = None,
+                 enabled: Optional[Callable] = None, outputs: Optional[Callable] = None,
+                 sources: Optional[Callable] = None):
+        """
+        Args:
+            name: Stage name
+            script: Script in scripts/ the stage runs
+            deps: Stages that must finish first
+            inputs: Other files the stage reads (scripts and metadata, repo-relative)
+            per_realm: Track and run the stage per realm file
+            all_realms: The (global) stage reads every realm file
+            args: (options, realms) -> extra command line arguments; realms is
+                None for "all realms"
+            enabled: options -> whether the stage takes part in this run
+            outputs: realm (None for global stages) -> files that must exist
+            sources: options -> files or folders given on the command line
+                that the stage reads (place file, dump, image folder)
+        """
+        self.name = name
+        self.script = script
+        self.deps = list(deps)
+        self.inputs = [f'scripts/{script}'] + list(inputs)
+        self.per_realm = per_realm
+        self.all_realms = all_realms
+        self.args = args or (lambda options, realms: [])
+        self.enabled = enabled or (lambda options: True)
+        self.outputs = outputs or (lambda realm: [])
+        self.sources = sources or (lambda options: [])
+    
+    def command(self, options, realms: Optional[List[str]]) -> List[str]:
+        return [sys.executable, str(SCRIPTS_DIR / self.script)] + self.args(options, realms)
+
+def _realm_flags(flag: str) -> Callable:
+    """args() for tools that take "--realm NAME" once per realm."""
+    return lambda options, realms: [arg for realm in realms or [] for arg in (flag, realm)]
+
+STAGES = {stage.name: stage for stage in [
+    Stage('extract', 'extract_rbxlx.py',
+          inputs=['scripts/area_index.py', 'metadata/replacements.json', 'metadata/realms.json'],
+          args=lambda options, realms: [str(options.place)],
+          enabled=lambda options: options.place is not None,
+          sources=lambda options: [options.place]),
+    Stage('fix_misplaced', 'fix_misplaced_objects.py', deps=['extract'], all_realms=True,
+          inputs=['metadata/main_realm_objects.json', 'metadata/replacements.json']),
+    Stage('difficulties', 'apply_difficulty_changes.py', deps=['fix_misplaced'], all_realms=True,
+          inputs=['metadata/difficultychanges.json', 'metadata/difficulties.json']),
+    Stage('enrich', 'enrich_objectjsons.py', deps=['difficulties'], per_realm=True,
+          inputs=REFERENCE + ['scripts/realm_index.py'],
+          args=_realm_flags('--realm')),
+    Stage('images', 'populate_images.py', deps=['enrich'], per_realm=True,
+          inputs=['metadata/replacements.json'],
+          args=lambda options, realms: [str(options.images)] + _realm_flags('--realm')(options, realms),
+          enabled=lambda options: options.images.is_dir(),
+          sources=lambda options: [options.images]),
+    Stage('scrape', 'wiki_scraper_pywikibot.py', deps=['images'], per_realm=True,
+          inputs=['metadata/replacements.json', 'scripts/wiki_dump.py'],
+          args=lambda options, realms: list(realms or []) + (['--dump', str(options.dump)] if options.dump else []),
+          enabled=lambda options: options.scrape,
+          sources=lambda options: [options.dump] if options.dump else []),
+    Stage('validate', 'validate_objectjsons.py', deps=['scrape'], all_realms=True,
+          inputs=REFERENCE + ['scripts/realm_index.py']),
+    Stage('render', 'wiki_template_generator.py', deps=['scrape'], per_realm=True,
+          inputs=REFERENCE + ['scripts/realm_index.py'],
+          args=lambda options, realms: ['--preview'] + list(realms or []),
+          outputs=lambda realm: [PREVIEW_DIR / realm]),
+]}
+
+def load_state() -> Dict:
+    empty = {'version': STATE_VERSION, 'hashes': {}, 'tasks': {}, 'runs': {}}
+    if not STATE_PATH.exists():
+        return empty
+    try:
+        with open(STATE_PATH, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return empty
+    return state if state.get('version') == STATE_VERSION else empty
+
+def save_state(state: Dict):
+    PIPELINE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = STATE_PATH.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    tmp.replace(STATE_PATH)
+
+def file_hash(path: Path, hashes: Dict) -> Optional[str]:
+    """Content hash of a file, reused while its mtime and size are unchanged (None if missing)."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        hashes.pop(str(path), None)
+        return None
+    cached = hashes.get(str(path))
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    digest = hashlib.sha1(path.read_bytes()).hexdigest()
+    hashes[str(path)] = [stat.st_mtime_ns, stat.st_size, digest]
+    return digest
+
+def tree_signature(root: Path) -> str:
+    """Hash of the names, mtimes and sizes of every file under a folder."""
+    entries = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((os.path.relpath(path, root), stat.st_mtime_ns, stat.st_size))
+    return hashlib.sha1(json.dumps(entries).encode('utf-8')).hexdigest()
+
+def realm_names() -> List[str]:
+    return sorted(json_file.stem for json_file in METADATA_DIR.glob('*.json'))
+
+def fingerprint(stage: Stage, options, hashes: Dict, realm: Optional[str] = None) -> str:
+    """Fingerprint of everything a stage (for one realm) reads."""
+    paths = [Path(p) for p in stage.inputs]
+    if realm is not None:
+        paths.append(METADATA_DIR / f'{realm}.json')
+    if stage.all_realms:
+        paths.extend(METADATA_DIR / f'{name}.json' for name in realm_names())
+    # Scripts are given relative to the repository root, metadata relative to the working directory
+    items = [(str(p), file_hash(SCRIPTS_DIR.parent / p if p.parts[0] == 'scripts' else p, hashes))
+             for p in paths]
+    # Image folders can hold thousands of files: their stat signatures stand in for content
+    for source in stage.sources(options):
+        source = Path(source)
+        items.append((str(source), tree_signature(source) if source.is_dir() else file_hash(source, hashes)))
+    items.append(('args', stage.args(options, None)))
+    return hashlib.sha1(json.dumps(items).encode('utf-8')).hexdigest()
+
+def task_key(stage: Stage, realm: Optional[str]) -> str:
+    return f'{stage.name}:{realm}' if realm is not None else stage.name
+
+def outdated(stage: Stage, options, state: Dict, force: bool = False) -> List[Optional[str]]:
+    """
+    Tasks of a stage that have to run.
+    
+    Returns:
+        Realm names for per-realm stages, [None] for a global stage that has
+        to run, [] if everything is up to date
+    """
+    tasks = realm_names() if stage.per_realm else [None]
+    return [realm for realm in tasks
+            if force
+            or state['tasks'].get(task_key(stage, realm)) != fingerprint(stage, options, state['hashes'], realm)
+            or not all(path.exists() for path in stage.outputs(realm))]
+
+def run_stage(stage: Stage, options, realms: List[Optional[str]]) -> Dict:
+    """Run a stage's script for the given tasks, logging its output."""
+    if stage.per_realm and len(realms) < len(realm_names()):
+        command = stage.command(options, realms)
+    else:
+        command = stage.command(options, None)
+    
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    log_path = LOG_DIR / f'{stage.name}.log'
+    start = time.perf_counter()
+    with open(log_path, 'w', encoding='utf-8') as log:
+        log.write(shlex.join(command) + '\n\n')
+        log.flush()
+        returncode = subprocess.run(command, stdout=log, stderr=subprocess.STDOUT).returncode
+    return {'ok': returncode == 0, 'returncode': returncode, 'log': str(log_path),
+            'seconds': round(time.perf_counter() - start, 3)}
+
+def selected_stages(targets: List[str]) -> List[str]:
+    """The targets and everything upstream of them, in pipeline order."""
+    wanted = set()
+    pending = list(targets or STAGES)
+    while pending:
+        name = pending.pop()
+        if name not in wanted:
+            wanted.add(name)
+            pending.extend(STAGES[name].deps)
+    return [name for name in STAGES if name in wanted]
+
+def run_pipeline(options) -> Dict[str, str]:
+    """
+    Run every outdated stage, independent stages in parallel.
+    
+    Returns:
+        Stage name -> outcome (ran, up to date, failed, blocked, disabled)
+    """
+    names = selected_stages(options.stages)
+    force = set(options.force or [])
+    state = load_state()
+    outcomes = {}
+    running = {}
+    
+    def finished(name: str) -> bool:
+        return name in outcomes or name not in names
+    
+    with ThreadPoolExecutor(max_workers=options.jobs) as executor:
+        while len(outcomes) < len(names):
+            for name in names:
+                stage = STAGES[name]
+                if name in outcomes or name in running or not all(finished(dep) for dep in stage.deps):
+                    continue
+                if any(outcomes.get(dep) in ('failed', 'blocked') for dep in stage.deps):
+                    outcomes[name] = 'blocked'
+                elif not stage.enabled(options):
+                    outcomes[name] = 'disabled'
+                else:
+                    realms = outdated(stage, options, state, force=name in force)
+                    if not realms:
+                        outcomes[name] = 'up to date'
+                    elif options.dry_run:
+                        outcomes[name] = 'would run' + (f" ({len(realms)} realms)" if stage.per_realm else '')
+                    else:
+                        label = f" for {len(realms)} realm(s)" if stage.per_realm else ''
+                        print(f">> {name}{label}")
+                        running[name] = (executor.submit(run_stage, stage, options, realms), realms)
+            
+            if not running:
+                if len(outcomes) < len(names):
+                    # Nothing runnable left (a dependency outside this run never finished)
+                    for name in names:
+                        outcomes.setdefault(name, 'blocked')
+                break
+            
+            done, _ = wait([future for future, _ in running.values()], return_when=FIRST_COMPLETED)
+            for name in [n for n, (future, _) in running.items() if future in done]:
+                future, realms = running.pop(name)
+                stage = STAGES[name]
+                result = future.result()
+                result['time'] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+                result['realms'] = len(realms) if stage.per_realm else None
+                state['runs'][name] = result
+                if result['ok']:
+                    # Recorded after the run: a stage's own writes do not make it outdated
+                    for realm in realms:
+                        state['tasks'][task_key(stage, realm)] = fingerprint(stage, options, state['hashes'], realm)
+                    outcomes[name] = 'ran'
+                    print(f"  [OK] {name} ({result['seconds']:.1f}s)")
+                else:
+                    outcomes[name] = 'failed'
+                    print(f"  [x] {name} exited with {result['returncode']}, see {result['log']}")
+                    with open(result['log'], 'r', encoding='utf-8') as f:
+                        for line in f.read().splitlines()[-10:]:
+                            print(f"      {line}")
+                profiler.count('stages')
+            
+            if not options.dry_run:
+                # Drop tasks of realm files that no longer exist
+                existing = set(realm_names())
+                state['tasks'] = {key: value for key, value in state['tasks'].items()
+                                  if ':' not in key or key.split(':', 1)[1] in existing}
+                save_state(state)
+    
+    if not options.dry_run:
+        # Record what later stages left the realm files as, so they do not make earlier stages outdated
+        for name in names:
+            if outcomes[name] not in ('ran', 'up to date'):
+                continue
+            stage = STAGES[name]
+            for realm in (realm_names() if stage.per_realm else [None]):
+                state['tasks'][task_key(stage, realm)] = fingerprint(stage, options, state['hashes'], realm)
+        save_state(state)
+    
+    return {name: outcomes[name] for name in names}
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Run the outdated stages of the metadata workflow.')
+    parser.add_argument('stages', nargs='*', metavar='STAGE',
+                        help=f"stages to bring up to date, with their dependencies ({', '.join(STAGES)})")
+    parser.add_argument('--place', type=Path, help='.rbxlx place file to extract')
+    parser.add_argument('--images', type=Path, default=IMAGE_ROOT, help='image root folder')
+    parser.add_argument('--scrape', action='store_true', help='scrape the wiki for changed realms')
+    parser.add_argument('--dump', type=Path, help='scrape from a MediaWiki XML dump')
+    parser.add_argument('--force', nargs='+', choices=list(STAGES), metavar='STAGE',
+                        help='run these stages for every realm even if up to date')
+    parser.add_argument('--jobs', type=int, default=2, help='stages run at the same time')
+    parser.add_argument('--dry-run', action='store_true', help='show what would run')
+    profiler.add_argument(parser)
+    options = parser.parse_args()
+    profiler.start('pipeline', options.profile)
+    
+    unknown = [name for name in options.stages if name not in STAGES]
+    if unknown:
+        print(f"Error: unknown stage(s): {', '.join(unknown)} (choose from {', '.join(STAGES)})")
+        sys.exit(1)
+    
+    print("=" * 70)
+    print("METADATA PIPELINE" + (" (dry run)" if options.dry_run else ""))
+    print("=" * 70 + "\n")
+    
+    # One pipeline at a time per working directory; stages lock realm files themselves
+    with file_lock('pipeline'):
+        start = time.perf_counter()
+        outcomes = run_pipeline(options)
+    
+    print(f"\n{'='*70}")
+    for name, outcome in outcomes.items():
+        print(f"  {name:<16} {outcome}")
+    print(f"  Finished in {time.perf_counter() - start:.1f}s")
+    print("=" * 70)
+    
+    if any(outcome in ('failed', 'blocked') for outcome in outcomes.values()):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
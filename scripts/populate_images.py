@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Fill object `images` from locally stored realm art.
+
+The image tree is walked once with os.scandir and indexed as
+normalized object name -> files, covering "Name", "Name New" and
+"Name Old" variants in any image extension. Names are matched
+case-insensitively with underscores and repeated spaces collapsed.
+
+The index is saved to .cache/image_index.json together with each
+directory's mtime. A directory's mtime only changes when entries are
+added, removed or renamed in it, so later runs re-list only the folders
+that changed and reuse the cached listing for the rest.
+
+Expected layout: one folder per realm (named like the realm file) anywhere
+below the image root, e.g. images/Main Realm/American Flag New.png.
+
+Usage: python populate_images.py [IMAGE_ROOT] [--realm NAME ...] [--rebuild] [--dry-run]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import profiler
+from extract_rbxlx import load_replacements
+from metadata_store import read_realm, update_realm
+
+METADATA_DIR = Path('metadata/objectjsons')
+IMAGE_ROOT = Path('images')
+INDEX_PATH = Path('.cache/image_index.json')
+INDEX_VERSION = 1
+
+# Preferred extension first when a variant exists in several formats
+EXTENSIONS = ('.webp', '.png', '.jpg', '.jpeg', '.gif')
+VARIANTS = ('', 'New', 'Old')
+
+def normalize_name(name: str) -> str:
+    """Casefold a name and collapse underscores and whitespace."""
+    return ' '.join(name.replace('_', ' ').split()).casefold()
+
+def split_variant(stem: str) -> Tuple[str, str]:
+    """
+    Split a file stem into (normalized object name, variant).
+    
+    "American Flag New" -> ("american flag", "New")
+    """
+    match = re.match(r'^(.*?)[\s_]+(new|old)$', stem.strip(), re.IGNORECASE)
+    if match:
+        return normalize_name(match.group(1)), match.group(2).capitalize()
+    return normalize_name(stem), ''
+
+def _list_dir(path: str) -> Tuple[List[str], Dict[str, List]]:
+    """
+    List one directory with scandir.
+    
+    Returns:
+        (subdirectory names, normalized name -> [[filename, variant], ...])
+    """
+    subdirs = []
+    files = {}
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.name)
+                continue
+            stem, ext = os.path.splitext(entry.name)
+            if ext.lower() not in EXTENSIONS:
+                continue
+            name, variant = split_variant(stem)
+            files.setdefault(name, []).append([entry.name, variant])
+    return sorted(subdirs), files
+
+class ImageIndex:
+    """Directory listing cache for an image tree, keyed by relative path."""
+    
+    def __init__(self, root: Path, index_path: Path = INDEX_PATH):
+        self.root = root
+        self.index_path = index_path
+        self.dirs: Dict[str, Dict] = {}
+        self.scanned = 0
+        self.reused = 0
+    
+    def load(self):
+        """Load the saved index if it belongs to the same root."""
+        if not self.index_path.exists():
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == INDEX_VERSION and data.get('root') == str(self.root.resolve()):
+            self.dirs = data.get('dirs', {})
+    
+    def save(self):
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.index_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'root': str(self.root.resolve()), 'dirs': self.dirs},
+                      f, ensure_ascii=False)
+    
+    def refresh(self):
+        """Re-list directories whose mtime changed; drop ones that disappeared."""
+        fresh = {}
+        pending = ['.']
+        while pending:
+            rel = pending.pop()
+            path = os.path.join(self.root, rel)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            
+            cached = self.dirs.get(rel)
+            if cached and cached['mtime'] == mtime:
+                entry = cached
+                self.reused += 1
+            else:
+                subdirs, files = _list_dir(path)
+                entry = {'mtime': mtime, 'subdirs': subdirs, 'files': files}
+                self.scanned += 1
+            
+            fresh[rel] = entry
+            pending.extend(os.path.normpath(os.path.join(rel, d)) for d in entry['subdirs'])
+        
+        self.dirs = fresh
+    
+    def realm_files(self) -> Dict[str, Dict[str, List]]:
+        """
+        Group indexed files by realm folder.
+        
+        Files are listed under every folder on their path, so a realm
+        folder also covers its subfolders (e.g. Main Realm/City/).
+        
+        Returns:
+            Dictionary of normalized folder name -> {normalized object name -> [[relative file, variant]]}
+        """
+        realms = {}
+        for rel, entry in self.dirs.items():
+            parts = [] if rel == '.' else Path(rel).parts
+            for name, files in entry['files'].items():
+                for folder in reversed(parts):
+                    bucket = realms.setdefault(normalize_name(folder), {})
+                    bucket.setdefault(name, []).extend(
+                        [os.path.join(rel, filename), variant] for filename, variant in files)
+        return realms
+
+def choose_images(object_name: str, files: List[List[str]]) -> List[Dict]:
+    """
+    Pick one file per variant, preferring EXTENSIONS order.
+    
+    Returns:
+        images entries in the scraper's format ({'name', 'file'})
+    """
+    best = {}
+    for rel_file, variant in files:
+        rank = EXTENSIONS.index(os.path.splitext(rel_file)[1].lower())
+        if variant not in best or rank < best[variant][0]:
+            best[variant] = (rank, os.path.basename(rel_file))
+    
+    images = []
+    for variant in VARIANTS:
+        if variant in best:
+            display = f'{object_name} {variant}' if variant else object_name
+            images.append({'name': display, 'file': best[variant][1]})
+    return images
+
+def populate_images(index: ImageIndex, realm_filter: Optional[List[str]] = None,
+                    dry_run: bool = False) -> Tuple[int, int]:
+    """
+    Add local images to every realm's objects in one pass over the index.
+    
+    Args:
+        index: Refreshed image index
+        realm_filter: Only these realms (default: all)
+        dry_run: Do not write realm files
+    
+    Returns:
+        Tuple of (image entries added, objects with local images)
+    """
+    replacements = load_replacements()
+    by_realm = index.realm_files()
+    
+    added = 0
+    matched = 0
+    for json_file in sorted(METADATA_DIR.glob('*.json')):
+        realm_name = json_file.stem
+        if realm_filter and realm_name not in realm_filter:
+            continue
+        files = by_realm.get(normalize_name(realm_name))
+        if not files:
+            continue
+        
+        realm_matched = {}
+        
+        def add_images(objects: Dict) -> int:
+            realm_added = 0
+            realm_matched['count'] = 0
+            for name, obj in objects.items():
+                wiki_name = replacements.get(name, name)
+                candidates = files.get(normalize_name(wiki_name)) or files.get(normalize_name(name))
+                if not candidates:
+                    continue
+                
+                realm_matched['count'] += 1
+                images = obj.setdefault('images', [])
+                existing = {img.get('file') for img in images if isinstance(img, dict)}
+                for image in choose_images(wiki_name, candidates):
+                    if image['file'] not in existing:
+                        images.append(image)
+                        realm_added += 1
+            return realm_added
+        
+        if dry_run:
+            realm_added = add_images(read_realm(json_file)[0])
+        else:
+            realm_added = update_realm(json_file, add_images)
+        
+        added += realm_added
+        matched += realm_matched['count']
+        print(f"[OK] {realm_name:<40} [{realm_added} images added]")
+    
+    return added, matched
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Fill images from local realm folders.')
+    parser.add_argument('root', type=Path, nargs='?', default=IMAGE_ROOT, help='image root folder')
+    parser.add_argument('--realm', action='append', help='only populate this realm (repeatable)')
+    parser.add_argument('--rebuild', action='store_true', help='ignore the saved index')
+    parser.add_argument('--dry-run', action='store_true', help='do not write realm files')
+    profiler.add_argument(parser)
+    args = parser.parse_args()
+    profiler.start('populate_images', args.profile)
+    
+    if not args.root.is_dir():
+        print(f"Error: {args.root} is not a directory")
+        sys.exit(1)
+    
+    start = time.perf_counter()
+    index = ImageIndex(args.root)
+    if not args.rebuild:
+        index.load()
+    index.refresh()
+    index.save()
+    print(f"Indexed {args.root} in {time.perf_counter() - start:.2f}s "
+          f"({index.scanned} folders listed, {index.reused} reused)\n")
+    
+    added, matched = populate_images(index, args.realm, args.dry_run)
+    
+    print(f"\n{'='*70}")
+    print(f"✓ {added} images added ({matched} objects with local images)")
+    print(f"{'='*70}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""
+Run profiling shared by every script (--profile).
+
+Records, for one run:
+- wall time per phase (load, enrich, fetch, parse, render, write), via
+  `with phase('fetch'):`; phases timed inside worker threads add up the
+  time of every thread
+- HTTP requests by API module/action (e.g. "query:revisions", "index:raw"),
+  with a latency histogram per type, counted by http_transport for every
+  session including pywikibot's
+- retries made by the connection pool and throttle sleeps
+- free-form counters such as objects processed and errors
+
+Timings are always collected (they are cheap); with --profile a JSON report
+is written at exit to .cache/profile/<script>-<time>.json (or the given
+path) and a one-line summary is printed. Reports carry the git commit, so
+runs of different versions can be compared.
+"""
+
+import atexit
+import json
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+PROFILE_DIR = Path('.cache/profile')
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000)
+
+_lock = threading.Lock()
+_started = time.perf_counter()
+_script = None
+_report_path = None
+
+phases: Dict[str, Dict] = {}
+requests_by_type: Dict[str, Dict] = {}
+counters: Dict[str, float] = {}
+
+@contextmanager
+def phase(name: str):
+    """Time a block as part of a named phase."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            item = phases.setdefault(name, {'calls': 0, 'seconds': 0.0})
+            item['calls'] += 1
+            item['seconds'] += elapsed
+
+def count(name: str, amount: float = 1):
+    """Add to a free-form counter (objects, errors, ...)."""
+    with _lock:
+        counters[name] = counters.get(name, 0) + amount
+
+def count_throttle(seconds: float):
+    """Record one throttle sleep."""
+    with _lock:
+        counters['throttle_sleeps'] = counters.get('throttle_sleeps', 0) + 1
+        counters['throttle_seconds'] = counters.get('throttle_seconds', 0) + seconds
+
+def request_type(method: str, url: str, body=None, content_type: str = '') -> str:
+    """
+    Classify a request by API module/action.
+    
+    Returns:
+        e.g. "query:revisions", "parse", "index:raw", or "download" for other URLs
+    """
+    from apicache_manager import query_type
+    
+    parts = urlsplit(url)
+    params = dict(parse_qsl(parts.query))
+    if body and 'application/x-www-form-urlencoded' in content_type:
+        if isinstance(body, bytes):
+            body = body.decode('utf-8', 'replace')
+        params.update(parse_qsl(body))
+    
+    if parts.path.endswith('api.php'):
+        if method == 'POST' and 'multipart/form-data' in content_type:
+            return 'upload'
+        return query_type(params)
+    if parts.path.endswith('index.php'):
+        return f"index:{params.get('action', 'view')}"
+    return 'download'
+
+def record_response(response):
+    """Account one HTTP response (called by http_transport's response hook)."""
+    request = response.request
+    kind = request_type(request.method, request.url, request.body,
+                        request.headers.get('Content-Type', ''))
+    latency_ms = response.elapsed.total_seconds() * 1000
+    retries = getattr(getattr(response.raw, 'retries', None), 'history', None) or ()
+    
+    bucket = next((f'<={b}ms' for b in LATENCY_BUCKETS_MS if latency_ms <= b),
+                  f'>{LATENCY_BUCKETS_MS[-1]}ms')
+    with _lock:
+        item = requests_by_type.setdefault(kind, {'count': 0, 'seconds': 0.0, 'histogram': {}})
+        item['count'] += 1
+        item['seconds'] += latency_ms / 1000
+        item['histogram'][bucket] = item['histogram'].get(bucket, 0) + 1
+        if retries:
+            counters['retries'] = counters.get('retries', 0) + len(retries)
+
+def git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                capture_output=True, text=True, timeout=5,
+                                cwd=Path(__file__).parent)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+def report() -> Dict:
+    """The profile of this run so far."""
+    with _lock:
+        total_requests = sum(item['count'] for item in requests_by_type.values())
+        objects = counters.get('objects', 0)
+        return {
+            'script': _script,
+            'commit': git_commit(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'wall_seconds': round(time.perf_counter() - _started, 3),
+            'phases': {name: {'calls': item['calls'], 'seconds': round(item['seconds'], 3)}
+                       for name, item in phases.items()},
+            'requests': {
+                'total': total_requests,
+                'per_object': round(total_requests / objects, 3) if objects else None,
+                'by_type': {kind: dict(item, seconds=round(item['seconds'], 3))
+                            for kind, item in sorted(requests_by_type.items())},
+            },
+            'counters': dict(counters),
+        }
+
+def summary_line(data: Dict) -> str:
+    """One-line summary of a report."""
+    requests = data['requests']
+    parts = [f"{data['wall_seconds']:.2f}s"]
+    parts.extend(f"{name} {item['seconds']:.2f}s" for name, item in data['phases'].items())
+    line = f"Profile: {', '.join(parts)} | {requests['total']} requests"
+    if requests['per_object'] is not None:
+        line += f" ({requests['per_object']:.2f}/object)"
+    extra = data['counters']
+    line += f", {int(extra.get('retries', 0))} retries, {int(extra.get('throttle_sleeps', 0))} throttle sleeps"
+    if extra.get('errors'):
+        line += f", {int(extra['errors'])} errors"
+    return line
+
+def _write_report():
+    data = report()
+    path = _report_path
+    if path is None:
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        path = PROFILE_DIR / f'{_script}-{stamp}.json'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    print(f"\n{summary_line(data)} -> {path}")
+
+def add_argument(parser):
+    """Add the shared --profile option to a script's parser."""
+    parser.add_argument('--profile', nargs='?', const='', metavar='REPORT.json',
+                        help='write a timing and API call report at exit')
+
+def argv_profile() -> Optional[str]:
+    """--profile[=REPORT.json] from sys.argv, for scripts without argparse."""
+    for arg in sys.argv[1:]:
+        if arg == '--profile':
+            return ''
+        if arg.startswith('--profile='):
+            return arg.split('=', 1)[1]
+    return None
+
+def start(script: str, profile: Optional[str]):
+    """
+    Enable the report for this run.
+    
+    Args:
+        script: Script name used in the report file name
+        profile: Value of --profile: None (disabled), '' (default path) or a report path
+    """
+    global _script, _report_path
+    if profile is None or _script is not None:
+        return
+    _script = script
+    _report_path = Path(profile) if profile else None
+    atexit.register(_write_report)
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Compiled realm hierarchy shared by every tool.
+
+realms.json, special_cases.json and the realm file names are compiled into
+one index of realms, subrealms and areas:
+
+- every entry knows its kind, parent (or subrealm group), children, style
+  (icon, link, image, gradient, accent, colors), realm file and wiki name
+- lookups by label, realm file name, wiki link or alias are one dict access
+  (case-insensitive)
+- special_cases.json overrides (custom gradient and background image, static
+  overlay) are applied to the style
+
+The compiled index is pickled to .cache/realm_index.pickle together with the
+mtimes of realms.json and special_cases.json and the realm file names, and
+reused until one of them changes.
+
+Usage: python realm_index.py [NAME ...] [--rebuild]
+"""
+
+import argparse
+import json
+import os
+import pickle
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+REALMS_PATH = Path('metadata/realms.json')
+SPECIAL_CASES_PATH = Path('metadata/special_cases.json')
+METADATA_DIR = Path('metadata/objectjsons')
+SNAPSHOT_PATH = Path('.cache/realm_index.pickle')
+
+# Bump when the compiled layout changes
+INDEX_VERSION = 2
+
+# Realm files named differently from their realms.json label
+FILE_LABELS = {
+    'Inverted Realm': 'Inverted',
+    'The Basement': 'Basement',
+    'Evle Froetss': 'Evle Froets',
+    'The Backrooms Level 0': 'Level 0',
+    'The Backrooms Level 1': 'Level 1',
+    'The Backrooms Level 2': 'Level 2',
+    'The Backrooms Level 3': 'Level 3',
+    'The Backrooms Level 4': 'Level 4',
+    'The Backrooms Level 153': 'Level 153',
+    'The Backrooms Level RUN FOR YOUR LIFE': 'RUN FOR YOUR LIFE',
+}
+
+# Realm files whose wiki page and category name differ from the file name
+WIKI_NAMES = {
+    'The Basement': 'Basement',
+}
+
+STYLE_FIELDS = ('label', 'icon', 'link', 'image', 'gradient', 'accent')
+
+_cache = {}
+
+def _colors(gradient: str) -> List[str]:
+    return re.findall(r'#[0-9a-fA-F]{3,6}', gradient or '')
+
+def _sources() -> Dict:
+    """mtime of the reference files and the list of realm files."""
+    sources = {}
+    for path in (REALMS_PATH, SPECIAL_CASES_PATH):
+        try:
+            sources[str(path)] = os.stat(path).st_mtime_ns
+        except OSError:
+            sources[str(path)] = None
+    # Realm files are replaced on every write, so the directory mtime changes too often
+    try:
+        sources[str(METADATA_DIR)] = tuple(sorted(name for name in os.listdir(METADATA_DIR)
+                                                  if name.endswith('.json')))
+    except OSError:
+        sources[str(METADATA_DIR)] = None
+    return sources
+
+class RealmIndex:
+    """Realms, subrealms and areas by name, with case-insensitive aliases."""
+    
+    def __init__(self, entries: Dict[str, Dict], keys: Dict[str, str]):
+        """
+        Args:
+            entries: Entry name -> entry (see compile_index)
+            keys: Casefolded label, file name, link or alias -> entry name
+        """
+        self.entries = entries
+        self.keys = keys
+    
+    def get(self, name: str) -> Optional[Dict]:
+        """The entry for a label, realm file name, link or alias, if known."""
+        if not name:
+            return None
+        key = self.keys.get(name.casefold())
+        return self.entries[key] if key is not None else None
+    
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+    
+    def label(self, name: str) -> str:
+        """Canonical realms.json label (the name itself if unknown)."""
+        entry = self.get(name)
+        return entry['label'] if entry else name
+    
+    def style(self, name: str) -> Dict:
+        """Style fields and colors, with special-case overrides applied ({} if unknown)."""
+        entry = self.get(name)
+        return dict(entry['style']) if entry else {}
+    
+    def wiki_name(self, name: str) -> str:
+        """Name used for the wiki page link and "<name> Objects" category."""
+        entry = self.get(name)
+        if entry and entry.get('file'):
+            return WIKI_NAMES.get(entry['file'], entry['file'])
+        return WIKI_NAMES.get(name, name)
+    
+    def special(self, name: str) -> Dict:
+        """special_cases.json overrides for a realm ({} if none)."""
+        entry = self.get(name)
+        return dict(entry['special']) if entry else {}
+    
+    def realm_styles(self) -> Dict[str, Dict]:
+        """Style of every realm and subrealm, keyed by both label and realm file name."""
+        styles = {}
+        for entry in self.entries.values():
+            if entry['kind'] == 'area' or not entry['listed']:
+                continue
+            styles[entry['label']] = dict(entry['style'])
+            if entry['file']:
+                styles[entry['file']] = dict(entry['style'])
+        return styles
+    
+    def realm_files(self) -> Dict[str, Dict]:
+        """Realm file name -> entry."""
+        return {entry['file']: entry for entry in self.entries.values() if entry.get('file')}
+    
+    def areas(self) -> Dict[str, Dict]:
+        """Area label -> entry."""
+        return {name: entry for name, entry in self.entries.items() if entry['kind'] == 'area'}
+    
+    def aliases(self, listed: bool = False) -> List[str]:
+        """
+        Every realm label and realm file name, in their original spelling.
+        
+        Args:
+            listed: Only realms and areas that have an entry in realms.json
+        """
+        names = set()
+        for entry in self.entries.values():
+            if listed and not entry['listed']:
+                continue
+            names.add(entry['label'])
+            if entry.get('file'):
+                names.add(entry['file'])
+        return sorted(names)
+
+def compile_index() -> RealmIndex:
+    """Build the index from realms.json, special_cases.json and the realm files."""
+    realms_data = {}
+    if REALMS_PATH.exists():
+        with open(REALMS_PATH, 'r', encoding='utf-8') as f:
+            realms_data = json.load(f)
+    special_cases = {}
+    if SPECIAL_CASES_PATH.exists():
+        with open(SPECIAL_CASES_PATH, 'r', encoding='utf-8') as f:
+            special_cases = json.load(f).get('special_cases', {})
+    
+    entries = {}
+    
+    def add(data: Dict, kind: str, parent: Optional[str] = None, group: Optional[str] = None,
+            listed: bool = True):
+        label = data['label']
+        entries[label] = {
+            'label': label,
+            'kind': kind,
+            'listed': listed,
+            'parent': parent,
+            'group': group,
+            'subrealms': [],
+            'areas': [],
+            'file': None,
+            'style': {field: data[field] for field in STYLE_FIELDS if field in data},
+            'special': {},
+        }
+    
+    for realm in realms_data.get('normal', []):
+        if isinstance(realm, dict) and realm.get('label'):
+            add(realm, 'realm')
+    
+    for group, subrealms in realms_data.get('subrealms', {}).items():
+        parent = group if group in entries else None
+        for realm in subrealms if isinstance(subrealms, list) else []:
+            if isinstance(realm, dict) and realm.get('label') and realm['label'] not in entries:
+                add(realm, 'subrealm', parent, group)
+                if parent:
+                    entries[parent]['subrealms'].append(realm['label'])
+    
+    for area in realms_data.get('areas', []):
+        if isinstance(area, dict) and area.get('label') and area['label'] not in entries:
+            parent = area.get('parent') if area.get('parent') in entries else None
+            add(area, 'area', parent)
+            if parent:
+                entries[parent]['areas'].append(area['label'])
+    
+    by_label = {label.casefold(): label for label in entries}
+    if METADATA_DIR.is_dir():
+        for json_file in sorted(METADATA_DIR.glob('*.json')):
+            stem = json_file.stem
+            label = by_label.get(FILE_LABELS.get(stem, stem).casefold())
+            if label is None or entries[label]['kind'] == 'area' or entries[label]['file']:
+                # Realm file without a realms.json entry
+                add({'label': stem}, 'realm', listed=False)
+                label = stem
+            entries[label]['file'] = stem
+    
+    for name, overrides in special_cases.items():
+        label = by_label.get(FILE_LABELS.get(name, name).casefold(), name)
+        entry = entries.get(label)
+        if entry is None:
+            continue
+        entry['special'] = dict(overrides)
+        if overrides.get('custom_gradient'):
+            entry['style']['gradient'] = overrides['custom_gradient']
+        if overrides.get('custom_bg_image'):
+            entry['style']['image'] = overrides['custom_bg_image']
+    
+    for entry in entries.values():
+        if entry['style']:
+            entry['style']['colors'] = _colors(entry['style'].get('gradient', ''))
+    
+    # Labels and file names win over links and aliases when they collide
+    keys = {}
+    for name, entry in entries.items():
+        keys[name.casefold()] = name
+        if entry['file']:
+            keys[entry['file'].casefold()] = name
+    for stem, label in FILE_LABELS.items():
+        if label in entries:
+            keys.setdefault(stem.casefold(), label)
+    for name, entry in entries.items():
+        link = entry['style'].get('link')
+        if link:
+            keys.setdefault(link.casefold(), name)
+            keys.setdefault(link.replace('_', ' ').casefold(), name)
+    
+    return RealmIndex(entries, keys)
+
+def load_realm_index(rebuild: bool = False) -> RealmIndex:
+    """
+    The compiled index, from memory, the snapshot or a fresh compile.
+    
+    Args:
+        rebuild: Ignore the snapshot and recompile
+    """
+    sources = _sources()
+    signature = (os.getcwd(), tuple(sorted(sources.items(), key=lambda item: item[0])))
+    if not rebuild and signature in _cache:
+        return _cache[signature]
+    
+    index = None
+    if not rebuild and SNAPSHOT_PATH.exists():
+        try:
+            with open(SNAPSHOT_PATH, 'rb') as f:
+                snapshot = pickle.load(f)
+            if snapshot.get('version') == INDEX_VERSION and snapshot.get('sources') == sources:
+                index = RealmIndex(snapshot['entries'], snapshot['keys'])
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            index = None
+    
+    if index is None:
+        index = compile_index()
+        SNAPSHOT_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = SNAPSHOT_PATH.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            pickle.dump({'version': INDEX_VERSION, 'sources': sources,
+                         'entries': index.entries, 'keys': index.keys}, f)
+        os.replace(tmp, SNAPSHOT_PATH)
+    
+    _cache.clear()
+    _cache[signature] = index
+    return index
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Show the compiled realm hierarchy.')
+    parser.add_argument('names', nargs='*', help='resolve these names')
+    parser.add_argument('--rebuild', action='store_true', help='recompile the snapshot')
+    args = parser.parse_args()
+    
+    index = load_realm_index(args.rebuild)
+    
+    if args.names:
+        for name in args.names:
+            entry = index.get(name)
+            if entry is None:
+                print(f"  [x] {name}: unknown")
+                continue
+            print(f"  [OK] {name} -> {entry['label']} ({entry['kind']}, file={entry['file']}, "
+                  f"wiki={index.wiki_name(name)}, parent={entry['parent'] or entry['group']})")
+        return
+    
+    print("=" * 70)
+    print("REALM HIERARCHY")
+    print("=" * 70 + "\n")
+    
+    for name, entry in index.entries.items():
+        if entry['kind'] != 'realm':
+            continue
+        print(f"{name}" + (f"  [{entry['file']}.json]" if entry['file'] else ''))
+        for child in entry['subrealms']:
+            child_entry = index.entries[child]
+            print(f"  - {child}" + (f"  [{child_entry['file']}.json]" if child_entry['file'] else ''))
+        for area in entry['areas']:
+            print(f"  * {area} (area)")
+    
+    groups = {}
+    for name, entry in index.entries.items():
+        if entry['kind'] == 'subrealm' and entry['parent'] is None:
+            groups.setdefault(entry['group'], []).append(entry)
+    for group, members in groups.items():
+        print(f"{group} (group)")
+        for entry in members:
+            print(f"  - {entry['label']}" + (f"  [{entry['file']}.json]" if entry['file'] else ''))
+    
+    print(f"\n{'='*70}")
+    print(f"  {len(index.entries)} entries, {len(index.keys)} lookup keys")
+    print("=" * 70)
+
+if __name__ == '__main__':
+    main()
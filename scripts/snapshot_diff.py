@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Diff two extracted snapshots of the game and generate difficultychanges.json.
+
+A snapshot is either an objectjsons directory (one JSON file per realm) or
+an .rbxlx place file, which is extracted with extract_rbxlx.py.
+
+Every object gets a content fingerprint over its base fields (name,
+difficulty, description, realm), so unchanged objects are skipped with a
+single hash comparison. The diff reports:
+- added / removed objects
+- renamed objects (a removed and an added object with identical content)
+- difficulty changes, in the exact difficultychanges.json format that
+  apply_difficulty_changes.py reads
+- realm moves and description changes
+
+Usage:
+    python snapshot_diff.py OLD NEW [--changes-out metadata/difficultychanges.json] [--report diff.json]
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Tuple
+
+import profiler
+from extract_rbxlx import extract_place
+
+BASE_FIELDS = ('name', 'difficulty', 'description', 'realm')
+
+# name -> (realm, object, fingerprint)
+Snapshot = Dict[str, Tuple[str, Dict, str]]
+
+def fingerprint(obj: Dict, fields=BASE_FIELDS) -> str:
+    """Hash an object's base fields."""
+    payload = json.dumps([obj.get(f, '') for f in fields], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+def load_snapshot(path: Path) -> Snapshot:
+    """
+    Load a snapshot from an objectjsons directory or an .rbxlx file.
+    
+    Returns:
+        Dictionary of object name -> (realm, object, fingerprint)
+    """
+    if path.is_dir():
+        realms = {}
+        for json_file in sorted(path.glob('*.json')):
+            with open(json_file, 'r', encoding='utf-8') as f:
+                realms[json_file.stem] = json.load(f)
+    else:
+        realms = extract_place(path)
+    
+    snapshot = {}
+    for realm_name, objects in realms.items():
+        for name, obj in objects.items():
+            base = {f: obj.get(f, '') for f in BASE_FIELDS}
+            base['name'] = name
+            base['realm'] = realm_name
+            snapshot[name] = (realm_name, base, fingerprint(base))
+    
+    return snapshot
+
+def diff_snapshots(old: Snapshot, new: Snapshot) -> Dict:
+    """
+    Compare two snapshots.
+    
+    Returns:
+        Dictionary with added, removed, renamed, difficulty_changes,
+        moved, description_changes and unchanged (count)
+    """
+    added = sorted(set(new) - set(old))
+    removed = sorted(set(old) - set(new))
+    
+    # Match renames by content without the name; only unambiguous pairs count
+    content_fields = ('difficulty', 'description', 'realm')
+    removed_by_content = {}
+    for name in removed:
+        key = fingerprint(old[name][1], content_fields)
+        removed_by_content.setdefault(key, []).append(name)
+    added_by_content = {}
+    for name in added:
+        key = fingerprint(new[name][1], content_fields)
+        added_by_content.setdefault(key, []).append(name)
+    
+    renamed = []
+    for key, old_names in removed_by_content.items():
+        new_names = added_by_content.get(key, [])
+        if len(old_names) == 1 and len(new_names) == 1:
+            renamed.append({'old': old_names[0], 'new': new_names[0], 'realm': new[new_names[0]][0]})
+    
+    renamed_old = {r['old'] for r in renamed}
+    renamed_new = {r['new'] for r in renamed}
+    
+    difficulty_changes = {}
+    moved = []
+    description_changes = []
+    unchanged = 0
+    
+    for name in new:
+        if name not in old:
+            continue
+        
+        old_realm, old_obj, old_fp = old[name]
+        new_realm, new_obj, new_fp = new[name]
+        if old_fp == new_fp:
+            unchanged += 1
+            continue
+        
+        if old_obj['difficulty'] != new_obj['difficulty']:
+            difficulty_changes.setdefault(new_realm, {})[name] = {
+                'previous': old_obj['difficulty'],
+                'new': new_obj['difficulty'],
+                'asterisk': False,
+            }
+        if old_realm != new_realm:
+            moved.append({'name': name, 'from': old_realm, 'to': new_realm})
+        if old_obj['description'] != new_obj['description']:
+            description_changes.append({
+                'name': name,
+                'realm': new_realm,
+                'previous': old_obj['description'],
+                'new': new_obj['description'],
+            })
+    
+    return {
+        'added': [{'name': n, 'realm': new[n][0], 'difficulty': new[n][1]['difficulty']}
+                  for n in added if n not in renamed_new],
+        'removed': [{'name': n, 'realm': old[n][0], 'difficulty': old[n][1]['difficulty']}
+                    for n in removed if n not in renamed_old],
+        'renamed': renamed,
+        'difficulty_changes': difficulty_changes,
+        'moved': moved,
+        'description_changes': description_changes,
+        'unchanged': unchanged,
+    }
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Diff two game snapshots.')
+    parser.add_argument('old', type=Path, help='old snapshot (objectjsons dir or .rbxlx)')
+    parser.add_argument('new', type=Path, help='new snapshot (objectjsons dir or .rbxlx)')
+    parser.add_argument('--changes-out', type=Path,
+                        help='write difficulty changes in difficultychanges.json format')
+    parser.add_argument('--report', type=Path, help='write the full diff as JSON')
+    profiler.add_argument(parser)
+    args = parser.parse_args()
+    profiler.start('snapshot_diff', args.profile)
+    
+    for path in (args.old, args.new):
+        if not path.exists():
+            print(f"Error: {path} not found")
+            sys.exit(1)
+    
+    old = load_snapshot(args.old)
+    new = load_snapshot(args.new)
+    diff = diff_snapshots(old, new)
+    
+    change_count = sum(len(c) for c in diff['difficulty_changes'].values())
+    
+    print("=" * 70)
+    print(f"SNAPSHOT DIFF: {args.old.name} -> {args.new.name}")
+    print("=" * 70 + "\n")
+    
+    for item in diff['added']:
+        print(f"  [+] {item['name']} ({item['realm']}, {item['difficulty']})")
+    for item in diff['removed']:
+        print(f"  [-] {item['name']} ({item['realm']}, {item['difficulty']})")
+    for item in diff['renamed']:
+        print(f"  [~] {item['old']} → {item['new']} ({item['realm']})")
+    for item in diff['moved']:
+        print(f"  [>] {item['name']}: {item['from']} → {item['to']}")
+    for realm, changes in diff['difficulty_changes'].items():
+        for name, change in changes.items():
+            print(f"  [*] {name} ({realm}): {change['previous']} → {change['new']}")
+    
+    print(f"\n  Unchanged: {diff['unchanged']}")
+    print(f"  Added: {len(diff['added'])}")
+    print(f"  Removed: {len(diff['removed'])}")
+    print(f"  Renamed: {len(diff['renamed'])}")
+    print(f"  Moved: {len(diff['moved'])}")
+    print(f"  Difficulty changes: {change_count}")
+    print(f"  Description changes: {len(diff['description_changes'])}")
+    
+    if args.changes_out:
+        with open(args.changes_out, 'w', encoding='utf-8') as f:
+            json.dump(diff['difficulty_changes'], f, indent=2, ensure_ascii=False)
+        print(f"\n✓ Wrote {change_count} difficulty changes to {args.changes_out}")
+    
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(diff, f, indent=2, ensure_ascii=False)
+        print(f"✓ Wrote diff report to {args.report}")
+    
+    print("=" * 70)
+
+if __name__ == '__main__':
+    main()
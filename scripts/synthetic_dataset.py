@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic metadata tree for benchmarking.
+
+Writes OUT/metadata/ with the same layout as the real one:
+- objectjsons/*.json: un-enriched objects (name, difficulty, description,
+  realm, sometimes area and images), spread over the real realm files in
+  their real proportions
+- realms.json, difficulties.json: copied from the real metadata
+- difficultychanges.json: ~5% of objects with a new difficulty
+- replacements.json: ~2% of objects renamed
+- main_realm_objects.json: the Main Realm object list, with ~1% of those
+  objects deliberately written to other realm files (misplaced)
+
+Difficulties follow the real distribution. Output is deterministic for a
+given --seed.
+
+Usage: python synthetic_dataset.py OUT [--objects N] [--seed N]
+"""
+
+import argparse
+import json
+import random
+import shutil
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+
+METADATA_DIR = Path('metadata')
+
+WORDS = (
+    'Red Blue Green Golden Tiny Giant Ancient Broken Frozen Burning Haunted Shiny Rusty '
+    'Crystal Shadow Toxic Lucky Cursed Royal Wooden Steel Paper Glass Neon Sleepy Angry '
+    'Bucket Balloon Anchor Bell Book Cake Donut Flag Lamp Mug Pizza Rock Sock Teapot Trophy '
+    'Umbrella Wrench Crown Cactus Cloud Comet Drum Feather Kettle Lantern Magnet Pickle'
+).split()
+
+def _realm_weights() -> Dict[str, int]:
+    """Object count of each real realm file (at least 1)."""
+    weights = {}
+    for json_file in sorted((METADATA_DIR / 'objectjsons').glob('*.json')):
+        with open(json_file, 'r', encoding='utf-8') as f:
+            weights[json_file.stem] = max(len(json.load(f)), 1)
+    return weights
+
+def _difficulty_weights() -> Dict[str, int]:
+    """How often each difficulty occurs in the real data (at least 1)."""
+    counts = Counter()
+    for json_file in (METADATA_DIR / 'objectjsons').glob('*.json'):
+        with open(json_file, 'r', encoding='utf-8') as f:
+            counts.update(obj.get('difficulty', '') for obj in json.load(f).values())
+    with open(METADATA_DIR / 'difficulties.json', 'r', encoding='utf-8') as f:
+        names = [d['name'] for d in json.load(f).get('difficulties', [])]
+    return {name: max(counts.get(name, 0), 1) for name in names}
+
+def _areas_by_realm() -> Dict[str, List[str]]:
+    with open(METADATA_DIR / 'realms.json', 'r', encoding='utf-8') as f:
+        areas = json.load(f).get('areas', [])
+    by_realm = {}
+    for area in areas:
+        by_realm.setdefault(area.get('parent', ''), []).append(area['label'])
+    return by_realm
+
+def _names(rng: random.Random, count: int) -> List[str]:
+    """Unique object names like "Rusty Teapot" or "Rusty Teapot 12"."""
+    names = []
+    seen = set()
+    while len(names) < count:
+        name = f'{rng.choice(WORDS)} {rng.choice(WORDS)}'
+        if name in seen:
+            name = f'{name} {len(names)}'
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names
+
+def generate(out: Path, objects: int, seed: int = 0) -> Dict[str, int]:
+    """
+    Write a synthetic metadata tree under out/metadata.
+    
+    Returns:
+        Counts: objects, realms, difficulty_changes, replacements, misplaced
+    """
+    rng = random.Random(seed)
+    realm_weights = _realm_weights()
+    difficulty_weights = _difficulty_weights()
+    areas = _areas_by_realm()
+    
+    target = out / 'metadata'
+    (target / 'objectjsons').mkdir(parents=True, exist_ok=True)
+    for name in ('realms.json', 'difficulties.json'):
+        shutil.copyfile(METADATA_DIR / name, target / name)
+    
+    realm_names = list(realm_weights)
+    realms = rng.choices(realm_names, weights=list(realm_weights.values()), k=objects)
+    difficulties = rng.choices(list(difficulty_weights), weights=list(difficulty_weights.values()), k=objects)
+    
+    files = {realm: {} for realm in realm_names}
+    main_realm = {}
+    misplaced = 0
+    changes = {}
+    replacements = {}
+    for name, realm, difficulty in zip(_names(rng, objects), realms, difficulties):
+        obj = {
+            'name': name,
+            'difficulty': difficulty,
+            'description': ' '.join(rng.choice(WORDS).lower() for _ in range(rng.randint(4, 14))),
+            'realm': realm,
+        }
+        if realm in areas and rng.random() < 0.6:
+            obj['area'] = rng.choice(areas[realm])
+        if rng.random() < 0.5:
+            obj['images'] = [{'name': name, 'file': f'{name}.png'}]
+        
+        written_to = realm
+        if realm == 'Main Realm':
+            main_realm.setdefault(difficulty, []).append(name)
+            if rng.random() < 0.01:
+                written_to = rng.choice([r for r in realm_names if r != 'Main Realm'])
+                misplaced += 1
+        files[written_to][name] = obj
+        
+        if rng.random() < 0.05:
+            new = rng.choice([d for d in difficulty_weights if d != difficulty])
+            changes.setdefault(realm, {})[name] = {'previous': difficulty, 'new': new, 'asterisk': False}
+        if rng.random() < 0.02:
+            replacements[name] = f'{name} (Official)'
+    
+    for realm, realm_objects in files.items():
+        with open(target / 'objectjsons' / f'{realm}.json', 'w', encoding='utf-8') as f:
+            json.dump(realm_objects, f, indent=2, ensure_ascii=False)
+    
+    with open(target / 'difficultychanges.json', 'w', encoding='utf-8') as f:
+        json.dump(changes, f, indent=2, ensure_ascii=False)
+    with open(target / 'replacements.json', 'w', encoding='utf-8') as f:
+        json.dump(replacements, f, indent=2, ensure_ascii=False)
+    with open(target / 'main_realm_objects.json', 'w', encoding='utf-8') as f:
+        json.dump({'main_realm_objects': {
+            difficulty: {'total': len(names), 'objects': sorted(names)}
+            for difficulty, names in main_realm.items()
+        }}, f, indent=2, ensure_ascii=False)
+    
+    return {
+        'objects': objects,
+        'realms': len(files),
+        'difficulty_changes': sum(len(c) for c in changes.values()),
+        'replacements': len(replacements),
+        'misplaced': misplaced,
+    }
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Generate a synthetic metadata tree.')
+    parser.add_argument('out', type=Path, help='output folder (metadata/ is created inside)')
+    parser.add_argument('--objects', type=int, default=10000, help='number of objects')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    args = parser.parse_args()
+    
+    counts = generate(args.out, args.objects, args.seed)
+    
+    print(f"{'='*70}")
+    print(f"✓ Generated {counts['objects']} objects in {counts['realms']} realms under {args.out / 'metadata'}")
+    print(f"  Difficulty changes: {counts['difficulty_changes']}")
+    print(f"  Replacements: {counts['replacements']}")
+    print(f"  Misplaced Main Realm objects: {counts['misplaced']}")
+    print(f"{'='*70}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Validate objectjsons for schema and cross-reference consistency.
+
+Checks:
+- Schema: required fields and their types
+- Realm exists in realms.json and matches the realm file
+- Difficulty exists in difficulties.json
+- Categories match difficulty, area and realm
+- Area exists in realms.json areas
+- Image entries are well-formed
+- realmData colors are present when a gradient is set
+- Empty realm files
+- No object name appears in two realms
+
+Realm files are validated across a process pool. Results are cached by
+file content hash, so re-validating an unchanged tree only re-reads bytes.
+
+Usage: python validate_objectjsons.py [--json] [--no-cache]
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import profiler
+from metadata_store import realm_lock
+from realm_index import load_realm_index
+
+METADATA_DIR = Path('metadata/objectjsons')
+CACHE_PATH = Path('.cache/validation.json')
+
+# Bump when rules change so cached results are discarded
+RULES_VERSION = 4
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.gif')
+
+# field -> (expected type(s), required)
+OBJECT_SCHEMA = {
+    'name': (str, True),
+    'difficulty': (str, True),
+    'description': (str, True),
+    'realm': (str, True),
+    'realmData': (dict, True),
+    'difficultyInfo': (dict, True),
+    'images': (list, True),
+    'previousDifficulties': (list, True),
+    'categories': (list, True),
+    'wiki': (dict, True),
+    'area': (str, False),
+    'difficultyHistory': (list, False),
+}
+
+REALM_DATA_SCHEMA = {
+    'label': (str, True),
+    'icon': (str, True),
+    'link': (str, True),
+    'image': (str, True),
+    'colors': (list, True),
+    'gradient': (str, True),
+    'accent': (str, True),
+}
+
+Issue = Dict[str, str]
+Check = Callable[[str, Dict], List[str]]
+
+def compile_schema(schema: Dict, prefix: str = '') -> List[Check]:
+    """
+    Compile a field schema into a flat list of check functions.
+    
+    Args:
+        schema: Mapping of field -> (type, required)
+        prefix: Parent field name used in messages
+    
+    Returns:
+        List of callables taking (object_name, data) and returning messages
+    """
+    checks = []
+    
+    for field, (expected, required) in schema.items():
+        label = f'{prefix}{field}'
+        
+        def check(obj_name, data, field=field, expected=expected,
+                  required=required, label=label):
+            if field not in data:
+                return [f'missing field "{label}"'] if required else []
+            if not isinstance(data[field], expected):
+                return [f'"{label}" should be {expected.__name__}, '
+                        f'got {type(data[field]).__name__}']
+            return []
+        
+        checks.append(check)
+    
+    return checks
+
+OBJECT_CHECKS = compile_schema(OBJECT_SCHEMA)
+REALM_DATA_CHECKS = compile_schema(REALM_DATA_SCHEMA, prefix='realmData.')
+
+def load_reference_data() -> Dict:
+    """Load the realm names, areas and difficulty names objects are checked against."""
+    index = load_realm_index()
+    areas = sorted(index.areas())
+    # Realm labels and the file names they are stored under (e.g. "Inverted Realm")
+    realms = [name for name in index.aliases(listed=True) if name not in areas]
+    
+    with open('metadata/difficulties.json', 'r', encoding='utf-8') as f:
+        difficulties_data = json.load(f)
+    
+    difficulties = sorted(d['name'] for d in difficulties_data.get('difficulties', []) if d.get('name'))
+    
+    return {
+        'realms': realms,
+        'difficulties': difficulties,
+        'areas': areas,
+    }
+
+def validate_object(obj_name: str, obj: Dict, realm_name: str, reference: Dict) -> List[Issue]:
+    """
+    Validate a single object.
+    
+    Returns:
+        List of issues ({level, realm, object, message})
+    """
+    def issue(level, message):
+        return {'level': level, 'realm': realm_name, 'object': obj_name, 'message': message}
+    
+    if not isinstance(obj, dict):
+        return [issue('error', 'object entry is not a dict')]
+    
+    issues = [issue('error', m) for check in OBJECT_CHECKS for m in check(obj_name, obj)]
+    
+    if obj.get('name') not in (None, obj_name):
+        issues.append(issue('error', f'name "{obj.get("name")}" does not match key'))
+    
+    realm = obj.get('realm')
+    if isinstance(realm, str):
+        if realm != realm_name:
+            issues.append(issue('error', f'realm "{realm}" does not match file "{realm_name}.json"'))
+        if realm not in reference['realms']:
+            issues.append(issue('warning', f'realm "{realm}" not found in realms.json'))
+    
+    difficulty = obj.get('difficulty')
+    if isinstance(difficulty, str) and difficulty not in reference['difficulties']:
+        issues.append(issue('error', f'difficulty "{difficulty}" not found in difficulties.json'))
+    
+    for prev in obj.get('previousDifficulties') or []:
+        if prev not in reference['difficulties']:
+            issues.append(issue('warning', f'previous difficulty "{prev}" not found in difficulties.json'))
+    
+    area = obj.get('area')
+    if isinstance(area, str) and area not in reference['areas']:
+        issues.append(issue('error', f'area "{area}" not found in realms.json areas'))
+    
+    categories = obj.get('categories')
+    if isinstance(categories, list) and isinstance(difficulty, str) and isinstance(realm, str):
+        expected = {'Objects', f'{difficulty} Objects', f'{realm} Objects'}
+        if isinstance(area, str) and area:
+            expected.add(f'{area} Objects')
+        missing = expected - set(categories)
+        if missing:
+            issues.append(issue('error', f'missing categories: {", ".join(sorted(missing))}'))
+        stale = [c for c in categories
+                 if c.endswith(' Objects') and c[:-len(' Objects')] in reference['difficulties']
+                 and c != f'{difficulty} Objects']
+        if stale:
+            issues.append(issue('error', f'stale difficulty categories: {", ".join(stale)}'))
+    
+    images = obj.get('images')
+    if isinstance(images, list):
+        for idx, img in enumerate(images):
+            if not isinstance(img, dict) or not isinstance(img.get('file'), str) \
+                    or not isinstance(img.get('name'), str):
+                issues.append(issue('error', f'images[{idx}] should have string "name" and "file"'))
+            elif not img['file'].lower().endswith(IMAGE_EXTENSIONS):
+                issues.append(issue('warning', f'images[{idx}] "{img["file"]}" has no image extension'))
+    
+    realm_data = obj.get('realmData')
+    if isinstance(realm_data, dict):
+        issues.extend(issue('error', m) for check in REALM_DATA_CHECKS for m in check(obj_name, realm_data))
+        if realm_data.get('gradient') and not realm_data.get('colors'):
+            issues.append(issue('error', 'realmData.colors is empty while gradient is set'))
+    
+    return issues
+
+def validate_realm_file(json_file: str, reference: Dict, salt: str = '') -> Dict:
+    """
+    Validate one realm file. Runs in a worker process.
+    
+    The file is read once under its shared lock, and the returned hash is of
+    the bytes that were validated, even if another tool rewrites it meanwhile.
+    
+    Returns:
+        Dictionary with 'issues', 'names' (object names, for cross-realm
+        checks) and 'hash' (see file_digest)
+    """
+    path = Path(json_file)
+    realm_name = path.stem
+    
+    with realm_lock(path, exclusive=False):
+        data = path.read_bytes()
+    digest = data_digest(data, salt)
+    
+    try:
+        objects = json.loads(data)
+    except json.JSONDecodeError as e:
+        return {
+            'issues': [{'level': 'error', 'realm': realm_name, 'object': '', 'message': f'invalid JSON: {e}'}],
+            'names': [],
+            'hash': digest,
+        }
+    
+    if not isinstance(objects, dict):
+        return {
+            'issues': [{'level': 'error', 'realm': realm_name, 'object': '', 'message': 'top level is not a dict'}],
+            'names': [],
+            'hash': digest,
+        }
+    
+    issues = []
+    if not objects:
+        issues.append({'level': 'warning', 'realm': realm_name, 'object': '', 'message': 'realm file is empty'})
+    
+    for obj_name, obj in objects.items():
+        issues.extend(validate_object(obj_name, obj, realm_name, reference))
+    
+    return {'issues': issues, 'names': list(objects.keys()), 'hash': digest}
+
+def data_digest(data: bytes, salt: str) -> str:
+    """Hash a file's bytes together with the reference-data salt."""
+    digest = hashlib.sha256(salt.encode('utf-8'))
+    digest.update(data)
+    return digest.hexdigest()
+
+def file_digest(path: Path, salt: str) -> str:
+    """Hash a file's bytes together with the reference-data salt."""
+    return data_digest(path.read_bytes(), salt)
+
+def load_cache() -> Dict:
+    """Load cached validation results."""
+    if not CACHE_PATH.exists():
+        return {}
+    try:
+        with open(CACHE_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def save_cache(cache: Dict):
+    """Save validation results."""
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(CACHE_PATH, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False)
+
+def validate_objectjsons(use_cache: bool = True, max_workers: Optional[int] = None) -> List[Issue]:
+    """
+    Validate every realm file and run cross-realm checks.
+    
+    Args:
+        use_cache: Reuse results for files whose content hash is unchanged
+        max_workers: Process pool size (default: CPU count)
+    
+    Returns:
+        List of all issues found
+    """
+    reference = load_reference_data()
+    salt = f'{RULES_VERSION}:{json.dumps(reference, sort_keys=True)}'
+    
+    cache = load_cache() if use_cache else {}
+    results = {}
+    pending = {}
+    
+    for json_file in sorted(METADATA_DIR.glob('*.json')):
+        digest = file_digest(json_file, salt)
+        cached = cache.get(json_file.name)
+        if cached and cached.get('hash') == digest:
+            results[json_file.name] = cached
+        else:
+            pending[json_file.name] = (json_file, digest)
+    
+    if pending:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                name: executor.submit(validate_realm_file, str(json_file), reference, salt)
+                for name, (json_file, digest) in pending.items()
+            }
+            for name, future in futures.items():
+                results[name] = future.result()
+    
+    if use_cache:
+        save_cache(results)
+    
+    issues = []
+    locations = {}
+    for name in sorted(results):
+        issues.extend(results[name]['issues'])
+        for obj_name in results[name]['names']:
+            locations.setdefault(obj_name, []).append(Path(name).stem)
+    
+    for obj_name, realms in sorted(locations.items()):
+        if len(realms) > 1:
+            issues.append({
+                'level': 'error',
+                'realm': realms[0],
+                'object': obj_name,
+                'message': f'object appears in multiple realms: {", ".join(realms)}',
+            })
+    
+    return issues
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Validate objectjsons metadata.')
+    parser.add_argument('--json', action='store_true', help='print issues as JSON')
+    parser.add_argument('--no-cache', action='store_true', help='ignore cached results')
+    profiler.add_argument(parser)
+    args = parser.parse_args()
+    profiler.start('validate_objectjsons', args.profile)
+    
+    issues = validate_objectjsons(use_cache=not args.no_cache)
+    errors = [i for i in issues if i['level'] == 'error']
+    
+    if args.json:
+        print(json.dumps(issues, indent=2, ensure_ascii=False))
+    else:
+        print("=" * 70)
+        print("OBJECTJSONS VALIDATION")
+        print("=" * 70 + "\n")
+        
+        current_realm = None
+        for item in sorted(issues, key=lambda i: (i['realm'], i['object'])):
+            if item['realm'] != current_realm:
+                current_realm = item['realm']
+                print(f">> {current_realm}:")
+            marker = '[x]' if item['level'] == 'error' else '[!]'
+            target = f"{item['object']}: " if item['object'] else ''
+            print(f"  {marker} {target}{item['message']}")
+        
+        print("\n" + "=" * 70)
+        print(f"  Errors: {len(errors)}")
+        print(f"  Warnings: {len(issues) - len(errors)}")
+        print("=" * 70)
+    
+    sys.exit(1 if errors else 0)
+
+if __name__ == '__main__':
+    main()
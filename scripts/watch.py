@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Watch the metadata and keep enrichment, validation and page previews current.
+
+Polls the mtimes of the realm files and of realms.json, difficulties.json,
+special_cases.json and replacements.json. Once a burst of saves has settled
+(debounce), each change is mapped to the objects it affects:
+
+- realm file: the objects whose JSON changed, were added or were removed
+- realms.json / special_cases.json: objects of realms whose style changed
+- difficulties.json: objects whose difficulty or one of whose previous
+  difficulties changed
+- replacements.json: objects whose replacement changed
+
+Only those objects are re-enriched (written back through metadata_store),
+re-validated and re-rendered to .cache/previews/<realm>/<object>.wiki.
+Everything is loaded once and kept in memory, so an edit is reflected in its
+preview well under a second after saving. The watcher's own writes are not
+treated as changes.
+
+Usage: python watch.py [--interval SECONDS] [--debounce SECONDS]
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+import profiler
+from enrich_objectjsons import (_digest, build_realm_data, enrich_object, load_reference,
+                                object_fingerprint)
+from extract_rbxlx import load_replacements
+from metadata_store import read_realm, update_realm
+from realm_index import load_realm_index
+from validate_objectjsons import load_reference_data, validate_object
+from wiki_template_generator import WikiTemplateGenerator, preview_path, render_previews
+
+METADATA_DIR = Path('metadata/objectjsons')
+REFERENCE_FILES = [
+    Path('metadata/realms.json'),
+    Path('metadata/difficulties.json'),
+    Path('metadata/special_cases.json'),
+    Path('metadata/replacements.json'),
+]
+
+POLL_INTERVAL = 0.2
+DEBOUNCE = 0.15
+
+def _signature(path: Path) -> Optional[tuple]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+class MetadataWatcher:
+    """In-memory view of the metadata that is updated per changed object."""
+    
+    def __init__(self):
+        self.signatures: Dict[Path, Optional[tuple]] = {}
+        self.realms: Dict[str, Dict] = {}
+        # realm -> object name -> dependency key (see dependency_key)
+        self.keys: Dict[str, Dict[str, str]] = {}
+        self.load_reference()
+        for path in REFERENCE_FILES:
+            self.signatures[path] = _signature(path)
+        for json_file in sorted(METADATA_DIR.glob('*.json')):
+            self.signatures[json_file] = _signature(json_file)
+            self.realms[json_file.stem], _ = read_realm(json_file)
+        self.keys = {realm: self.realm_keys(realm, objects) for realm, objects in self.realms.items()}
+    
+    def load_reference(self):
+        """(Re)load everything derived from the reference files."""
+        self.reference = load_reference()
+        self.generated = set(self.reference['generated'])
+        self.validation = load_reference_data()
+        self.replacements = load_replacements()
+        self.generator = WikiTemplateGenerator()
+        index = load_realm_index()
+        self.realm_digests = {}
+        for realm in set(self.realms) | {json_file.stem for json_file in METADATA_DIR.glob('*.json')}:
+            self.realm_digests[realm] = _digest([index.style(realm), index.special(realm),
+                                                 index.wiki_name(realm)])
+    
+    def dependency_key(self, realm: str, name: str, obj: Dict) -> str:
+        """Everything outside the object that its enrichment, validation and page depend on."""
+        difficulty_digests = self.reference['difficulty_digests']
+        generated = self.generated
+        # Hand-added categories enrichment would now treat as generated, or no longer
+        categories = [c for c in obj.get('categories') or []
+                      if isinstance(c, str) and c.endswith(' Objects') and c[:-len(' Objects')] in generated]
+        return _digest([
+            object_fingerprint(obj, realm, self.reference),
+            categories,
+            self.realm_digests.get(realm),
+            [difficulty_digests.get(prev) for prev in obj.get('previousDifficulties') or []],
+            self.replacements.get(name),
+        ])
+    
+    def realm_keys(self, realm: str, objects: Dict) -> Dict[str, str]:
+        return {name: self.dependency_key(realm, name, obj) for name, obj in objects.items()
+                if isinstance(obj, dict)}
+    
+    def changed_paths(self) -> List[Path]:
+        """Watched files whose mtime or size changed, including new and deleted realm files."""
+        paths = set(self.signatures) | set(METADATA_DIR.glob('*.json'))
+        return sorted(path for path in paths if _signature(path) != self.signatures.get(path))
+    
+    def affected_objects(self, paths: List[Path]) -> Dict[str, Set[str]]:
+        """
+        Map changed files to the objects they affect.
+        
+        Returns:
+            Realm name -> names of affected (changed, added or removed) objects
+        """
+        affected = {}
+        realm_files = set(self.realms)
+        for path in paths:
+            self.signatures[path] = _signature(path)
+            if path in REFERENCE_FILES:
+                continue
+            realm = path.stem
+            old = self.realms.get(realm, {})
+            new = {}
+            if path.exists():
+                try:
+                    new, _ = read_realm(path)
+                except ValueError as e:
+                    # Saved mid-edit; wait for the next save
+                    print(f"  [x] {realm}: invalid JSON ({e})")
+                    continue
+            names = {name for name in set(old) | set(new) if old.get(name) != new.get(name)}
+            if names:
+                affected.setdefault(realm, set()).update(names)
+            if path.exists():
+                self.realms[realm] = new
+            else:
+                self.realms.pop(realm, None)
+        
+        # Realm files also define realm names and generated categories
+        if any(path in REFERENCE_FILES for path in paths) or set(self.realms) != realm_files:
+            self.load_reference()
+        
+        # Objects whose inputs outside the object itself changed
+        for realm, objects in self.realms.items():
+            keys = self.realm_keys(realm, objects)
+            old_keys = self.keys.get(realm, {})
+            names = {name for name in keys if keys[name] != old_keys.get(name)}
+            if names:
+                affected.setdefault(realm, set()).update(names)
+            self.keys[realm] = keys
+        for realm in set(self.keys) - set(self.realms):
+            del self.keys[realm]
+        
+        return affected
+    
+    def process(self, realm: str, names: Set[str]) -> Dict:
+        """Re-enrich, re-validate and re-render the affected objects of one realm."""
+        json_file = METADATA_DIR / f'{realm}.json'
+        result = {'enriched': 0, 'issues': [], 'rendered': 0}
+        if not json_file.exists():
+            # Realm file deleted
+            for name in names:
+                preview_path(realm, name).unlink(missing_ok=True)
+            realm_dir = preview_path(realm, '').parent
+            if realm_dir.is_dir() and not any(realm_dir.iterdir()):
+                realm_dir.rmdir()
+            return result
+        
+        realm_data = build_realm_data(realm, self.reference)
+        latest = {}
+        
+        def enrich(objects: Dict) -> int:
+            changed = 0
+            for name in names:
+                obj = objects.get(name)
+                if not isinstance(obj, dict):
+                    continue
+                before = json.dumps(obj, sort_keys=True)
+                enrich_object(obj, realm, realm_data, self.reference, self.generated)
+                if json.dumps(obj, sort_keys=True) != before:
+                    changed += 1
+            latest['objects'] = objects
+            return changed
+        
+        with profiler.phase('enrich'):
+            result['enriched'] = update_realm(json_file, enrich)
+        # Our own write is not a change to react to
+        self.realms[realm] = latest['objects']
+        self.signatures[json_file] = _signature(json_file)
+        self.keys[realm] = self.realm_keys(realm, latest['objects'])
+        
+        with profiler.phase('validate'):
+            for name in sorted(names):
+                if name in latest['objects']:
+                    result['issues'].extend(validate_object(name, latest['objects'][name], realm, self.validation))
+            # The cross-realm check, for the affected names only
+            for name in names:
+                if name not in latest['objects']:
+                    continue
+                others = [other for other, objects in self.realms.items() if other != realm and name in objects]
+                if others:
+                    result['issues'].append({'level': 'error', 'realm': realm, 'object': name,
+                                             'message': f'object also in: {", ".join(others)}'})
+        
+        with profiler.phase('render'):
+            result['rendered'] = render_previews(json_file, generator=self.generator, names=sorted(names))
+        return result
+    
+    def poll(self, debounce: float = DEBOUNCE) -> bool:
+        """
+        Handle changes since the last poll, if any.
+        
+        Returns:
+            Whether anything changed
+        """
+        paths = self.changed_paths()
+        if not paths:
+            return False
+        
+        # Let a burst of saves settle
+        while True:
+            time.sleep(debounce)
+            more = [path for path in self.changed_paths() if path not in paths]
+            if not more:
+                break
+            paths.extend(more)
+        
+        start = time.perf_counter()
+        names = ', '.join(path.name for path in paths[:3]) + (f' (+{len(paths) - 3})' if len(paths) > 3 else '')
+        print(f">> {names} changed")
+        
+        affected = self.affected_objects(paths)
+        for realm, realm_names in sorted(affected.items()):
+            result = self.process(realm, realm_names)
+            profiler.count('objects', len(realm_names))
+            errors = [i for i in result['issues'] if i['level'] == 'error']
+            print(f"  [OK] {realm:<36} {len(realm_names)} affected, {result['enriched']} re-enriched, "
+                  f"{result['rendered']} previews, {len(errors)} errors, "
+                  f"{len(result['issues']) - len(errors)} warnings")
+            for item in result['issues']:
+                marker = '[x]' if item['level'] == 'error' else '[!]'
+                print(f"      {marker} {item['object']}: {item['message']}")
+        if not affected:
+            print("  (no objects affected)")
+        print(f"  Done in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return True
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Re-enrich, validate and render objects as metadata changes.')
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL, help='seconds between polls')
+    parser.add_argument('--debounce', type=float, default=DEBOUNCE,
+                        help='seconds without further changes before processing')
+    profiler.add_argument(parser)
+    args = parser.parse_args()
+    profiler.start('watch', args.profile)
+    
+    start = time.perf_counter()
+    watcher = MetadataWatcher()
+    total = sum(len(objects) for objects in watcher.realms.values())
+    
+    print("=" * 70)
+    print(f"WATCHING {len(watcher.realms)} realm files ({total} objects), "
+          f"loaded in {time.perf_counter() - start:.2f}s")
+    print("=" * 70)
+    print("Previews are written to .cache/previews/. Press Ctrl+C to stop.\n")
+    
+    try:
+        while True:
+            if not watcher.poll(args.debounce):
+                time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print("\nStopped.")
+
+if __name__ == '__main__':
+    main()
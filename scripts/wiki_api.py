@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Thin MediaWiki API query helper on top of a pywikibot site.
+
+Follows query continuation and counts requests, so bulk tools can report
+how many round-trips a run cost. Queries made with cache=True go through
+pywikibot's API cache with the per-module TTLs of apicache_manager.py.
+"""
+
+import datetime
+from typing import Dict, Iterator, List
+
+from apicache_manager import ttl_for
+
+from http_transport import install_pywikibot
+from wiki_dump import normalize_title
+
+WIKI_API_URL = 'https://ftbc.fandom.com/api.php'
+
+class WikiAPI:
+    """Run raw API queries against the FTBC wiki."""
+    
+    def __init__(self, site=None):
+        """
+        Initialize the helper.
+        
+        Args:
+            site: Existing pywikibot site (default: connect to the FTBC wiki)
+        """
+        if site is None:
+            import pywikibot
+            install_pywikibot()
+            site = pywikibot.Site(url=WIKI_API_URL)
+        self.site = site
+        self.requests = 0
+    
+    def query(self, cache: bool = False, **params) -> Iterator[Dict]:
+        """
+        Run an action=query request, following continuation.
+        
+        Args:
+            cache: Serve and store responses through pywikibot's API cache
+        
+        Yields:
+            The 'query' part of each response
+        """
+        params.update(action='query', formatversion=2)
+        while True:
+            if cache:
+                from pywikibot.data.api import CachedRequest
+                request = CachedRequest(datetime.timedelta(seconds=ttl_for(params)),
+                                        site=self.site, parameters=params)
+            else:
+                request = self.site.simple_request(**params)
+            self.requests += 1
+            data = request.submit()
+            yield data.get('query', {})
+            if 'continue' not in data:
+                break
+            params.update(data['continue'])
+    
+    def latest_revisions(self, titles: List[str], content: bool = True,
+                         batch_size: int = 50) -> Dict[str, Dict]:
+        """
+        Fetch the latest revision of many pages, `batch_size` titles per request.
+        
+        Args:
+            titles: Page titles
+            content: Include the wikitext (otherwise only ids and timestamps)
+            batch_size: Titles per request (50 is the limit for normal accounts)
+        
+        Returns:
+            Dictionary of page title -> {'revid', 'timestamp', 'text'} for existing pages
+        """
+        rvprop = 'ids|timestamp|content' if content else 'ids|timestamp'
+        
+        revisions = {}
+        for start in range(0, len(titles), batch_size):
+            batch = titles[start:start + batch_size]
+            for query in self.query(prop='revisions', rvprop=rvprop, rvslots='main',
+                                    titles='|'.join(batch)):
+                for page in query.get('pages', []):
+                    if not page.get('revisions'):
+                        continue
+                    rev = page['revisions'][0]
+                    slot = rev.get('slots', {}).get('main', {})
+                    revisions[page['title']] = {
+                        'revid': rev['revid'],
+                        'timestamp': rev.get('timestamp', ''),
+                        'text': slot.get('content', slot.get('*', '')),
+                    }
+        return revisions
+    
+    def image_info(self, filenames: List[str], batch_size: int = 50) -> Dict[str, Dict]:
+        """
+        Fetch url, sha1 and size of many files, `batch_size` per request.
+        
+        Args:
+            filenames: File names without the "File:" prefix
+            batch_size: Titles per request
+        
+        Returns:
+            Dictionary of requested filename -> {'url', 'sha1', 'size'} for existing files
+        """
+        by_title = {f'File:{normalize_title(name)}': name for name in filenames}
+        titles = list(by_title)
+        
+        info = {}
+        for start in range(0, len(titles), batch_size):
+            batch = titles[start:start + batch_size]
+            for query in self.query(prop='imageinfo', iiprop='url|sha1|size',
+                                    titles='|'.join(batch)):
+                for page in query.get('pages', []):
+                    name = by_title.get(f"File:{normalize_title(page['title'].split(':', 1)[-1])}")
+                    if name is None or not page.get('imageinfo'):
+                        continue
+                    image = page['imageinfo'][0]
+                    info[name] = {'url': image['url'], 'sha1': image['sha1'], 'size': image.get('size', 0)}
+        return info
+    
+    def category_members(self, category: str, namespace: int = 0, cache: bool = False) -> List[str]:
+        """
+        List every page title in a category.
+        
+        Args:
+            category: Category name, with or without the "Category:" prefix
+            namespace: Only list pages in this namespace
+            cache: Serve the listing from the API cache (up to its TTL old);
+                only for prewarming and read-only reports, not for checking
+                categories that were just fixed
+        """
+        if not category.startswith('Category:'):
+            category = f'Category:{category}'
+        
+        titles = []
+        for query in self.query(cache=cache, list='categorymembers', cmtitle=category,
+                                cmnamespace=namespace, cmlimit='max', cmprop='title'):
+            titles.extend(m['title'] for m in query.get('categorymembers', []))
+        return titles
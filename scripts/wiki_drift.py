@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Detect drift between live wiki pages and objectjsons metadata.
+
+Compares each object page's CharacterInfo values against the metadata:
+- difficulty (vs. "difficulty")
+- hint (vs. "description")
+- area (vs. "area", or the realm when no area is set)
+- gallery images (vs. the files in "images")
+
+Pages are fetched in batches of 50 titles. Parsed values are cached in
+.cache/wiki_pages.json keyed by revid: each run first checks the latest
+revids (one request per 50 titles) and only downloads content for pages
+that changed, so checking every object costs tens of requests.
+
+With --dump, page text comes from a MediaWiki XML dump instead.
+
+Usage: python wiki_drift.py [--realm NAME] [--dump DUMP.xml] [--json drift.json]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import profiler
+from realm_index import load_realm_index
+from wiki_dump import normalize_title
+from wiki_scraper_pywikibot import FTBCWikiScraper
+
+METADATA_DIR = Path('metadata/objectjsons')
+CACHE_PATH = Path('.cache/wiki_pages.json')
+
+# Bump when page parsing changes so cached values are discarded
+PARSER_VERSION = 1
+
+DRIFT_FIELDS = ('difficulty', 'hint', 'area', 'images')
+
+def parse_page(scraper: FTBCWikiScraper, wikitext: str) -> Dict:
+    """
+    Read the compared CharacterInfo values from a page.
+    
+    Returns:
+        Dictionary with difficulty, hint, area and images (missing values are None)
+    """
+    info = scraper.extract_character_info(wikitext)
+    images = scraper.parse_gallery_files(info['character_raw']) if 'character_raw' in info else []
+    return {
+        'difficulty': info.get('difficulty'),
+        'hint': info.get('hint'),
+        'area': info.get('area'),
+        'images': sorted(images),
+    }
+
+def metadata_values(obj: Dict, realm: str) -> Dict:
+    """Values the page should show for an object (matches wiki_template_generator)."""
+    area = load_realm_index().wiki_name(obj.get('area') or realm)
+    return {
+        'difficulty': obj.get('difficulty') or None,
+        'hint': (obj.get('description') or '').strip() or None,
+        'area': area,
+        'images': sorted(img['file'] for img in obj.get('images', []) if isinstance(img, dict) and img.get('file')),
+    }
+
+def load_cache() -> Dict[str, Dict]:
+    """Load cached page values (title -> {'revid', 'values'})."""
+    if not CACHE_PATH.exists():
+        return {}
+    try:
+        with open(CACHE_PATH, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('version') != PARSER_VERSION:
+        return {}
+    return cache.get('pages', {})
+
+def save_cache(pages: Dict[str, Dict]):
+    """Persist cached page values."""
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(CACHE_PATH, 'w', encoding='utf-8') as f:
+        json.dump({'version': PARSER_VERSION, 'pages': pages}, f, ensure_ascii=False)
+
+def fetch_page_values(scraper: FTBCWikiScraper, titles: List[str]) -> Dict[str, Dict]:
+    """
+    Parsed values of every existing page, through the revid cache.
+    
+    Returns:
+        Dictionary of normalized title -> parsed values
+    """
+    from wiki_api import WikiAPI
+    
+    api = WikiAPI(scraper.site)
+    cache = load_cache()
+    
+    with profiler.phase('fetch'):
+        latest = {normalize_title(t): rev['revid']
+                  for t, rev in api.latest_revisions(titles, content=False).items()}
+        stale = [t for t, revid in latest.items() if cache.get(t, {}).get('revid') != revid]
+        revisions = api.latest_revisions(stale)
+    
+    with profiler.phase('parse'):
+        for title, rev in revisions.items():
+            cache[normalize_title(title)] = {'revid': rev['revid'], 'values': parse_page(scraper, rev['text'])}
+    
+    save_cache(cache)
+    print(f"Checked {len(latest)} pages ({len(stale)} changed) in {api.requests} requests\n")
+    
+    return {t: cache[t]['values'] for t in latest if t in cache}
+
+def read_dump_values(scraper: FTBCWikiScraper, titles: List[str]) -> Dict[str, Dict]:
+    """Parsed values of every page present in the scraper's dump."""
+    values = {}
+    for title in titles:
+        wikitext = scraper.fetch_page_text(title)
+        if wikitext:
+            values[title] = parse_page(scraper, wikitext)
+    return values
+
+def detect_drift(realm_filter: Optional[str] = None, dump_path: Optional[Path] = None) -> Dict:
+    """
+    Compare wiki values against metadata for every object.
+    
+    Returns:
+        {'drift': [{name, realm, title, field, wiki, metadata}], 'missing': [{name, realm, title}], 'checked': int}
+    """
+    scraper = FTBCWikiScraper(dump_path)
+    
+    objects_by_title = {}
+    for json_file in sorted(METADATA_DIR.glob('*.json')):
+        if realm_filter and json_file.stem != realm_filter:
+            continue
+        with open(json_file, 'r', encoding='utf-8') as f:
+            objects = json.load(f)
+        for name, obj in objects.items():
+            title = normalize_title(scraper.get_wiki_name(name))
+            objects_by_title[title] = (name, json_file.stem, obj)
+    
+    titles = sorted(objects_by_title)
+    profiler.count('objects', len(titles))
+    if dump_path:
+        pages = read_dump_values(scraper, titles)
+    else:
+        pages = fetch_page_values(scraper, titles)
+    
+    report = {'drift': [], 'missing': [], 'checked': 0}
+    for title in titles:
+        name, realm, obj = objects_by_title[title]
+        wiki = pages.get(title)
+        if wiki is None:
+            report['missing'].append({'name': name, 'realm': realm, 'title': title})
+            continue
+        
+        report['checked'] += 1
+        expected = metadata_values(obj, realm)
+        for field in DRIFT_FIELDS:
+            if wiki[field] != expected[field]:
+                report['drift'].append({
+                    'name': name,
+                    'realm': realm,
+                    'title': title,
+                    'field': field,
+                    'wiki': wiki[field],
+                    'metadata': expected[field],
+                })
+    
+    return report
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Compare wiki pages against objectjsons.')
+    parser.add_argument('--realm', help='only check this realm')
+    parser.add_argument('--dump', type=Path, help='read pages from a MediaWiki XML dump')
+    parser.add_argument('--json', type=Path, help='write the drift report as JSON')
+    profiler.add_argument(parser)
+    args = parser.parse_args()
+    profiler.start('wiki_drift', args.profile)
+    
+    if not METADATA_DIR.exists():
+        print(f"Error: {METADATA_DIR} not found")
+        sys.exit(1)
+    if args.dump and not args.dump.exists():
+        print(f"Error: {args.dump} not found")
+        sys.exit(1)
+    
+    report = detect_drift(args.realm, args.dump)
+    
+    print("=" * 70)
+    print("WIKI DRIFT")
+    print("=" * 70 + "\n")
+    
+    for item in report['drift']:
+        print(f"  [~] {item['name']} ({item['realm']}) {item['field']}: "
+              f"wiki={item['wiki']!r} metadata={item['metadata']!r}")
+    
+    stale_pages = len({item['title'] for item in report['drift']})
+    print(f"\n  Pages checked: {report['checked']}")
+    print(f"  Stale pages: {stale_pages}")
+    for field in DRIFT_FIELDS:
+        print(f"    {field}: {sum(1 for item in report['drift'] if item['field'] == field)}")
+    print(f"  Objects without a page: {len(report['missing'])}")
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n✓ Wrote drift report to {args.json}")
+    
+    print("=" * 70)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Streaming reader for MediaWiki XML dumps (Special:Export or full history).
+
+Pages are read with iterparse. Every finished <revision> and <page> is
+cleared as soon as it has been read, so even full-history dumps are read
+in constant memory. Plain .xml, .xml.gz and .xml.bz2 files are supported.
+
+Usage: python wiki_dump.py DUMP.xml
+"""
+
+import bz2
+import gzip
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+MAIN_NAMESPACE = 0
+FILE_NAMESPACE = 6
+
+def normalize_title(title: str) -> str:
+    """Normalize a page title the way MediaWiki does (spaces, first letter)."""
+    title = ' '.join(title.replace('_', ' ').split())
+    return title[:1].upper() + title[1:]
+
+def _open_dump(path: Path):
+    """Open a dump file, decompressing by extension."""
+    if path.suffix == '.gz':
+        return gzip.open(path, 'rb')
+    if path.suffix == '.bz2':
+        return bz2.open(path, 'rb')
+    return open(path, 'rb')
+
+def _local(tag: str) -> str:
+    """Strip the export namespace from a tag."""
+    return tag.rsplit('}', 1)[-1]
+
+def iter_dump_pages(dump_path: Path, namespaces: Optional[Set[int]] = None,
+                    history: bool = False) -> Iterator[Dict]:
+    """
+    Stream pages from a MediaWiki XML dump.
+    
+    Args:
+        dump_path: Dump file
+        namespaces: Only yield pages in these namespaces (default: all)
+        history: Yield every revision instead of only the latest one
+    
+    Yields:
+        {'title', 'ns', 'id', 'redirect', 'revisions': [{'revid', 'timestamp', 'text'}]}
+        with revisions oldest first
+    """
+    with _open_dump(Path(dump_path)) as f:
+        root = None
+        page = None
+        for event, elem in ET.iterparse(f, events=('start', 'end')):
+            tag = _local(elem.tag)
+            
+            if event == 'start':
+                if root is None:
+                    root = elem
+                elif tag == 'page':
+                    page = {'title': '', 'ns': 0, 'id': 0, 'redirect': False, 'revisions': []}
+                continue
+            
+            if page is None:
+                continue
+            
+            if tag == 'revision':
+                revision = {'revid': 0, 'timestamp': '', 'text': ''}
+                for child in elem:
+                    child_tag = _local(child.tag)
+                    if child_tag == 'id':
+                        revision['revid'] = int(child.text or 0)
+                    elif child_tag == 'timestamp':
+                        revision['timestamp'] = child.text or ''
+                    elif child_tag == 'text':
+                        revision['text'] = child.text or ''
+                
+                if history:
+                    page['revisions'].append(revision)
+                elif not page['revisions'] or revision['revid'] >= page['revisions'][0]['revid']:
+                    page['revisions'] = [revision]
+                elem.clear()
+            
+            elif tag == 'title':
+                page['title'] = elem.text or ''
+            elif tag == 'ns':
+                page['ns'] = int(elem.text or 0)
+            elif tag == 'id' and not page['id'] and not page['revisions']:
+                page['id'] = int(elem.text or 0)
+            elif tag == 'redirect':
+                page['redirect'] = True
+            
+            elif tag == 'page':
+                if namespaces is None or page['ns'] in namespaces:
+                    page['revisions'].sort(key=lambda r: r['revid'])
+                    yield page
+                page = None
+                # Detach finished pages so the tree never grows
+                root.clear()
+
+def load_dump(dump_path: Path) -> Tuple[Dict[str, str], Set[str]]:
+    """
+    Load the latest text of every article and the set of file names.
+    
+    Redirects are skipped, matching a live fetch that finds no content.
+    
+    Returns:
+        Tuple of (normalized title -> wikitext, normalized file names without "File:")
+    """
+    pages = {}
+    files = set()
+    
+    for page in iter_dump_pages(dump_path, {MAIN_NAMESPACE, FILE_NAMESPACE}):
+        if page['ns'] == FILE_NAMESPACE:
+            files.add(normalize_title(page['title'].split(':', 1)[-1]))
+        elif not page['redirect'] and page['revisions']:
+            pages[normalize_title(page['title'])] = page['revisions'][-1]['text']
+    
+    return pages, files
+
+def main():
+    """Summarize a dump file."""
+    if len(sys.argv) < 2:
+        print("Usage: python wiki_dump.py DUMP.xml")
+        sys.exit(1)
+    
+    dump_path = Path(sys.argv[1])
+    if not dump_path.exists():
+        print(f"Error: {dump_path} not found")
+        sys.exit(1)
+    
+    start = time.perf_counter()
+    pages, files = load_dump(dump_path)
+    elapsed = time.perf_counter() - start
+    
+    print(f"{dump_path.name}: {len(pages)} pages, {len(files)} files ({elapsed:.2f}s)")
+
+if __name__ == '__main__':
+    main()
@@ -8,30 +8,64 @@ enriched objectjsons metadata with:
 - Previous difficulties
 - Wiki content (Info and Obtaining sections)
 
-Requires: pywikibot
+Pages can also be read from a MediaWiki XML dump (Special:Export or full
+history) with --dump, which runs the same extraction with no API calls.
+
+Requires: pywikibot (live mode only)
 Install: pip install pywikibot
+
+Usage: python wiki_scraper_pywikibot.py [REALM ...] [--dump DUMP.xml]
 """
 
-import pywikibot
+import argparse
 import json
 import re
+import time
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import sys
 
+try:
+    import pywikibot
+except ImportError:
+    pywikibot = None
+
+import profiler
+from http_transport import fetch_raw, install_pywikibot, summary as transport_summary
+from metadata_store import read_realm, update_realm
+from wiki_dump import load_dump, normalize_title
+
 class FTBCWikiScraper:
     """Scrape FTBC wiki using PyWikiBot."""
     
-    def __init__(self):
-        """Initialize scraper with PyWikiBot site."""
-        try:
-            # Connect to FTBC Fandom wiki
-            self.site = pywikibot.Site(url='https://ftbc.fandom.com/api.php')
-            print(f"Connected to: {self.site}")
-        except Exception as e:
-            print(f"Error connecting to wiki: {e}")
-            raise
+    def __init__(self, dump_path: Optional[Path] = None):
+        """
+        Initialize scraper with PyWikiBot site, or with an XML dump.
+        
+        Args:
+            dump_path: Read pages from this MediaWiki XML dump instead of the API
+        """
+        self.site = None
+        self.dump_pages = None
+        self.dump_files = None
+        
+        if dump_path:
+            start = time.perf_counter()
+            self.dump_pages, self.dump_files = load_dump(dump_path)
+            print(f"Loaded dump: {dump_path.name} ({len(self.dump_pages)} pages, "
+                  f"{len(self.dump_files)} files, {time.perf_counter() - start:.2f}s)")
+        else:
+            if pywikibot is None:
+                raise RuntimeError("pywikibot is required for live scraping (pip install pywikibot)")
+            try:
+                # Connect to FTBC Fandom wiki through the shared transport
+                install_pywikibot()
+                self.site = pywikibot.Site(url='https://ftbc.fandom.com/api.php')
+                print(f"Connected to: {self.site}")
+            except Exception as e:
+                print(f"Error connecting to wiki: {e}")
+                raise
         
         self.metadata_dir = Path('metadata/objectjsons')
         
@@ -73,18 +107,20 @@ class FTBCWikiScraper:
         Returns:
             Raw wiki markup or None if page doesn't exist
         """
-        try:
-            page = pywikibot.Page(self.site, object_name)
-            
-            if not page.exists():
-                return None
-            
-            return page.get()
+        if self.dump_pages is not None:
+            return self.dump_pages.get(normalize_title(object_name))
         
-        except pywikibot.exceptions.NoPageError:
+        # The fetch pool's requests go through pywikibot's read throttle, like page.get()
+        throttle = (lambda: self.site.throttle(write=False)) if self.site is not None else None
+        try:
+            # action=raw with ETag/Last-Modified, so unchanged pages come back as 304
+            text = fetch_raw(object_name, throttle=throttle)
+        except Exception:
             return None
-        except Exception as e:
+        
+        if text is None or re.match(r'\s*#redirect', text, re.IGNORECASE):
             return None
+        return text
     
     def extract_character_info(self, wikitext: str) -> Dict:
         """
@@ -163,6 +199,15 @@ class FTBCWikiScraper:
             for ext in extensions:
                 filename = f"{filename_base}.{ext}"
                 
+                if self.dump_files is not None:
+                    if normalize_title(filename) in self.dump_files:
+                        images.append({
+                            'name': display_name,
+                            'file': filename
+                        })
+                        break
+                    continue
+                
                 try:
                     # Try to get the file page
                     file_page = pywikibot.FilePage(self.site, filename)
@@ -197,6 +242,54 @@ class FTBCWikiScraper:
         
         return difficulties
     
+    def parse_gallery_files(self, raw: str) -> List[str]:
+        """
+        Parse image filenames from a raw |character= value.
+        
+        Handles both <gallery> lines ("File.png|Caption") and [[File:...]] links.
+        
+        Args:
+            raw: Raw character content
+            
+        Returns:
+            List of filenames
+        """
+        files = []
+        
+        for match in re.finditer(r'\[\[\s*(?:File|Image)\s*:\s*([^\]|]+)', raw, re.IGNORECASE):
+            files.append(match.group(1).strip())
+        
+        gallery = re.search(r'<gallery[^>]*>(.*?)</gallery>', raw, re.DOTALL | re.IGNORECASE)
+        if gallery:
+            for line in gallery.group(1).splitlines():
+                filename = re.sub(r'^(?:File|Image)\s*:', '', line.split('|')[0].strip(), flags=re.IGNORECASE)
+                if filename:
+                    files.append(filename.strip())
+        
+        return [f for i, f in enumerate(files) if f not in files[:i]]
+    
+    def extract_sections(self, wikitext: str) -> Dict[str, str]:
+        """
+        Extract the Info and Obtaining sections from wiki markup.
+        
+        Args:
+            wikitext: Raw wiki markup
+            
+        Returns:
+            Dictionary with 'info' and/or 'obtaining' keys (only non-empty sections)
+        """
+        sections = {}
+        
+        for key, heading in (('info', 'Info'), ('obtaining', 'Obtaining')):
+            match = re.search(
+                rf'^==\s*{heading}\s*==[^\n]*\n(.*?)(?=^==[^=]|^\[\[Category:|^</div>|\Z)',
+                wikitext, re.DOTALL | re.MULTILINE | re.IGNORECASE
+            )
+            if match and match.group(1).strip():
+                sections[key] = match.group(1).strip()
+        
+        return sections
+    
     def scrape_object(self, object_name: str) -> Optional[Dict]:
         """
         Scrape all wiki data for an object.
@@ -217,13 +310,19 @@ class FTBCWikiScraper:
         # Also try to get previous difficulties from wiki page
         wikitext = self.fetch_page_text(object_name)
         if wikitext:
-            char_info = self.extract_character_info(wikitext)
+            with profiler.phase('parse'):
+                char_info = self.extract_character_info(wikitext)
             
-            # Previous difficulties
-            if 'previousdifficulties_raw' in char_info:
-                prev_diffs = self.parse_previous_difficulties(char_info['previousdifficulties_raw'])
-                if prev_diffs:
-                    result['previousDifficulties'] = prev_diffs
+                # Previous difficulties
+                if 'previousdifficulties_raw' in char_info:
+                    prev_diffs = self.parse_previous_difficulties(char_info['previousdifficulties_raw'])
+                    if prev_diffs:
+                        result['previousDifficulties'] = prev_diffs
+                
+                # Info / Obtaining sections
+                sections = self.extract_sections(wikitext)
+                if sections:
+                    result['wiki'] = sections
         
         return result if result else None
     
@@ -243,16 +342,17 @@ class FTBCWikiScraper:
             return 0, 0
         
         # Load metadata
-        with open(json_file, 'r', encoding='utf-8') as f:
-            objects = json.load(f)
+        with profiler.phase('load'):
+            objects, _ = read_realm(json_file)
         
         total_count = len(objects)
         object_names = list(objects.keys())
+        profiler.count('objects', total_count)
         
         # Scrape all objects in parallel
         # Map: rbxlx_name -> wiki_name (for scraping)
         wiki_results = {}
-        with ThreadPoolExecutor(max_workers=5) as executor:
+        with profiler.phase('fetch'), ThreadPoolExecutor(max_workers=5) as executor:
             # Submit all scrape tasks using wiki names (after replacements)
             futures = {}
             for rbxlx_name in object_names:
@@ -273,35 +373,45 @@ class FTBCWikiScraper:
                         else:
                             print(f"  [OK] {rbxlx_name}")
                 except Exception as e:
-                    pass
-        
-        # Update metadata only for objects that had wiki data
-        updated_count = 0
-        for obj_name, wiki_data in wiki_results.items():
-            obj_data = objects[obj_name]
+                    profiler.count('errors')
+                    print(f"  [x] {rbxlx_name}: {e}")
+        
+        def apply(objects: Dict) -> int:
+            """Update metadata only for objects that had wiki data"""
+            updated_count = 0
+            for obj_name, wiki_data in wiki_results.items():
+                # Objects may have been moved or removed by another tool while scraping
+                obj_data = objects.get(obj_name)
+                if obj_data is None:
+                    continue
             
-            # Update with images if found
-            if 'images' in wiki_data:
-                obj_data['images'] = wiki_data['images']
+                # Update with images if found
+                if 'images' in wiki_data:
+                    obj_data['images'] = wiki_data['images']
             
-            # Update with previous difficulties if found
-            if 'previousDifficulties' in wiki_data:
-                obj_data['previousDifficulties'] = wiki_data['previousDifficulties']
+                # Update with previous difficulties if found
+                if 'previousDifficulties' in wiki_data:
+                    obj_data['previousDifficulties'] = wiki_data['previousDifficulties']
             
-            updated_count += 1
+                # Update wiki sections if found
+                if 'wiki' in wiki_data:
+                    obj_data.setdefault('wiki', {'info': '', 'obtaining': ''}).update(wiki_data['wiki'])
+                
+                updated_count += 1
+            return updated_count
         
-        # Save updated metadata
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(objects, f, indent=2, ensure_ascii=False)
+        # Apply to the realm file as it is now, not as it was before scraping
+        with profiler.phase('write'):
+            updated_count = update_realm(json_file, apply)
         
         return updated_count, total_count
     
-    def process_all(self, realm_filter: Optional[str] = None):
+    def process_all(self, realm_filter: Optional[List[str]] = None):
         """
-        Process all realms or specific realm.
+        Process all realms or specific realms.
         
         Args:
-            realm_filter: Optional specific realm name to process
+            realm_filter: Optional realm names to process
         """
         if not self.metadata_dir.exists():
             print(f"Error: {self.metadata_dir} not found")
@@ -311,13 +421,16 @@ class FTBCWikiScraper:
         total_updated = 0
         total_objects = 0
         
-        print("Scraping FTBC wiki using PyWikiBot...\n")
+        if self.dump_pages is not None:
+            print("Scraping FTBC wiki from XML dump...\n")
+        else:
+            print("Scraping FTBC wiki using PyWikiBot...\n")
         
         for json_file in json_files:
             realm_name = json_file.stem
             
             # Filter by realm if specified
-            if realm_filter and realm_name != realm_filter:
+            if realm_filter and realm_name not in realm_filter:
                 continue
             
             print(f">> {realm_name}:")
@@ -329,19 +442,27 @@ class FTBCWikiScraper:
         print("=" * 70)
         print("[DONE] Wiki scraping complete!")
         print(f"  Total objects updated: {total_updated}/{total_objects}")
+        if self.site is not None:
+            print(f"  {transport_summary()}")
         print("=" * 70)
 
 def main():
     """Main entry point."""
-    import sys
+    parser = argparse.ArgumentParser(description='Scrape the FTBC wiki into objectjsons.')
+    parser.add_argument('realms', nargs='*', help='only process these realms')
+    parser.add_argument('--dump', type=Path,
+                        help='read pages from a MediaWiki XML dump instead of the API')
+    profiler.add_argument(parser)
+    args = parser.parse_args()
+    profiler.start('wiki_scraper_pywikibot', args.profile)
+    
+    if args.dump and not args.dump.exists():
+        print(f"Error: {args.dump} not found")
+        sys.exit(1)
     
     try:
-        scraper = FTBCWikiScraper()
-        
-        # Get optional realm filter from command line
-        realm_filter = sys.argv[1] if len(sys.argv) > 1 else None
-        
-        scraper.process_all(realm_filter)
+        scraper = FTBCWikiScraper(args.dump)
+        scraper.process_all(args.realms)
     
     except Exception as e:
         print(f"Error: {e}")
@@ -3,11 +3,28 @@
 Wiki page template generator with realm styling.
 
 Generates properly styled wiki pages using realm data from realms.json.
+
+With --preview, the pages of every object of the given realms (all realms
+if none are given) are rendered to .cache/previews/<realm>/<object>.wiki.
+
+Usage: python wiki_template_generator.py [--preview [REALM ...]]
 """
 
+import argparse
 import json
+import re
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+
+import profiler
+from metadata_store import read_realm
+from realm_index import load_realm_index
+
+METADATA_DIR = Path('metadata/objectjsons')
+PREVIEW_DIR = Path('.cache/previews')
+
+# Characters not allowed in file names on Windows
+UNSAFE_CHARS = re.compile(r'[\\/:*?"<>|]')
 
 class WikiTemplateGenerator:
     def __init__(self):
@@ -15,25 +32,9 @@ class WikiTemplateGenerator:
         self.realms_path = Path('metadata/realms.json')
         self.difficulties_path = Path('metadata/difficulties.json')
         
-        with open(self.realms_path, 'r', encoding='utf-8') as f:
-            realms_data = json.load(f)
-        
-        # Flatten realms
-        self.realms_map = {}
-        for realm_list in realms_data.get('normal', []):
-            if isinstance(realm_list, dict):
-                label = realm_list.get('label', '')
-                if label:
-                    self.realms_map[label] = realm_list
-        
-        # Add subrealms
-        for subrealm_type, subrealm_list in realms_data.get('subrealms', {}).items():
-            if isinstance(subrealm_list, list):
-                for realm in subrealm_list:
-                    if isinstance(realm, dict):
-                        label = realm.get('label', '')
-                        if label:
-                            self.realms_map[label] = realm
+        # Realms, subrealms and aliases resolved through the compiled index
+        self.realm_index = load_realm_index()
+        self.realms_map = self.realm_index.realm_styles()
         
         # Load difficulties
         with open(self.difficulties_path, 'r', encoding='utf-8') as f:
@@ -50,12 +51,8 @@ class WikiTemplateGenerator:
     
     def generate_page_header(self, realm_name: str) -> str:
         """Generate styled page header from realm data."""
-        # Handle Basement specially - it's under Yoyle Factory subrealm
-        lookup_realm = realm_name
-        if realm_name == "The Basement":
-            lookup_realm = "Basement"
-        
-        realm_info = self.realms_map.get(lookup_realm, {})
+        realm_info = self.realm_index.style(realm_name)
+        special = self.realm_index.special(realm_name)
         
         image = realm_info.get('image', 'Main Realm Sky.webp')
         gradient = realm_info.get('gradient', '-webkit-linear-gradient(#78ff78, #00ff00)')
@@ -64,7 +61,13 @@ class WikiTemplateGenerator:
         header = f'''<div align="center" style="position:fixed; z-index:-1; top:0; left:0; right:0; bottom:0;">
  [[File:{image}|2000px]]
 </div>
-<div style="--theme-accent-color:{gradient}; --theme-accent-label-color:{accent};">
+'''
+        if special.get('static_overlay'):
+            header += f'''<div align="center" style="position:fixed; z-index:-1; top:0; left:0; right:0; bottom:0; opacity:{special.get('static_opacity', 0.05)};">
+ [[File:{special.get('static_image', 'Staticbg.gif')}|2000px]]
+</div>
+'''
+        header += f'''<div style="--theme-accent-color:{gradient}; --theme-accent-label-color:{accent};">
 <div style="position:relative; z-index:1;">
 '''
         return header
@@ -104,10 +107,8 @@ class WikiTemplateGenerator:
         diff_color = diff_info.get('color', '#ffffff')
         char_info += f"|difficulty= [[File:{diff_icon}]] <span style=\"color:{diff_color}\">'''{difficulty}'''</span>\n"
         
-        # Add area (realm) - special handling for Basement
-        area_link = realm
-        if realm == "The Basement":
-            area_link = "Basement"  # Just "Basement", not "The Basement"
+        # Add area (realm unless an area was inferred), by its wiki page name
+        area_link = self.realm_index.wiki_name(obj_data.get('area') or realm)
         char_info += f"|area=[[{area_link}]]\n"
         
         # Add hint/description
@@ -132,6 +133,7 @@ class WikiTemplateGenerator:
         
         return char_info
     
+    @profiler.phase('render')
     def generate_complete_page(self, object_name: str, obj_data: Dict,
                               info: str = '', obtaining: str = '',
                               prev_diffs: list = None, old_image: Optional[str] = None) -> str:
@@ -162,21 +164,94 @@ class WikiTemplateGenerator:
         # Close styled div
         page += "</div>\n</div>\n\n"
         
-        # Add categories - special handling for Basement
+        # Add categories (e.g. "Basement Objects" for The Basement)
         difficulty = obj_data.get('difficulty', '')
-        category_realm = realm
-        if realm == "The Basement":
-            category_realm = "Basement"  # Use "Basement" not "The Basement" for category
+        category_realm = self.realm_index.wiki_name(realm)
         page += f"[[Category:{difficulty} Objects]]\n"
+        if obj_data.get('area'):
+            page += f"[[Category:{obj_data['area']} Objects]]\n"
         page += f"[[Category:{category_realm} Objects]]\n"
         page += f"[[Category:Objects]]\n"
         
         return page
 
+def preview_path(realm_name: str, object_name: str, out_dir: Path = PREVIEW_DIR) -> Path:
+    """Preview file of an object (characters not allowed in file names become _)."""
+    return out_dir / realm_name / f"{UNSAFE_CHARS.sub('_', object_name)}.wiki"
+
+def render_previews(json_file: Path, out_dir: Path = PREVIEW_DIR,
+                    generator: Optional[WikiTemplateGenerator] = None,
+                    names: Optional[List[str]] = None) -> int:
+    """
+    Render the page previews of a realm file's objects.
+    
+    Previews whose text did not change are not rewritten. When every object
+    is rendered, previews of objects no longer in the file are removed.
+    
+    Args:
+        json_file: Realm file
+        out_dir: Preview root folder
+        generator: Generator to reuse (one is created if omitted)
+        names: Only render these objects (default: all)
+    
+    Returns:
+        Number of previews written
+    """
+    json_file = Path(json_file)
+    generator = generator or WikiTemplateGenerator()
+    objects, _ = read_realm(json_file)
+    realm_dir = out_dir / json_file.stem
+    realm_dir.mkdir(parents=True, exist_ok=True)
+    
+    written = 0
+    rendered = set()
+    for name in (names if names is not None else objects):
+        obj = objects.get(name)
+        path = preview_path(json_file.stem, name, out_dir)
+        if obj is None:
+            path.unlink(missing_ok=True)
+            continue
+        wiki = obj.get('wiki') or {}
+        page = generator.generate_complete_page(
+            name, obj,
+            info=wiki.get('info', ''),
+            obtaining=wiki.get('obtaining', ''),
+            prev_diffs=obj.get('previousDifficulties', [])
+        )
+        rendered.add(path.name)
+        if not path.exists() or path.read_text(encoding='utf-8') != page:
+            path.write_text(page, encoding='utf-8')
+            written += 1
+    
+    if names is None:
+        for path in realm_dir.glob('*.wiki'):
+            if path.name not in rendered:
+                path.unlink()
+    
+    return written
+
 def main():
-    """Test the template generator."""
+    """Render page previews, or print an example page."""
+    parser = argparse.ArgumentParser(description='Render styled wiki pages.')
+    parser.add_argument('--preview', nargs='*', metavar='REALM',
+                        help='render previews of these realms (all if none given)')
+    profiler.add_argument(parser)
+    args = parser.parse_args()
+    profiler.start('wiki_template_generator', args.profile)
+    
     generator = WikiTemplateGenerator()
     
+    if args.preview is not None:
+        total = 0
+        for json_file in sorted(METADATA_DIR.glob('*.json')):
+            if args.preview and json_file.stem not in args.preview:
+                continue
+            written = render_previews(json_file, generator=generator)
+            total += written
+            print(f"[OK] {json_file.stem:<40} [{written} previews written]")
+        print(f"\n✓ {total} previews written to {PREVIEW_DIR}")
+        return
+    
     # Test with example data
     test_data = {
         'name': 'American Flag',